@@ -3,14 +3,25 @@ AI Engine Package
 Contains Gemini AI integration, NL to SQL conversion, and query execution
 """
 
-from ai_engine.gemini_handler import gemini_handler
-from ai_engine.nl_to_sql import nl_to_sql_converter
 from ai_engine.query_executor import query_executor
 from ai_engine.prompts import prompt_templates
+from ai_engine.semantic_cache import semantic_cache
 
 __all__ = [
     'gemini_handler',
     'nl_to_sql_converter',
     'query_executor',
-    'prompt_templates'
+    'prompt_templates',
+    'semantic_cache'
 ]
+
+
+def __getattr__(name: str):
+    """Import the Gemini-backed singletons only when first used (PEP 562)"""
+    if name == 'gemini_handler':
+        from ai_engine.gemini_handler import get_gemini_handler
+        return get_gemini_handler()
+    if name == 'nl_to_sql_converter':
+        from ai_engine.nl_to_sql import get_nl_to_sql_converter
+        return get_nl_to_sql_converter()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
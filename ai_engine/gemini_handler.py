@@ -4,16 +4,78 @@ Wrapper for Google Gemini AI API interactions
 """
 
 import google.generativeai as genai
-from typing import Optional, Dict, Any
+from google.api_core import exceptions as google_exceptions
+from typing import Optional, Dict, Any, Iterator
 from loguru import logger
-import sys
-from pathlib import Path
-import time
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential
+)
+import asyncio
+import atexit
+import hashlib
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import timedelta
 
 from config import settings
+from ai_engine.semantic_cache import semantic_cache
+from ai_engine.prompts import prompt_templates
+
+
+# Errors worth retrying; anything else (bad key, invalid prompt) fails fast
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded
+)
+
+# Model profile used for each prompt task
+_TASK_MODELS = {
+    prompt_templates.TASK_SQL: 'sql',
+    prompt_templates.TASK_FIX_SQL: 'sql',
+    prompt_templates.TASK_EXPLAIN: 'explain',
+    prompt_templates.TASK_ANALYZE: 'analyze'
+}
+
+# Digest of each task's static prefix, mixed into its cache namespace
+_PREFIX_DIGESTS: Dict[str, str] = {}
+
+# Optional ```sql fence around the query; group 1 is the query itself
+_SQL_FENCE_RE = re.compile(r'^\s*(?:```(?:sql)?)?\s*(.*?)\s*(?:```)?\s*$', re.DOTALL | re.IGNORECASE)
+
+
+def _log_retry(retry_state):
+    """Log a retry before tenacity sleeps"""
+    logger.warning(
+        f"⏳ Gemini AI transient error (attempt {retry_state.attempt_number}), "
+        f"retrying in {retry_state.next_action.sleep:.1f} seconds: {retry_state.outcome.exception()}"
+    )
+
+
+def _retry_policy(max_retries: int) -> Dict[str, Any]:
+    """
+    Tenacity settings for Gemini requests
+    
+    Args:
+        max_retries: Maximum number of attempts
+    
+    Returns:
+        Keyword arguments for Retrying/AsyncRetrying
+    """
+    return {
+        'retry': retry_if_exception_type(RETRYABLE_ERRORS),
+        'wait': wait_random_exponential(multiplier=0.5, max=8),
+        'stop': stop_after_attempt(max_retries),
+        'before_sleep': _log_retry,
+        'reraise': True
+    }
 
 
 class GeminiHandler:
@@ -28,6 +90,16 @@ class GeminiHandler:
         self.temperature = settings.gemini_temperature
         self.max_tokens = settings.gemini_max_tokens
         self.model = None
+        self.models: Dict[str, Any] = {}
+        self.sql_cache = None
+        self.cached_models: Dict[str, Any] = {}
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._recent: OrderedDict = OrderedDict()  # In-process LRU of exact prompt -> response
+        self.cache = semantic_cache if settings.enable_semantic_cache else None
         self._initialize()
     
     def _initialize(self):
@@ -67,25 +139,302 @@ class GeminiHandler:
                 }
             ]
             
-            self.model = genai.GenerativeModel(
-                model_name=self.model_name,
-                generation_config=generation_config,
-                safety_settings=safety_settings
-            )
+            # One model per task profile, built once; SQL is deterministic
+            self.generation_configs = {
+                'default': generation_config,
+                'sql': {
+                    **generation_config,
+                    "temperature": settings.gemini_sql_temperature,
+                    "top_k": 1,
+                },
+                'explain': {
+                    **generation_config,
+                    "temperature": settings.gemini_explain_temperature,
+                },
+                'analyze': {
+                    **generation_config,
+                    "temperature": settings.gemini_explain_temperature,
+                },
+            }
+            
+            self.models = {
+                key: genai.GenerativeModel(
+                    model_name=self.model_name,
+                    generation_config=config,
+                    safety_settings=safety_settings
+                )
+                for key, config in self.generation_configs.items()
+            }
+            self.model = self.models['default']
             
             logger.info(f"✅ Gemini AI initialized: {self.model_name}")
             
+            if settings.enable_context_cache:
+                self._create_context_cache(safety_settings)
+            
         except Exception as e:
             logger.error(f"❌ Failed to initialize Gemini AI: {e}")
             self.model = None
     
-    def generate_text(self, prompt: str, max_retries: int = 3) -> Optional[str]:
+    def _create_context_cache(self, safety_settings: list):
+        """
+        Cache the static task instructions on the Gemini side
+        
+        Requests then only send the dynamic part of the prompt, and the
+        cached instruction tokens are billed at a reduced rate. Skipped
+        without an API call when the instructions are below the explicit
+        cache minimum, and skipped when the model can't cache content. An
+        existing cache with the same instructions is reused; one created
+        here is deleted at exit.
+        
+        Args:
+            safety_settings: Safety settings for the cached models
+        """
+        instructions = prompt_templates.static_instruction_block()
+        
+        # About 4 characters per token - checked locally so small
+        # instruction blocks cost no round-trip at all
+        estimated_tokens = len(instructions) // 4
+        if estimated_tokens < settings.context_cache_min_tokens:
+            logger.info(
+                f"Gemini context cache skipped: ~{estimated_tokens} instruction tokens, "
+                f"minimum is {settings.context_cache_min_tokens}"
+            )
+            return
+        
+        try:
+            from google.generativeai import caching
+            
+            model_info = genai.get_model(f"models/{self.model_name}")
+            if "createCachedContent" not in model_info.supported_generation_methods:
+                logger.info(f"Gemini context cache skipped: {self.model_name} does not support caching")
+                return
+            
+            # Content hash in the name, so changed instructions get a new cache
+            digest = hashlib.blake2b(instructions.encode(), digest_size=6).hexdigest()
+            display_name = f"datawise-static-{digest}"
+            ttl = timedelta(seconds=settings.context_cache_ttl_seconds)
+            
+            self.sql_cache = next(
+                (
+                    cache for cache in caching.CachedContent.list()
+                    if cache.display_name == display_name and cache.model.endswith(self.model_name)
+                ),
+                None
+            )
+            
+            if self.sql_cache is not None:
+                self.sql_cache.update(ttl=ttl)
+                logger.info(f"✅ Gemini context cache reused: {self.sql_cache.name}")
+            else:
+                self.sql_cache = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name=display_name,
+                    system_instruction=instructions,
+                    ttl=ttl
+                )
+                atexit.register(self._delete_context_cache)
+                logger.info(f"✅ Gemini context cache created: {self.sql_cache.name}")
+            
+            self.cached_models = {
+                key: genai.GenerativeModel.from_cached_content(
+                    cached_content=self.sql_cache,
+                    generation_config=config,
+                    safety_settings=safety_settings
+                )
+                for key, config in self.generation_configs.items()
+            }
+            
+        except Exception as e:
+            # Not all models support caching; fall back to sending full prompts
+            logger.warning(f"⚠️  Gemini context caching unavailable, sending full prompts: {e}")
+            self.sql_cache = None
+            self.cached_models = {}
+    
+    def _delete_context_cache(self):
+        """Delete the context cache this process created"""
+        if self.sql_cache is None:
+            return
+        try:
+            self.sql_cache.delete()
+            logger.info("✅ Gemini context cache deleted")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not delete Gemini context cache: {e}")
+        finally:
+            self.sql_cache = None
+            self.cached_models = {}
+    
+    def _prepare_request(self, prompt: str, task: Optional[str], model_key: Optional[str] = None):
+        """
+        Pick the model and prompt text for a request
+        
+        Args:
+            prompt: Prompt text (dynamic part only when task is given)
+            task: Task whose static instructions precede the prompt
+            model_key: Model profile to use (defaults to the task's profile)
+        
+        Returns:
+            Tuple of (model, prompt to send)
+        """
+        model_key = model_key or _TASK_MODELS.get(task, 'default')
+        
+        if task is None:
+            return self.models.get(model_key, self.model), prompt
+        
+        if self.cached_models:
+            return self.cached_models[model_key], prompt
+        
+        return self.models[model_key], prompt_templates.static_prefix(task) + "\n\n" + prompt
+    
+    def _handle_model_error(self, model, task: Optional[str], error: Exception):
+        """
+        Decide whether a failed request can be resent without the context cache
+        
+        Args:
+            model: Model used for the failed request
+            task: Task name of the request
+            error: Raised exception
+        
+        Returns:
+            True if the request should be resent with the full prompt
+        """
+        if task is not None and any(model is cached for cached in self.cached_models.values()):
+            # The context cache may have expired; send full prompts from now on
+            logger.warning(f"⚠️  Disabling Gemini context cache after error: {error}")
+            self.cached_models = {}
+            return True
+        return False
+    
+    def _generate_with_retry(self, model, prompt: str, max_retries: int, stream: bool = False):
+        """
+        Call the model, retrying transient errors with jittered backoff
+        
+        Args:
+            model: Gemini model
+            prompt: Prompt text to send
+            max_retries: Maximum number of attempts
+            stream: Whether to return a streaming response
+        
+        Returns:
+            Gemini response
+        """
+        for attempt in Retrying(**_retry_policy(max_retries)):
+            with attempt:
+                return model.generate_content(prompt, stream=stream)
+    
+    async def _generate_with_retry_async(self, model, prompt: str, max_retries: int):
+        """
+        Async version of _generate_with_retry
+        
+        Args:
+            model: Gemini model
+            prompt: Prompt text to send
+            max_retries: Maximum number of attempts
+        
+        Returns:
+            Gemini response
+        """
+        async for attempt in AsyncRetrying(**_retry_policy(max_retries)):
+            with attempt:
+                async with self._get_semaphore():
+                    return await model.generate_content_async(prompt)
+    
+    def _lookup_cache(
+        self,
+        prompt: str,
+        cache_text: Optional[str],
+        similarity_threshold: Optional[float],
+        task: Optional[str]
+    ) -> Optional[str]:
+        """
+        Look up a prompt in the semantic response cache
+        
+        Returns:
+            Cached response or None on miss
+        """
+        cached = self.cache.lookup(
+            prompt,
+            namespace=self._cache_namespace(task),
+            semantic_text=cache_text,
+            threshold=similarity_threshold
+        )
+        if cached is not None:
+            logger.info("✅ Gemini AI response served from cache")
+        return cached
+    
+    def _cache_namespace(self, task: Optional[str]) -> str:
+        """
+        Semantic cache namespace for a task
+        
+        Includes a digest of the task's static prefix so edits to the
+        prompt templates invalidate responses cached on disk.
+        """
+        if not task:
+            return self.model_name
+        digest = _PREFIX_DIGESTS.get(task)
+        if digest is None:
+            prefix = prompt_templates.static_prefix(task)
+            digest = hashlib.blake2b(prefix.encode(), digest_size=6).hexdigest()
+            _PREFIX_DIGESTS[task] = digest
+        return f"{self.model_name}:{task}:{digest}"
+    
+    def _finish_response(
+        self,
+        response,
+        prompt: str,
+        cache_text: Optional[str],
+        task: Optional[str],
+        use_cache: bool
+    ) -> Optional[str]:
+        """
+        Extract the text of a response and store it in the semantic cache
+        
+        Returns:
+            Response text or None if empty
+        """
+        if response and response.text:
+            logger.info("✅ Gemini AI response generated successfully")
+            text = response.text.strip()
+            if use_cache:
+                self.cache.store(
+                    prompt,
+                    text,
+                    namespace=self._cache_namespace(task),
+                    semantic_text=cache_text
+                )
+            return text
+        
+        logger.warning("⚠️  Gemini returned empty response")
+        return None
+    
+    def generate_text(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        cache_text: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        use_cache: bool = True,
+        task: Optional[str] = None,
+        model_key: Optional[str] = None
+    ) -> Optional[str]:
         """
         Generate text using Gemini AI
         
+        Only transient errors (rate limits, unavailable service, timeouts) are
+        retried; invalid requests and auth errors fail immediately.
+        
         Args:
             prompt: Input prompt
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of attempts
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+                (the rest of the prompt must match exactly)
+            similarity_threshold: Minimum similarity for a semantic cache hit
+            use_cache: Whether to use the semantic response cache
+            task: Task name when prompt holds only the dynamic part; the
+                task's static instructions are added from the context cache
+                or prepended to the prompt
+            model_key: Model profile to use ('sql', 'explain', 'analyze'); defaults
+                to the task's profile
         
         Returns:
             Generated text or None if failed
@@ -94,90 +443,434 @@ class GeminiHandler:
             logger.error("❌ Gemini model not initialized")
             return None
         
-        for attempt in range(max_retries):
+        key = hashlib.blake2b(f"{model_key}\x00{task}\x00{prompt}".encode(), digest_size=16).hexdigest()
+        
+        # Exact repeats are answered from memory before touching SQLite
+        if use_cache:
+            with self._inflight_lock:
+                if key in self._recent:
+                    self._recent.move_to_end(key)
+                    return self._recent[key]
+        
+        remember = use_cache
+        use_cache = use_cache and self.cache is not None
+        
+        if use_cache:
+            cached = self._lookup_cache(prompt, cache_text, similarity_threshold, task)
+            if cached is not None:
+                return cached
+        
+        # Singleflight: identical concurrent prompts share one API request
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_leader:
+            logger.info("⏳ Waiting for identical in-flight Gemini request")
+            return future.result()
+        
+        result = None
+        try:
+            result = self._generate_uncached(prompt, max_retries, cache_text, use_cache, task, model_key)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+                if remember and result is not None:
+                    self._recent[key] = result
+                    if len(self._recent) > settings.gemini_memory_cache_size:
+                        self._recent.popitem(last=False)
+            future.set_result(result)
+        
+        return result
+    
+    def _generate_uncached(
+        self,
+        prompt: str,
+        max_retries: int,
+        cache_text: Optional[str],
+        use_cache: bool,
+        task: Optional[str],
+        model_key: Optional[str]
+    ) -> Optional[str]:
+        """
+        Send a prompt to Gemini and store the response in the semantic cache
+        
+        Returns:
+            Generated text or None if failed
+        """
+        model, request_prompt = self._prepare_request(prompt, task, model_key)
+        
+        try:
             try:
-                response = self.model.generate_content(prompt)
-                
-                if response and response.text:
-                    logger.info("✅ Gemini AI response generated successfully")
-                    return response.text.strip()
-                else:
-                    logger.warning("⚠️  Gemini returned empty response")
-                    return None
-                
+                response = self._generate_with_retry(model, request_prompt, max_retries)
             except Exception as e:
-                logger.error(f"❌ Gemini AI error (attempt {attempt + 1}/{max_retries}): {e}")
-                
-                if attempt < max_retries - 1:
-                    # Wait before retry (exponential backoff)
-                    wait_time = 2 ** attempt
-                    logger.info(f"⏳ Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error("❌ Max retries reached")
-                    return None
+                if not self._handle_model_error(model, task, e):
+                    raise
+                model, request_prompt = self._prepare_request(prompt, task, model_key)
+                response = self._generate_with_retry(model, request_prompt, max_retries)
+            
+            return self._finish_response(response, prompt, cache_text, task, use_cache)
+            
+        except Exception as e:
+            logger.error(f"❌ Gemini AI error: {e}")
+            return None
+    
+    def run_async(self, coro) -> Any:
+        """
+        Run a coroutine on the handler's background event loop and wait for it
         
-        return None
+        google-generativeai caches its grpc.aio client on the model and binds
+        it to the loop of the first async call, so every async call must run
+        on the same long-lived loop; asyncio.run would use a new loop (and a
+        dead client) each time.
+        
+        Args:
+            coro: Coroutine using the async Gemini methods
+        
+        Returns:
+            The coroutine's result
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="gemini-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the concurrency limiter for the running event loop
+        
+        asyncio primitives are bound to one loop; callers awaiting the async
+        methods on their own loop get a semaphore of their own.
+        
+        Returns:
+            Semaphore limiting concurrent Gemini requests
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
     
-    def generate_sql(self, prompt: str) -> Optional[str]:
+    async def generate_text_async(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        cache_text: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        use_cache: bool = True,
+        task: Optional[str] = None,
+        model_key: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Generate text using Gemini AI without blocking the event loop
+        
+        Args:
+            prompt: Input prompt
+            max_retries: Maximum number of attempts
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            similarity_threshold: Minimum similarity for a semantic cache hit
+            use_cache: Whether to use the semantic response cache
+            task: Task name when prompt holds only the dynamic part
+            model_key: Model profile to use; defaults to the task's profile
+        
+        Returns:
+            Generated text or None if failed
+        """
+        if not self.model:
+            logger.error("❌ Gemini model not initialized")
+            return None
+        
+        use_cache = use_cache and self.cache is not None
+        
+        if use_cache:
+            cached = self._lookup_cache(prompt, cache_text, similarity_threshold, task)
+            if cached is not None:
+                return cached
+        
+        model, request_prompt = self._prepare_request(prompt, task, model_key)
+        
+        try:
+            try:
+                response = await self._generate_with_retry_async(model, request_prompt, max_retries)
+            except Exception as e:
+                if not self._handle_model_error(model, task, e):
+                    raise
+                model, request_prompt = self._prepare_request(prompt, task, model_key)
+                response = await self._generate_with_retry_async(model, request_prompt, max_retries)
+            
+            return self._finish_response(response, prompt, cache_text, task, use_cache)
+            
+        except Exception as e:
+            logger.error(f"❌ Gemini AI error: {e}")
+            return None
+    
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        cache_text: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        use_cache: bool = True,
+        task: Optional[str] = None,
+        model_key: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate text using Gemini AI, yielding chunks as they arrive
+        
+        Suitable for st.write_stream. A cached response is yielded in one piece.
+        
+        Args:
+            prompt: Input prompt
+            max_retries: Maximum number of attempts for opening the stream
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            similarity_threshold: Minimum similarity for a semantic cache hit
+            use_cache: Whether to use the semantic response cache
+            task: Task name when prompt holds only the dynamic part
+            model_key: Model profile to use; defaults to the task's profile
+        
+        Yields:
+            Text chunks
+        """
+        if not self.model:
+            logger.error("❌ Gemini model not initialized")
+            return
+        
+        use_cache = use_cache and self.cache is not None
+        
+        if use_cache:
+            cached = self._lookup_cache(prompt, cache_text, similarity_threshold, task)
+            if cached is not None:
+                yield cached
+                return
+        
+        model, request_prompt = self._prepare_request(prompt, task, model_key)
+        chunks = []
+        
+        try:
+            try:
+                response = self._generate_with_retry(model, request_prompt, max_retries, stream=True)
+            except Exception as e:
+                if not self._handle_model_error(model, task, e):
+                    raise
+                model, request_prompt = self._prepare_request(prompt, task, model_key)
+                response = self._generate_with_retry(model, request_prompt, max_retries, stream=True)
+            
+            for chunk in response:
+                text = chunk.text
+                if text:
+                    chunks.append(text)
+                    yield text
+            
+        except Exception as e:
+            logger.error(f"❌ Gemini AI streaming error: {e}")
+            return
+        
+        full_text = "".join(chunks).strip()
+        if not full_text:
+            logger.warning("⚠️  Gemini returned empty response")
+            return
+        
+        logger.info("✅ Gemini AI response streamed successfully")
+        if use_cache:
+            self.cache.store(
+                prompt,
+                full_text,
+                namespace=self._cache_namespace(task),
+                semantic_text=cache_text
+            )
+    
+    def generate_sql(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
         """
         Generate SQL query using Gemini AI
         
         Args:
             prompt: Prompt for SQL generation
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
         
         Returns:
             SQL query string or None if failed
         """
-        response = self.generate_text(prompt)
+        # SQL correctness is brittle, so only identical questions may share a response
+        response = self.generate_text(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_sql_threshold,
+            task=task,
+            model_key='sql'
+        )
         
         if not response:
             return None
         
-        # Clean up the response - remove markdown code blocks if present
-        sql_query = response.strip()
-        
-        # Remove markdown SQL code blocks
-        if sql_query.startswith("```sql"):
-            sql_query = sql_query[6:]
-        if sql_query.startswith("```"):
-            sql_query = sql_query[3:]
-        if sql_query.endswith("```"):
-            sql_query = sql_query[:-3]
-        
-        sql_query = sql_query.strip()
-        
-        # Remove any trailing semicolons
-        if sql_query.endswith(";"):
-            sql_query = sql_query[:-1]
+        # Clean up the response - strip markdown code fences and trailing semicolons
+        sql_query = _SQL_FENCE_RE.match(response).group(1).rstrip(';').strip()
         
         logger.info(f"✅ Generated SQL: {sql_query[:100]}...")
         
         return sql_query
     
-    def explain_text(self, prompt: str) -> Optional[str]:
+    def explain_text(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
         """
         Generate explanation using Gemini AI
         
         Args:
             prompt: Prompt for explanation
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
         
         Returns:
             Explanation text or None if failed
         """
-        return self.generate_text(prompt)
+        return self.generate_text(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='explain'
+        )
     
-    def analyze_results(self, prompt: str) -> Optional[str]:
+    def analyze_results(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
         """
         Analyze query results using Gemini AI
         
         Args:
             prompt: Prompt with results to analyze
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
+        
+        Returns:
+            Analysis text or None if failed
+        """
+        return self.generate_text(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='analyze'
+        )
+    
+    def explain_text_stream(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Streaming version of explain_text
+        
+        Args:
+            prompt: Prompt for explanation
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
+        
+        Returns:
+            Generator of text chunks
+        """
+        return self.generate_text_stream(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='explain'
+        )
+    
+    def analyze_results_stream(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Streaming version of analyze_results
+        
+        Args:
+            prompt: Prompt with results to analyze
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
+        
+        Returns:
+            Generator of text chunks
+        """
+        return self.generate_text_stream(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='analyze'
+        )
+    
+    async def explain_text_async(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Async version of explain_text
+        
+        Args:
+            prompt: Prompt for explanation
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
+        
+        Returns:
+            Explanation text or None if failed
+        """
+        return await self.generate_text_async(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='explain'
+        )
+    
+    async def analyze_results_async(
+        self,
+        prompt: str,
+        cache_text: Optional[str] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Async version of analyze_results
+        
+        Args:
+            prompt: Prompt with results to analyze
+            cache_text: Part of the prompt matched by similarity in the semantic cache
+            task: Task name when prompt holds only the dynamic part
         
         Returns:
             Analysis text or None if failed
         """
-        return self.generate_text(prompt)
+        return await self.generate_text_async(
+            prompt,
+            cache_text=cache_text,
+            similarity_threshold=settings.semantic_cache_explain_threshold,
+            task=task,
+            model_key='analyze'
+        )
     
     def is_available(self) -> bool:
         """
@@ -199,7 +892,7 @@ class GeminiHandler:
             return False, "Gemini AI not configured"
         
         try:
-            response = self.generate_text("Say 'Hello' in one word")
+            response = self.generate_text("Say 'Hello' in one word", use_cache=False)
             if response:
                 return True, f"Connection successful: {response}"
             else:
@@ -208,6 +901,29 @@ class GeminiHandler:
             return False, f"Connection failed: {str(e)}"
 
 
-# Global instance
-gemini_handler = GeminiHandler()
+# Global instance, created on first use so importing the package stays cheap
+_instance: Optional[GeminiHandler] = None
+_instance_lock = threading.Lock()
+
+
+def get_gemini_handler() -> GeminiHandler:
+    """
+    Get the shared GeminiHandler, creating it on first use
+    
+    Returns:
+        GeminiHandler instance
+    """
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = GeminiHandler()
+    return _instance
+
+
+def __getattr__(name: str):
+    """Resolve the lazy global gemini_handler (PEP 562)"""
+    if name == "gemini_handler":
+        return get_gemini_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
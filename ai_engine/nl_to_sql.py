@@ -3,18 +3,48 @@ Natural Language to SQL Converter
 Converts natural language questions to SQL queries using Gemini AI
 """
 
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+import re
+import orjson
 import pandas as pd
-from typing import Optional, Dict, Any, List, Tuple
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 from loguru import logger
-import sys
-from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-
-from ai_engine.gemini_handler import gemini_handler
+from ai_engine.gemini_handler import get_gemini_handler
 from ai_engine.prompts import prompt_templates
 
+# Questions about parts of a whole suit a pie chart
+_PROPORTION_RE = re.compile(r'\b(share|proportion|percent|percentage|distribution|breakdown|split)\b', re.IGNORECASE)
+
+# numpy dtype kind code -> SQL type name; everything else is TEXT
+_KIND_TO_SQL_TYPE = {
+    'i': 'INTEGER',
+    'u': 'INTEGER',
+    'f': 'NUMERIC',
+    'M': 'DATE',
+    'b': 'BOOLEAN'
+}
+
+
+def _dtype_kind(dtype: str) -> str:
+    """
+    Get the NumPy kind character for a dtype name
+    
+    Args:
+        dtype: dtype as a string, e.g. "int64" or "category"
+    
+    Returns:
+        Kind character, 'O' for anything unrecognized
+    """
+    try:
+        return pd.api.types.pandas_dtype(dtype).kind
+    except TypeError:
+        return 'O'
+
 
 class NLtoSQLConverter:
     """
@@ -23,33 +53,46 @@ class NLtoSQLConverter:
     
     def __init__(self):
         """Initialize NL to SQL converter"""
-        self.gemini = gemini_handler
+        self._gemini = None
+        self._schema_cache = OrderedDict()
+        self._schema_cache_size = 16
+    
+    @property
+    def gemini(self):
+        """Gemini handler, created on first use"""
+        if self._gemini is None:
+            self._gemini = get_gemini_handler()
+        return self._gemini
     
     def get_table_schema(self, df: pd.DataFrame) -> Dict[str, str]:
         """
         Get table schema from DataFrame
         
+        The same DataFrame is usually passed to several calls in a row, so the
+        schema is memoized per DataFrame object and shape.
+        
         Args:
             df: Pandas DataFrame
         
         Returns:
             Dictionary mapping column names to data types
         """
-        schema = {}
-        for col in df.columns:
-            dtype = str(df[col].dtype)
-            
-            # Simplify dtype names
-            if 'int' in dtype:
-                schema[col] = 'INTEGER'
-            elif 'float' in dtype:
-                schema[col] = 'NUMERIC'
-            elif 'datetime' in dtype:
-                schema[col] = 'DATE'
-            elif 'bool' in dtype:
-                schema[col] = 'BOOLEAN'
-            else:
-                schema[col] = 'TEXT'
+        key = (id(df), df.shape)
+        cached = self._schema_cache.get(key)
+        
+        # The weak reference guards against a new DataFrame reusing the id
+        if cached is not None and cached[0]() is df:
+            self._schema_cache.move_to_end(key)
+            return cached[1]
+        
+        schema = {
+            col: _KIND_TO_SQL_TYPE.get(dtype.kind, 'TEXT')
+            for col, dtype in df.dtypes.items()
+        }
+        
+        self._schema_cache[key] = (weakref.ref(df), schema)
+        if len(self._schema_cache) > self._schema_cache_size:
+            self._schema_cache.popitem(last=False)
         
         return schema
     
@@ -69,27 +112,80 @@ class NLtoSQLConverter:
             schema = self.get_table_schema(df)
             
             # Generate prompt
-            prompt = prompt_templates.nl_to_sql_prompt(
+            prompt = prompt_templates.nl_to_sql_dynamic(
                 question=question,
                 table_schema=schema,
                 table_name="data"
             )
             
-            # Generate SQL using Gemini
-            sql_query = self.gemini.generate_sql(prompt)
-            
-            if not sql_query:
-                logger.error("❌ Failed to generate SQL query")
-                return None
+            return self._generate_sql(prompt, question)
             
-            logger.info(f"✅ Generated SQL from question: '{question[:50]}...'")
-            
-            return sql_query
+        except Exception as e:
+            logger.error(f"❌ Error converting NL to SQL: {e}")
+            return None
+    
+    def build_schema_prompt(self, schema_key: Tuple[Tuple[str, str], ...], table_name: str = "data") -> str:
+        """
+        Render the schema part of the NL to SQL prompt once per dataset
+        
+        Args:
+            schema_key: Tuple of (column, dtype) pairs, see schema_key()
+            table_name: Name of the table (default: "data")
+        
+        Returns:
+            Schema prompt prefix for convert_to_sql_with_prefix()
+        """
+        schema = {
+            col: _KIND_TO_SQL_TYPE.get(_dtype_kind(dtype), 'TEXT')
+            for col, dtype in schema_key
+        }
+        return prompt_templates.nl_to_sql_schema_prefix(schema, table_name)
+    
+    def convert_to_sql_with_prefix(self, schema_prefix: str, question: str) -> Optional[str]:
+        """
+        Convert natural language question to SQL query using a precomputed schema prefix
+        
+        Args:
+            schema_prefix: Output of build_schema_prompt()
+            question: Natural language question
+        
+        Returns:
+            SQL query string or None if failed
+        """
+        try:
+            prompt = prompt_templates.nl_to_sql_with_prefix(schema_prefix, question)
+            return self._generate_sql(prompt, question)
             
         except Exception as e:
             logger.error(f"❌ Error converting NL to SQL: {e}")
             return None
     
+    def _generate_sql(self, prompt: str, question: str) -> Optional[str]:
+        """
+        Send an NL to SQL prompt to Gemini
+        
+        Args:
+            prompt: Rendered per-request prompt
+            question: Natural language question
+        
+        Returns:
+            SQL query string or None if failed
+        """
+        # Generate SQL using Gemini (instructions and examples come from the task prefix)
+        sql_query = self.gemini.generate_sql(
+            prompt,
+            cache_text=question,
+            task=prompt_templates.TASK_SQL
+        )
+        
+        if not sql_query:
+            logger.error("❌ Failed to generate SQL query")
+            return None
+        
+        logger.info(f"✅ Generated SQL from question: '{question[:50]}...'")
+        
+        return sql_query
+    
     def fix_sql_query(self, sql_query: str, error_message: str, df: pd.DataFrame) -> Optional[str]:
         """
         Attempt to fix a SQL query that produced an error
@@ -105,13 +201,13 @@ class NLtoSQLConverter:
         try:
             schema = self.get_table_schema(df)
             
-            prompt = prompt_templates.fix_sql_error_prompt(
+            prompt = prompt_templates.fix_sql_error_dynamic(
                 sql_query=sql_query,
                 error_message=error_message,
                 table_schema=schema
             )
             
-            fixed_sql = self.gemini.generate_sql(prompt)
+            fixed_sql = self.gemini.generate_sql(prompt, task=prompt_templates.TASK_FIX_SQL)
             
             if fixed_sql:
                 logger.info("✅ SQL query fixed")
@@ -136,12 +232,16 @@ class NLtoSQLConverter:
             Explanation text or None if failed
         """
         try:
-            prompt = prompt_templates.explain_query_prompt(
+            prompt = prompt_templates.explain_query_dynamic(
                 sql_query=sql_query,
                 question=question
             )
             
-            explanation = self.gemini.explain_text(prompt)
+            explanation = self.gemini.explain_text(
+                prompt,
+                cache_text=question,
+                task=prompt_templates.TASK_EXPLAIN
+            )
             
             if explanation:
                 logger.info("✅ Query explained")
@@ -153,6 +253,51 @@ class NLtoSQLConverter:
             logger.error(f"❌ Error explaining query: {e}")
             return None
     
+    async def explain_query_async(self, sql_query: str, question: str) -> Optional[str]:
+        """
+        Async version of explain_query
+        
+        Args:
+            sql_query: SQL query to explain
+            question: Original natural language question
+        
+        Returns:
+            Explanation text or None if failed
+        """
+        try:
+            prompt = prompt_templates.explain_query_dynamic(
+                sql_query=sql_query,
+                question=question
+            )
+            
+            explanation = await self.gemini.explain_text_async(
+                prompt,
+                cache_text=question,
+                task=prompt_templates.TASK_EXPLAIN
+            )
+            
+            if explanation:
+                logger.info("✅ Query explained")
+                return explanation
+            else:
+                return "This query retrieves the requested data from the dataset."
+                
+        except Exception as e:
+            logger.error(f"❌ Error explaining query: {e}")
+            return None
+    
+    def schema_key(self, df: pd.DataFrame) -> Tuple[Tuple[str, str], ...]:
+        """
+        Get a small hashable description of a DataFrame's schema
+        
+        Args:
+            df: DataFrame to describe
+        
+        Returns:
+            Tuple of (column, dtype) pairs
+        """
+        return tuple(zip(map(str, df.columns), df.dtypes.astype(str)))
+    
     def suggest_questions(self, df: pd.DataFrame, n_suggestions: int = 5) -> List[str]:
         """
         Suggest interesting questions about the dataset
@@ -165,19 +310,50 @@ class NLtoSQLConverter:
             List of suggested questions
         """
         try:
-            schema = self.get_table_schema(df)
-            sample_data = df.head(3).to_dict('records')
+            return self.suggest_questions_from_schema(
+                self.schema_key(df),
+                self._compact_schema_sample(df),
+                n_suggestions
+            )
+        except Exception as e:
+            logger.error(f"❌ Error suggesting questions: {e}")
+            return self._generate_fallback_questions(df)
+    
+    def suggest_questions_from_schema(
+        self,
+        schema_key: Tuple[Tuple[str, str], ...],
+        sample_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        n_suggestions: int = 5
+    ) -> List[str]:
+        """
+        Suggest interesting questions from a schema alone
+        
+        Lets callers cache suggestions by schema instead of by the full data.
+        
+        Args:
+            schema_key: Tuple of (column, dtype) pairs, see schema_key()
+            sample_data: Optional compact per-column sample
+            n_suggestions: Number of suggestions to generate
+        
+        Returns:
+            List of suggested questions
+        """
+        try:
+            schema = {
+                col: _KIND_TO_SQL_TYPE.get(_dtype_kind(dtype), 'TEXT')
+                for col, dtype in schema_key
+            }
             
             prompt = prompt_templates.suggest_questions_prompt(
                 table_schema=schema,
-                sample_data=sample_data
+                sample_data=sample_data or {}
             )
             
             response = self.gemini.generate_text(prompt)
             
             if not response:
                 # Fallback suggestions
-                return self._generate_fallback_questions(df)
+                return self._fallback_questions_for_schema(schema_key)
             
             # Parse suggestions from response
             questions = []
@@ -192,11 +368,98 @@ class NLtoSQLConverter:
             
             logger.info(f"✅ Generated {len(questions)} question suggestions")
             
-            return questions[:n_suggestions] if questions else self._generate_fallback_questions(df)
+            return questions[:n_suggestions] if questions else self._fallback_questions_for_schema(schema_key)
             
         except Exception as e:
             logger.error(f"❌ Error suggesting questions: {e}")
-            return self._generate_fallback_questions(df)
+            return self._fallback_questions_for_schema(schema_key)
+    
+    def explain_query_stream(self, sql_query: str, question: str) -> Iterator[str]:
+        """
+        Streaming version of explain_query, for st.write_stream
+        
+        Args:
+            sql_query: SQL query to explain
+            question: Original natural language question
+        
+        Yields:
+            Explanation text chunks
+        """
+        prompt = prompt_templates.explain_query_dynamic(
+            sql_query=sql_query,
+            question=question
+        )
+        
+        streamed = False
+        for chunk in self.gemini.explain_text_stream(
+            prompt,
+            cache_text=question,
+            task=prompt_templates.TASK_EXPLAIN
+        ):
+            streamed = True
+            yield chunk
+        
+        if not streamed:
+            yield "This query retrieves the requested data from the dataset."
+    
+    def suggest_questions_stream(self, df: pd.DataFrame) -> Iterator[str]:
+        """
+        Stream the raw suggestion list from Gemini, for st.write_stream
+        
+        Args:
+            df: DataFrame to analyze
+        
+        Yields:
+            Suggestion text chunks
+        """
+        schema = self.get_table_schema(df)
+        sample_data = self._compact_schema_sample(df)
+        
+        prompt = prompt_templates.suggest_questions_prompt(
+            table_schema=schema,
+            sample_data=sample_data
+        )
+        
+        streamed = False
+        for chunk in self.gemini.generate_text_stream(prompt):
+            streamed = True
+            yield chunk
+        
+        if not streamed:
+            yield "\n".join(
+                f"{i}. {question}"
+                for i, question in enumerate(self._generate_fallback_questions(df), 1)
+            )
+    
+    def _compact_schema_sample(self, df: pd.DataFrame, n_examples: int = 2) -> Dict[str, Dict[str, Any]]:
+        """
+        Build a compact per-column sample for prompts
+        
+        Much smaller than sample rows for wide DataFrames: a couple of example
+        values per column plus min/max for numeric columns.
+        
+        Args:
+            df: DataFrame to sample
+            n_examples: Number of example values per column
+        
+        Returns:
+            Dictionary mapping column names to sample stats
+        """
+        # Examples only need the first rows that have values
+        head = df.head(50)
+        sample = {
+            col: {'examples': head[col].dropna().head(n_examples).tolist()}
+            for col in df.columns
+        }
+        
+        numeric_df = df.select_dtypes(include=['number'])
+        if not numeric_df.empty:
+            min_max = numeric_df.agg(['min', 'max'])
+            for col in numeric_df.columns:
+                sample[col]['min'] = min_max.at['min', col]
+                sample[col]['max'] = min_max.at['max', col]
+        
+        return sample
     
     def _generate_fallback_questions(self, df: pd.DataFrame) -> List[str]:
         """
@@ -205,14 +468,29 @@ class NLtoSQLConverter:
         Args:
             df: DataFrame to analyze
         
+        Returns:
+            List of fallback questions
+        """
+        if len(df) == 0:
+            return []
+        return self._fallback_questions_for_schema(self.schema_key(df))
+    
+    def _fallback_questions_for_schema(self, schema_key: Tuple[Tuple[str, str], ...]) -> List[str]:
+        """
+        Generate fallback questions from a schema
+        
+        Args:
+            schema_key: Tuple of (column, dtype) pairs
+        
         Returns:
             List of fallback questions
         """
         questions = []
         
         # Get numeric and categorical columns
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        kinds = [(col, _dtype_kind(dtype)) for col, dtype in schema_key]
+        numeric_cols = [col for col, kind in kinds if kind in 'iufc']
+        categorical_cols = [col for col, kind in kinds if kind == 'O']
         
         if numeric_cols:
             questions.append(f"What is the average {numeric_cols[0]}?")
@@ -221,9 +499,8 @@ class NLtoSQLConverter:
         if categorical_cols and numeric_cols:
             questions.append(f"What is the total {numeric_cols[0]} by {categorical_cols[0]}?")
         
-        if len(df) > 0:
-            questions.append("Show me the first 10 rows")
-            questions.append(f"How many rows are in the dataset?")
+        questions.append("Show me the first 10 rows")
+        questions.append(f"How many rows are in the dataset?")
         
         return questions[:5]
     
@@ -243,15 +520,19 @@ class NLtoSQLConverter:
                 return "No results found for this query."
             
             # Convert results to dict format
-            results_list = results.head(10).to_dict('records')
+            results_list = self._budget_sample(results.head(10))
             
-            prompt = prompt_templates.analyze_results_prompt(
+            prompt = prompt_templates.analyze_results_dynamic(
                 question=question,
                 results=results_list,
                 row_count=len(results)
             )
             
-            analysis = self.gemini.analyze_results(prompt)
+            analysis = self.gemini.analyze_results(
+                prompt,
+                cache_text=question,
+                task=prompt_templates.TASK_ANALYZE
+            )
             
             if analysis:
                 logger.info("✅ Query results analyzed")
@@ -263,6 +544,224 @@ class NLtoSQLConverter:
             logger.error(f"❌ Error analyzing results: {e}")
             return f"Query returned {len(results)} rows."
     
+    def analyze_query_results_stream(self, question: str, results: pd.DataFrame) -> Iterator[str]:
+        """
+        Streaming version of analyze_query_results, for st.write_stream
+        
+        Args:
+            question: Original question
+            results: Query results as DataFrame
+        
+        Yields:
+            Analysis text chunks
+        """
+        if len(results) == 0:
+            yield "No results found for this query."
+            return
+        
+        results_list = self._budget_sample(results.head(10))
+        
+        prompt = prompt_templates.analyze_results_dynamic(
+            question=question,
+            results=results_list,
+            row_count=len(results)
+        )
+        
+        streamed = False
+        for chunk in self.gemini.analyze_results_stream(
+            prompt,
+            cache_text=question,
+            task=prompt_templates.TASK_ANALYZE
+        ):
+            streamed = True
+            yield chunk
+        
+        if not streamed:
+            yield f"Query returned {len(results)} rows."
+    
+    async def analyze_query_results_async(self, question: str, results: pd.DataFrame) -> Optional[str]:
+        """
+        Async version of analyze_query_results
+        
+        Args:
+            question: Original question
+            results: Query results as DataFrame
+        
+        Returns:
+            Analysis summary or None if failed
+        """
+        try:
+            if len(results) == 0:
+                return "No results found for this query."
+            
+            results_list = self._budget_sample(results.head(10))
+            
+            prompt = prompt_templates.analyze_results_dynamic(
+                question=question,
+                results=results_list,
+                row_count=len(results)
+            )
+            
+            analysis = await self.gemini.analyze_results_async(
+                prompt,
+                cache_text=question,
+                task=prompt_templates.TASK_ANALYZE
+            )
+            
+            if analysis:
+                logger.info("✅ Query results analyzed")
+                return analysis
+            else:
+                return f"Query returned {len(results)} rows."
+                
+        except Exception as e:
+            logger.error(f"❌ Error analyzing results: {e}")
+            return f"Query returned {len(results)} rows."
+    
+    async def recommend_chart_type_async(self, question: str, results: pd.DataFrame) -> str:
+        """
+        Async version of recommend_chart_type
+        
+        Args:
+            question: Original question
+            results: Query results
+        
+        Returns:
+            Chart type name (bar, line, pie, scatter, table)
+        """
+        return self.recommend_chart_type(question, results)
+    
+    async def post_query_bundle_async(
+        self,
+        question: str,
+        sql_query: str,
+        results: pd.DataFrame
+    ) -> Dict[str, Any]:
+        """
+        Run the independent post-query AI calls concurrently
+        
+        Args:
+            question: Original question
+            sql_query: Executed SQL query
+            results: Query results
+        
+        Returns:
+            Dictionary with explanation, analysis and chart_type
+        """
+        explanation, analysis, chart_type = await asyncio.gather(
+            self.explain_query_async(sql_query, question),
+            self.analyze_query_results_async(question, results),
+            self.recommend_chart_type_async(question, results)
+        )
+        
+        return {
+            'explanation': explanation,
+            'analysis': analysis,
+            'chart_type': chart_type
+        }
+    
+    def post_query_bundle(self, question: str, sql_query: str, results: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Get explanation, analysis and chart recommendation for a query result
+        
+        Latency is that of the slowest call rather than the sum of all calls.
+        
+        Args:
+            question: Original question
+            sql_query: Executed SQL query
+            results: Query results
+        
+        Returns:
+            Dictionary with explanation, analysis and chart_type
+        """
+        try:
+            # One long-lived loop: the async Gemini client is bound to the
+            # loop it was first used on
+            return self.gemini.run_async(self.post_query_bundle_async(question, sql_query, results))
+        except Exception as e:
+            logger.warning(f"⚠️  Running post-query calls sequentially: {e}")
+            return {
+                'explanation': self.explain_query(sql_query, question),
+                'analysis': self.analyze_query_results(question, results),
+                'chart_type': self.recommend_chart_type(question, results)
+            }
+    
+    @staticmethod
+    def _records_for_prompt(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert rows to JSON-ready records for prompts
+        
+        pandas' JSON writer converts cells in C, which is much faster than
+        to_dict('records') building Python objects cell by cell.
+        
+        Args:
+            df: Rows to convert
+        
+        Returns:
+            List of row dictionaries
+        """
+        try:
+            return orjson.loads(df.to_json(orient='records', date_format='iso'))
+        except ValueError:
+            # to_json rejects duplicate column names
+            return df.to_dict('records')
+    
+    def _budget_sample(
+        self,
+        df: pd.DataFrame,
+        max_tokens: int = 800,
+        max_chars: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Convert result rows to records that fit a prompt token budget
+        
+        Long strings are truncated, then the widest columns are dropped until
+        the estimated size (about 4 characters per token) fits the budget.
+        
+        Args:
+            df: Result rows to include in the prompt
+            max_tokens: Approximate token budget for the rows
+            max_chars: Maximum length of string values
+        
+        Returns:
+            List of row dictionaries
+        """
+        records = self._records_for_prompt(df)
+        if not records:
+            return records
+        
+        for record in records:
+            for col, value in record.items():
+                if isinstance(value, str) and len(value) > max_chars:
+                    record[col] = value[:max_chars] + "..."
+        
+        # Estimated JSON size of each column across all rows
+        widths = {
+            col: sum(
+                len(orjson.dumps(record[col], default=str)) + len(str(col)) + 4
+                for record in records
+            )
+            for col in records[0]
+        }
+        
+        budget_chars = max_tokens * 4
+        total = sum(widths.values())
+        dropped = []
+        
+        for col in sorted(widths, key=widths.get, reverse=True):
+            if total <= budget_chars or len(widths) - len(dropped) <= 1:
+                break
+            dropped.append(col)
+            total -= widths[col]
+        
+        if dropped:
+            logger.info(f"✂️  Dropped {len(dropped)} wide column(s) from the analysis prompt")
+            for record in records:
+                for col in dropped:
+                    record.pop(col, None)
+        
+        return records
+    
     def recommend_chart_type(self, question: str, results: pd.DataFrame) -> str:
         """
         Recommend appropriate chart type for results
@@ -278,20 +777,43 @@ class NLtoSQLConverter:
             if len(results) == 0:
                 return "table"
             
-            # Simple heuristics
+            columns = results.columns.tolist()
+            dtypes = results.dtypes
+            
+            numeric_cols = [
+                col for col in columns
+                if is_numeric_dtype(dtypes[col]) and not is_bool_dtype(dtypes[col])
+            ]
+            datetime_cols = [col for col in columns if is_datetime64_any_dtype(dtypes[col])]
+            categorical_cols = [
+                col for col in columns
+                if col not in numeric_cols and col not in datetime_cols
+            ]
+            
+            # Time series: a date column (or a column named like one) plus a measure
+            if numeric_cols and (
+                datetime_cols or (len(columns) > 1 and 'date' in str(columns[0]).lower())
+            ):
+                return "line"
+            
+            # Larger result sets are easier to read as a table
             if len(results) > 50:
                 return "table"
             
-            columns = results.columns.tolist()
-            
             if len(columns) == 2:
-                # Two columns - likely category and value
-                if results[columns[1]].dtype in ['int64', 'float64']:
+                if len(categorical_cols) == 1 and len(numeric_cols) == 1:
+                    # Category and value - a pie for a few parts of a whole
+                    n_categories = results[categorical_cols[0]].nunique()
+                    if (
+                        n_categories <= 6
+                        and _PROPORTION_RE.search(question)
+                        and (results[numeric_cols[0]] >= 0).all()
+                    ):
+                        return "pie"
                     return "bar"
-            
-            # Check if first column looks like dates
-            if len(columns) > 1 and 'date' in columns[0].lower():
-                return "line"
+                
+                if len(numeric_cols) == 2:
+                    return "scatter"
             
             # Default to table
             return "table"
@@ -301,6 +823,29 @@ class NLtoSQLConverter:
             return "table"
 
 
-# Global instance
-nl_to_sql_converter = NLtoSQLConverter()
+# Global instance, created on first use
+_instance: Optional[NLtoSQLConverter] = None
+_instance_lock = threading.Lock()
+
+
+def get_nl_to_sql_converter() -> NLtoSQLConverter:
+    """
+    Get the shared NLtoSQLConverter, creating it on first use
+    
+    Returns:
+        NLtoSQLConverter instance
+    """
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = NLtoSQLConverter()
+    return _instance
+
+
+def __getattr__(name: str):
+    """Resolve the lazy global nl_to_sql_converter (PEP 562)"""
+    if name == "nl_to_sql_converter":
+        return get_nl_to_sql_converter()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
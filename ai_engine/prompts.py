@@ -3,14 +3,457 @@ Prompt Templates for Gemini AI
 Contains all prompt templates for NL to SQL conversion and data analysis
 """
 
-from typing import Dict, List, Any
+import re
+import warnings
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+import orjson
+
+
+# Schema-agnostic worked examples. Each task's static prefix carries the
+# examples of its own kind, so they reach the model on every request.
+FEW_SHOT_EXAMPLES = """Example 1 - SQL generation
+Table name: data
+Columns:
+- order_id: INTEGER
+- customer: TEXT
+- region: TEXT
+- amount: NUMERIC
+- order_date: DATE
+Question: What is the total amount by region?
+SQL Query:
+SELECT region, SUM(amount) AS total_amount FROM data GROUP BY region ORDER BY total_amount DESC
+
+Example 2 - SQL generation
+Table name: data
+Columns:
+- product: TEXT
+- category: TEXT
+- price: NUMERIC
+- units_sold: INTEGER
+Question: Show the top 5 products by units sold
+SQL Query:
+SELECT product, units_sold FROM data ORDER BY units_sold DESC LIMIT 5
+
+Example 3 - SQL generation
+Table name: data
+Columns:
+- employee: TEXT
+- department: TEXT
+- salary: NUMERIC
+- hire_date: DATE
+Question: What is the average salary in each department?
+SQL Query:
+SELECT department, AVG(salary) AS average_salary FROM data GROUP BY department ORDER BY average_salary DESC
+
+Example 4 - SQL generation
+Table name: data
+Columns:
+- ticket_id: INTEGER
+- status: TEXT
+- priority: TEXT
+- created_at: DATE
+Question: How many tickets are still open?
+SQL Query:
+SELECT COUNT(*) AS open_tickets FROM data WHERE status = 'open'
+
+Example 5 - SQL generation
+Table name: data
+Columns:
+- city: TEXT
+- temperature: NUMERIC
+- reading_date: DATE
+Question: Which city had the highest temperature?
+SQL Query:
+SELECT city, MAX(temperature) AS max_temperature FROM data GROUP BY city ORDER BY max_temperature DESC LIMIT 1
+
+Example 6 - SQL generation
+Table name: data
+Columns:
+- order_id: INTEGER
+- amount: NUMERIC
+- order_date: DATE
+Question: Show total sales per month
+SQL Query:
+SELECT strftime(CAST(order_date AS DATE), '%Y-%m') AS month, SUM(amount) AS total_sales FROM data GROUP BY month ORDER BY month
+
+Example 7 - SQL generation
+Table name: data
+Columns:
+- student: TEXT
+- subject: TEXT
+- score: NUMERIC
+Question: List students who scored above 90 in math
+SQL Query:
+SELECT student, score FROM data WHERE subject = 'math' AND score > 90 ORDER BY score DESC
+
+Example 8 - SQL generation
+Table name: data
+Columns:
+- customer: TEXT
+- plan: TEXT
+- monthly_fee: NUMERIC
+- active: BOOLEAN
+Question: How many active customers are there on each plan?
+SQL Query:
+SELECT plan, COUNT(*) AS active_customers FROM data WHERE active = 1 GROUP BY plan ORDER BY active_customers DESC
+
+Example 9 - SQL generation
+Table name: data
+Columns:
+- listing_id: INTEGER
+- neighbourhood: TEXT
+- bedrooms: INTEGER
+- price: NUMERIC
+Question: What is the price range for two-bedroom listings?
+SQL Query:
+SELECT MIN(price) AS min_price, MAX(price) AS max_price FROM data WHERE bedrooms = 2
+
+Example 10 - SQL generation
+Table name: data
+Columns:
+- flight: TEXT
+- airline: TEXT
+- delay_minutes: NUMERIC
+Question: Which airlines have an average delay of more than 15 minutes?
+SQL Query:
+SELECT airline, AVG(delay_minutes) AS avg_delay FROM data GROUP BY airline HAVING AVG(delay_minutes) > 15 ORDER BY avg_delay DESC
+
+Example 11 - SQL correction
+Original SQL Query:
+SELECT Region, SUM(amount) FROM data GROUP BY Region
+Error Message:
+Binder Error: Referenced column "Region" not found in FROM clause!
+Available Columns: order_id, customer, region, amount, order_date
+Corrected SQL Query:
+SELECT region, SUM(amount) AS total_amount FROM data GROUP BY region
+
+Example 12 - SQL correction
+Original SQL Query:
+SELECT category, AVG(price) FROM data ORDER BY AVG(price) DESC
+Error Message:
+Binder Error: column "category" must appear in the GROUP BY clause or must be part of an aggregate function.
+Available Columns: product, category, price, units_sold
+Corrected SQL Query:
+SELECT category, AVG(price) AS average_price FROM data GROUP BY category ORDER BY average_price DESC
+
+Example 13 - Query explanation
+Original Question: What is the total amount by region?
+SQL Query: SELECT region, SUM(amount) AS total_amount FROM data GROUP BY region ORDER BY total_amount DESC
+Explanation:
+This adds up the order amounts for each region and lists the regions from the highest total to the lowest.
+
+Example 14 - Query explanation
+Original Question: How many tickets are still open?
+SQL Query: SELECT COUNT(*) AS open_tickets FROM data WHERE status = 'open'
+Explanation:
+This counts the tickets whose status is still open, giving a single number of unresolved tickets.
+
+Example 15 - Results analysis
+Question: What is the average salary in each department?
+Results (3 rows):
+{"department":"Engineering","average_salary":98000.0}
+{"department":"Sales","average_salary":72000.0}
+{"department":"Support","average_salary":51000.0}
+Analysis:
+Engineering has the highest average salary at 98,000, about 36% more than Sales at 72,000. Support has the lowest average at 51,000, roughly half of Engineering. Pay differs considerably between departments.
+
+Example 16 - Results analysis
+Question: Show the top 5 products by units sold
+Results (5 rows):
+{"product":"Widget A","units_sold":1200}
+{"product":"Widget B","units_sold":950}
+{"product":"Gadget C","units_sold":610}
+{"product":"Gadget D","units_sold":580}
+{"product":"Tool E","units_sold":300}
+Analysis:
+Widget A leads with 1,200 units sold, followed by Widget B at 950. Together the two widgets account for about two thirds of the units sold by the top five. Sales fall off sharply after the top two products.
+
+Example 17 - SQL generation
+Table name: data
+Columns:
+- patient_id: INTEGER
+- ward: TEXT
+- admission_date: DATE
+- length_of_stay: INTEGER
+Question: How many patients were admitted in 2023 per ward?
+SQL Query:
+SELECT ward, COUNT(*) AS admissions FROM data WHERE admission_date >= '2023-01-01' AND admission_date < '2024-01-01' GROUP BY ward ORDER BY admissions DESC
+
+Example 18 - SQL generation
+Table name: data
+Columns:
+- store: TEXT
+- revenue: NUMERIC
+- cost: NUMERIC
+Question: Which stores have the best profit margin?
+SQL Query:
+SELECT store, (revenue - cost) / revenue * 100 AS profit_margin FROM data WHERE revenue > 0 ORDER BY profit_margin DESC LIMIT 10
+
+Example 19 - SQL generation
+Table name: data
+Columns:
+- country: TEXT
+- year: INTEGER
+- population: NUMERIC
+Question: What percentage of the total population does each country have?
+SQL Query:
+SELECT country, population * 100.0 / (SELECT SUM(population) FROM data) AS population_share FROM data ORDER BY population_share DESC
+
+Example 20 - Query explanation
+Original Question: Which stores have the best profit margin?
+SQL Query: SELECT store, (revenue - cost) / revenue * 100 AS profit_margin FROM data WHERE revenue > 0 ORDER BY profit_margin DESC LIMIT 10
+Explanation:
+This works out what share of each store's revenue is left after costs and shows the ten stores that keep the largest share.
+
+Example 21 - Results analysis
+Question: How many active customers are there on each plan?
+Results (3 rows):
+{"plan":"Basic","active_customers":420}
+{"plan":"Pro","active_customers":215}
+{"plan":"Enterprise","active_customers":38}
+Analysis:
+Most active customers are on the Basic plan (420), nearly twice as many as on Pro (215). Enterprise has only 38 active customers, under 6% of the total, so growth there would come from a small base."""
+
+# Example kind -> task, matching the TASK_* constants of PromptTemplates
+_EXAMPLE_TASKS = {
+    'SQL generation': 'sql',
+    'SQL correction': 'fix_sql',
+    'Query explanation': 'explain',
+    'Results analysis': 'analyze',
+}
+
+
+def _split_examples(examples: str) -> Dict[str, str]:
+    """
+    Group the worked examples by task, renumbered within each task
+    
+    Args:
+        examples: Example blocks, each starting with "Example N - <kind>"
+    
+    Returns:
+        Dictionary of task name -> "**Worked Examples:**" block
+    """
+    grouped: Dict[str, List[str]] = {}
+    for block in re.split(r'\n\n(?=Example \d+ - )', examples.strip()):
+        header, _, body = block.partition('\n')
+        kind = header.split(' - ', 1)[1]
+        task_examples = grouped.setdefault(_EXAMPLE_TASKS[kind], [])
+        task_examples.append(f"Example {len(task_examples) + 1}\n{body}")
+    return {
+        task: "**Worked Examples:**\n\n" + "\n\n".join(blocks)
+        for task, blocks in grouped.items()
+    }
+
+
+_TASK_EXAMPLES = _split_examples(FEW_SHOT_EXAMPLES)
+
+
+def _to_json(value: Any) -> str:
+    """
+    Serialize prompt data as compact JSON
+    
+    Handles numpy scalars natively; other non-JSON values (timestamps,
+    decimals) fall back to str().
+    
+    Args:
+        value: Dict or list to serialize
+    
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+@lru_cache(maxsize=32)
+def _render_schema_block(schema_items: Tuple[Tuple[str, Any], ...], table_name: str) -> str:
+    """
+    Render the schema section of the NL to SQL prompt
+    
+    The schema is stable for an uploaded dataset, so the rendered block is
+    reused across questions and keeps the prompt prefix byte-identical.
+    
+    Args:
+        schema_items: Tuple of (column, type) pairs in column order
+        table_name: Name of the table
+    
+    Returns:
+        Schema block string
+    """
+    columns_info = "\n".join([
+        f"- {col}: {dtype}"
+        for col, dtype in schema_items
+    ])
+    
+    return f"""**Task:** SQL generation
+
+**Database Schema:**
+Table name: {table_name}
+Columns:
+{columns_info}"""
+
+
+@lru_cache(maxsize=512)
+def _render_nl_to_sql_dynamic(question: str, schema_items: Tuple[Tuple[str, Any], ...], table_name: str) -> str:
+    """
+    Render the per-request part of the NL to SQL prompt
+    
+    Streamlit reruns and reworded questions repeat the same inputs often,
+    so rendered prompts are cached.
+    
+    Args:
+        question: Natural language question
+        schema_items: Tuple of (column, type) pairs in column order
+        table_name: Name of the table
+    
+    Returns:
+        Formatted prompt string
+    """
+    return _append_question(_render_schema_block(schema_items, table_name), question)
+
+
+def _append_question(schema_block: str, question: str) -> str:
+    """
+    Append the user question to a rendered schema block
+    
+    Args:
+        schema_block: Output of _render_schema_block
+        question: Natural language question
+    
+    Returns:
+        Formatted prompt string
+    """
+    return f"""{schema_block}
+
+**Question:** {question}
+
+**SQL Query:**"""
+
+
+@lru_cache(maxsize=256)
+def _render_suggest_questions_prompt(
+    columns: Tuple[str, ...],
+    column_samples: Tuple[Tuple[str, Tuple[Tuple[str, Any], ...]], ...]
+) -> str:
+    """
+    Render the question suggestion prompt
+    
+    Args:
+        columns: Column names
+        column_samples: Per-column (column, ((stat, value), ...)) pairs
+    
+    Returns:
+        Formatted prompt string
+    """
+    columns_info = ", ".join(columns)
+    
+    sample_rows_str = "\n".join([
+        f"- {col}: {_to_json(dict(stats))}"
+        for col, stats in column_samples
+    ])
+    
+    return f"""Based on a dataset, suggest 5 interesting questions that users might want to ask.
+
+**Instructions:**
+1. Suggest 5 specific, actionable questions
+2. Questions should be answerable with the available columns
+3. Include a mix of:
+   - Aggregation questions (sum, average, count)
+   - Comparison questions (which, what, top/bottom)
+   - Trend questions (if date columns exist)
+4. Make questions specific to this data
+5. Format as a numbered list
+
+**Available Columns:** {columns_info}
+
+**Column Samples:**
+{sample_rows_str}
+
+**Suggested Questions:**"""
 
 
 class PromptTemplates:
     """
     Collection of prompt templates for various AI tasks
+    
+    The task prompts are split into a static instruction block, which never
+    changes and can be cached by Gemini, and a dynamic part holding the
+    per-request schema, question and results. Every template puts invariant
+    text first and per-request values last so that provider-side prefix
+    caching can match the longest possible prefix. Never add timestamps or
+    session ids to a prompt prefix.
     """
     
+    # Task names used by GeminiHandler to look up static instruction blocks
+    TASK_SQL = "sql"
+    TASK_FIX_SQL = "fix_sql"
+    TASK_EXPLAIN = "explain"
+    TASK_ANALYZE = "analyze"
+    
+    @staticmethod
+    def nl_to_sql_static() -> str:
+        """
+        Static instructions for converting natural language to SQL
+        
+        Returns:
+            Instruction block string
+        """
+        return """You are an expert SQL query generator. Convert natural language questions into valid SQL queries.
+
+**SQL Generation Instructions:**
+1. Generate ONLY the SQL query, no explanations
+2. Write DuckDB SQL (SELECT, WHERE, GROUP BY, ORDER BY, etc.); date columns may be stored as text, so CAST them to DATE before date functions, e.g. strftime(CAST(order_date AS DATE), '%Y-%m')
+3. Query only the table named in the schema
+4. Use appropriate aggregations (SUM, AVG, COUNT, MAX, MIN) when needed
+5. Handle date comparisons if the question involves time
+6. Use LIMIT clause if the question asks for "top N" results
+7. Return only the SQL query without any markdown formatting or code blocks"""
+    
+    @staticmethod
+    def nl_to_sql_dynamic(question: str, table_schema: Dict[str, Any], table_name: str = "data") -> str:
+        """
+        Per-request part of the NL to SQL prompt
+        
+        Args:
+            question: Natural language question
+            table_schema: Dictionary with column names and types
+            table_name: Name of the table (default: "data")
+        
+        Returns:
+            Formatted prompt string
+        """
+        # Tuple (not frozenset) so the column order of the prompt is preserved
+        return _render_nl_to_sql_dynamic(question, tuple(table_schema.items()), table_name)
+    
+    @staticmethod
+    def nl_to_sql_schema_prefix(table_schema: Dict[str, Any], table_name: str = "data") -> str:
+        """
+        Schema part of the NL to SQL prompt, shared by every question on a dataset
+        
+        Args:
+            table_schema: Dictionary with column names and types
+            table_name: Name of the table (default: "data")
+        
+        Returns:
+            Schema block string
+        """
+        return _render_schema_block(tuple(table_schema.items()), table_name)
+    
+    @staticmethod
+    def nl_to_sql_with_prefix(schema_prefix: str, question: str) -> str:
+        """
+        Per-request part of the NL to SQL prompt from a precomputed schema prefix
+        
+        Args:
+            schema_prefix: Output of nl_to_sql_schema_prefix()
+            question: Natural language question
+        
+        Returns:
+            Formatted prompt string, identical to nl_to_sql_dynamic()
+        """
+        return _append_question(schema_prefix, question)
+    
     @staticmethod
     def nl_to_sql_prompt(question: str, table_schema: Dict[str, Any], table_name: str = "data") -> str:
         """
@@ -24,37 +467,30 @@ class PromptTemplates:
         Returns:
             Formatted prompt string
         """
-        columns_info = "\n".join([
-            f"- {col}: {dtype}" 
-            for col, dtype in table_schema.items()
-        ])
+        return (
+            PromptTemplates.static_prefix(PromptTemplates.TASK_SQL) + "\n\n" +
+            PromptTemplates.nl_to_sql_dynamic(question, table_schema, table_name)
+        )
+    
+    @staticmethod
+    def explain_query_static() -> str:
+        """
+        Static instructions for explaining a SQL query
         
-        prompt = f"""You are an expert SQL query generator. Convert the following natural language question into a valid SQL query.
-
-**Database Schema:**
-Table name: {table_name}
-Columns:
-{columns_info}
-
-**Question:** {question}
-
-**Instructions:**
-1. Generate ONLY the SQL query, no explanations
-2. Use standard SQL syntax (SELECT, WHERE, GROUP BY, ORDER BY, etc.)
-3. Table name is '{table_name}'
-4. Use appropriate aggregations (SUM, AVG, COUNT, MAX, MIN) when needed
-5. Handle date comparisons if the question involves time
-6. Use LIMIT clause if the question asks for "top N" results
-7. Return only the SQL query without any markdown formatting or code blocks
+        Returns:
+            Instruction block string
+        """
+        return """Explain SQL queries in simple, non-technical language.
 
-**SQL Query:**"""
-        
-        return prompt
+**Explanation Instructions:**
+1. Explain what the query does in 1-2 sentences
+2. Use simple language that non-technical users can understand
+3. Focus on the business logic, not SQL syntax"""
     
     @staticmethod
-    def explain_query_prompt(sql_query: str, question: str) -> str:
+    def explain_query_dynamic(sql_query: str, question: str) -> str:
         """
-        Generate prompt to explain a SQL query in simple terms
+        Per-request part of the query explanation prompt
         
         Args:
             sql_query: The SQL query to explain
@@ -63,64 +499,78 @@ Columns:
         Returns:
             Formatted prompt string
         """
-        prompt = f"""Explain the following SQL query in simple, non-technical language.
+        return f"""**Task:** Query explanation
 
 **Original Question:** {question}
 
 **SQL Query:** {sql_query}
 
-**Instructions:**
-1. Explain what the query does in 1-2 sentences
-2. Use simple language that non-technical users can understand
-3. Focus on the business logic, not SQL syntax
-
 **Explanation:**"""
+    
+    @staticmethod
+    def explain_query_prompt(sql_query: str, question: str) -> str:
+        """
+        Generate prompt to explain a SQL query in simple terms
         
-        return prompt
+        Args:
+            sql_query: The SQL query to explain
+            question: Original natural language question
+        
+        Returns:
+            Formatted prompt string
+        """
+        return (
+            PromptTemplates.static_prefix(PromptTemplates.TASK_EXPLAIN) + "\n\n" +
+            PromptTemplates.explain_query_dynamic(sql_query, question)
+        )
     
     @staticmethod
-    def suggest_questions_prompt(table_schema: Dict[str, Any], sample_data: List[Dict]) -> str:
+    def suggest_questions_prompt(table_schema: Dict[str, Any], sample_data: Dict[str, Dict[str, Any]]) -> str:
         """
         Generate prompt to suggest interesting questions about the data
         
         Args:
             table_schema: Dictionary with column names and types
-            sample_data: Sample rows from the dataset
+            sample_data: Compact per-column sample (example values, min/max)
         
         Returns:
             Formatted prompt string
         """
-        columns_info = ", ".join(table_schema.keys())
+        columns = tuple(table_schema.keys())
+        column_samples = tuple(
+            (col, tuple(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in stats.items()
+            ))
+            for col, stats in sample_data.items()
+        )
         
-        sample_rows = "\n".join([
-            str(row) for row in sample_data[:3]
-        ])
+        try:
+            return _render_suggest_questions_prompt(columns, column_samples)
+        except TypeError:
+            # Unhashable values - render without the cache
+            return _render_suggest_questions_prompt.__wrapped__(columns, column_samples)
+    
+    @staticmethod
+    def fix_sql_error_static() -> str:
+        """
+        Static instructions for fixing a failed SQL query
         
-        prompt = f"""Based on this dataset, suggest 5 interesting questions that users might want to ask.
-
-**Available Columns:** {columns_info}
-
-**Sample Data:**
-{sample_rows}
-
-**Instructions:**
-1. Suggest 5 specific, actionable questions
-2. Questions should be answerable with the available columns
-3. Include a mix of:
-   - Aggregation questions (sum, average, count)
-   - Comparison questions (which, what, top/bottom)
-   - Trend questions (if date columns exist)
-4. Make questions specific to this data
-5. Format as a numbered list
+        Returns:
+            Instruction block string
+        """
+        return """Fix SQL queries that produced an error.
 
-**Suggested Questions:**"""
-        
-        return prompt
+**SQL Correction Instructions:**
+1. Analyze the error and fix the query
+2. Ensure all column names match exactly (case-sensitive)
+3. Use correct DuckDB SQL syntax: strftime takes the date first and the format second, and text dates need CAST(column AS DATE)
+4. Return ONLY the corrected SQL query without explanations"""
     
     @staticmethod
-    def fix_sql_error_prompt(sql_query: str, error_message: str, table_schema: Dict[str, Any]) -> str:
+    def fix_sql_error_dynamic(sql_query: str, error_message: str, table_schema: Dict[str, Any]) -> str:
         """
-        Generate prompt to fix a SQL query that has errors
+        Per-request part of the SQL correction prompt
         
         Args:
             sql_query: The SQL query that failed
@@ -132,7 +582,9 @@ Columns:
         """
         columns_info = ", ".join(table_schema.keys())
         
-        prompt = f"""Fix the following SQL query that produced an error.
+        return f"""**Task:** SQL correction
+
+**Available Columns:** {columns_info}
 
 **Original SQL Query:**
 {sql_query}
@@ -140,22 +592,46 @@ Columns:
 **Error Message:**
 {error_message}
 
-**Available Columns:** {columns_info}
-
-**Instructions:**
-1. Analyze the error and fix the query
-2. Ensure all column names match exactly (case-sensitive)
-3. Use correct SQL syntax
-4. Return ONLY the corrected SQL query without explanations
-
 **Corrected SQL Query:**"""
+    
+    @staticmethod
+    def fix_sql_error_prompt(sql_query: str, error_message: str, table_schema: Dict[str, Any]) -> str:
+        """
+        Generate prompt to fix a SQL query that has errors
         
-        return prompt
+        Args:
+            sql_query: The SQL query that failed
+            error_message: Error message from execution
+            table_schema: Dictionary with column names and types
+        
+        Returns:
+            Formatted prompt string
+        """
+        return (
+            PromptTemplates.static_prefix(PromptTemplates.TASK_FIX_SQL) + "\n\n" +
+            PromptTemplates.fix_sql_error_dynamic(sql_query, error_message, table_schema)
+        )
     
     @staticmethod
-    def analyze_results_prompt(question: str, results: List[Dict], row_count: int) -> str:
+    def analyze_results_static() -> str:
         """
-        Generate prompt to analyze and summarize query results
+        Static instructions for analyzing query results
+        
+        Returns:
+            Instruction block string
+        """
+        return """Analyze and summarize query results in a clear, concise way.
+
+**Analysis Instructions:**
+1. Provide a 2-3 sentence summary of the key findings
+2. Highlight the most important insights
+3. Use specific numbers from the results
+4. Make it easy to understand for non-technical users"""
+    
+    @staticmethod
+    def analyze_results_dynamic(question: str, results: List[Dict], row_count: int) -> str:
+        """
+        Per-request part of the results analysis prompt
         
         Args:
             question: Original question
@@ -167,30 +643,83 @@ Columns:
         """
         # Show first few results
         sample_results = results[:5] if len(results) > 5 else results
-        results_str = "\n".join([str(row) for row in sample_results])
+        results_str = "\n".join([_to_json(row) for row in sample_results])
         
-        prompt = f"""Analyze and summarize the following query results in a clear, concise way.
+        return f"""**Task:** Results analysis
 
 **Question:** {question}
 
 **Results ({row_count} rows):**
 {results_str}
 
-**Instructions:**
-1. Provide a 2-3 sentence summary of the key findings
-2. Highlight the most important insights
-3. Use specific numbers from the results
-4. Make it easy to understand for non-technical users
-
 **Analysis:**"""
+    
+    @staticmethod
+    def analyze_results_prompt(question: str, results: List[Dict], row_count: int) -> str:
+        """
+        Generate prompt to analyze and summarize query results
         
-        return prompt
+        Args:
+            question: Original question
+            results: Query results
+            row_count: Number of rows returned
+        
+        Returns:
+            Formatted prompt string
+        """
+        return (
+            PromptTemplates.static_prefix(PromptTemplates.TASK_ANALYZE) + "\n\n" +
+            PromptTemplates.analyze_results_dynamic(question, results, row_count)
+        )
+    
+    @staticmethod
+    def static_prefix(task: str) -> str:
+        """
+        Get the static instruction block for a task, with its worked examples
+        
+        Args:
+            task: Task name (one of the TASK_* constants)
+        
+        Returns:
+            Instruction block string
+        """
+        static_blocks = {
+            PromptTemplates.TASK_SQL: PromptTemplates.nl_to_sql_static,
+            PromptTemplates.TASK_FIX_SQL: PromptTemplates.fix_sql_error_static,
+            PromptTemplates.TASK_EXPLAIN: PromptTemplates.explain_query_static,
+            PromptTemplates.TASK_ANALYZE: PromptTemplates.analyze_results_static,
+        }
+        return static_blocks[task]() + "\n\n" + _TASK_EXAMPLES[task]
+    
+    @staticmethod
+    def static_instruction_block() -> str:
+        """
+        Combined system instruction for Gemini context caching
+        
+        Holds the static prefix (instructions and worked examples) of every
+        task. Each dynamic prompt starts with a **Task:** line selecting the
+        instructions to follow.
+        
+        Returns:
+            System instruction string
+        """
+        return "\n\n".join([
+            "You are DataWise AI, an assistant that answers questions about tabular datasets. "
+            "Each request starts with a **Task:** line. Follow the instructions for that task below.",
+            PromptTemplates.static_prefix(PromptTemplates.TASK_SQL),
+            PromptTemplates.static_prefix(PromptTemplates.TASK_FIX_SQL),
+            PromptTemplates.static_prefix(PromptTemplates.TASK_EXPLAIN),
+            PromptTemplates.static_prefix(PromptTemplates.TASK_ANALYZE),
+        ])
     
     @staticmethod
     def chart_recommendation_prompt(question: str, results: List[Dict], columns: List[str]) -> str:
         """
         Generate prompt to recommend appropriate chart type
         
+        Deprecated: chart types are picked locally by
+        NLtoSQLConverter.recommend_chart_type without a Gemini call.
+        
         Args:
             question: Original question
             results: Query results
@@ -199,13 +728,13 @@ Columns:
         Returns:
             Formatted prompt string
         """
-        prompt = f"""Recommend the best chart type to visualize these query results.
-
-**Question:** {question}
-
-**Result Columns:** {', '.join(columns)}
-
-**Number of Rows:** {len(results)}
+        warnings.warn(
+            "chart_recommendation_prompt is deprecated; use NLtoSQLConverter.recommend_chart_type",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        
+        prompt = f"""Recommend the best chart type to visualize query results.
 
 **Available Chart Types:**
 - bar: For comparing categories
@@ -219,6 +748,12 @@ Columns:
 2. Respond with ONLY the chart type name (bar, line, pie, scatter, or table)
 3. No explanations, just the chart type
 
+**Result Columns:** {', '.join(columns)}
+
+**Number of Rows:** {len(results)}
+
+**Question:** {question}
+
 **Recommended Chart:**"""
         
         return prompt
@@ -226,4 +761,3 @@ Columns:
 
 # Global instance
 prompt_templates = PromptTemplates()
-
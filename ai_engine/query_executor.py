@@ -3,16 +3,279 @@ Query Executor
 Safely executes SQL queries on pandas DataFrames
 """
 
+import re
+import sqlite3
 import pandas as pd
-import pandasql as ps
-from typing import Optional, Tuple, Any
+from pandas.api.types import is_float_dtype
+from functools import lru_cache
+from typing import Optional, Tuple, Any, Iterator
 from loguru import logger
-import sys
-from pathlib import Path
 import time
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+from config import settings
+
+# DuckDB scans DataFrame columns in place; the SQLite fallback copies them
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+    logger.warning("⚠️  DuckDB not available. Queries will run through SQLite.")
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import sqlparse
+    from sqlparse import tokens as sql_tokens
+    SQLPARSE_AVAILABLE = True
+except ImportError:
+    SQLPARSE_AVAILABLE = False
+    logger.warning("⚠️  sqlparse not available. Falling back to regex query checks.")
+
+# Hot-path logging: arguments are callables, evaluated (and the message
+# formatted) only when a handler accepts the record
+_lazy_log = logger.opt(lazy=True)
+
+# Destructive statements, matched as whole words so columns such as
+# "updated_at" or "created_by" are allowed
+_FORBIDDEN_KEYWORDS = frozenset({'drop', 'delete', 'truncate', 'insert', 'update', 'alter', 'create'})
+_FORBIDDEN_RE = re.compile(
+    r'\b(' + '|'.join(sorted(_FORBIDDEN_KEYWORDS)) + r')\b',
+    re.IGNORECASE
+)
+_SELECT_RE = re.compile(r'\s*select\b', re.IGNORECASE)
+# DuckDB result types holding whole numbers wider than int64 (e.g. SUM(int))
+_WIDE_INTEGRAL_RE = re.compile(r'^(?:U?HUGEINT|DECIMAL\(\d+,\s*0\))$')
+_QUOTED_OR_COMMENT_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Trivial single-table queries answered from the DataFrame directly
+_FAST_LIMIT_RE = re.compile(r'^\s*select\s+\*\s+from\s+(\w+)\s+limit\s+(\d+)\s*$', re.IGNORECASE)
+_FAST_COUNT_RE = re.compile(
+    r'^\s*select\s+count\s*\(\s*\*\s*\)\s*(?:as\s+(\w+)\s+)?from\s+(\w+)\s*$',
+    re.IGNORECASE
+)
+
+# Errors a rewritten query can fix: unknown columns (both engines) and DuckDB
+# binder errors, e.g. SQLite-style function calls such as strftime('%Y', col)
+_FIXABLE_ERROR_RE = re.compile(r'column|binder error', re.IGNORECASE)
+
+# LIMIT at the very end of a query applies to the outermost SELECT
+_OUTER_LIMIT_RE = re.compile(r'\blimit\s+(\d+)(?:\s+offset\s+\d+)?\s*$', re.IGNORECASE)
+
+# Identifiers in a query: quoted ("..." / `...` / [...]) or bare words
+_IDENT_RE = re.compile(r'"((?:[^"]|"")+)"|`([^`]+)`|\[([^\]]+)\]|([A-Za-z_]\w*)')
+_COUNT_STAR_RE = re.compile(r'\bcount\s*\(\s*\*\s*\)', re.IGNORECASE)
+
+# Sample queries offered for testing
+_SAMPLE_QUERIES: Tuple[str, ...] = (
+    "SELECT * FROM data LIMIT 10",
+    "SELECT COUNT(*) as total_rows FROM data",
+    "SELECT * FROM data ORDER BY RANDOM() LIMIT 5",
+)
+
+# Statement keywords accepted as the first token of a read-only query
+_READ_ONLY_STARTS = ('SELECT', 'WITH')
+_CLAUSE_FLAGS = {
+    'GROUP BY': 'has_groupby',
+    'ORDER BY': 'has_orderby',
+    'LIMIT': 'has_limit',
+    'WHERE': 'has_where'
+}
+_AGGREGATES = frozenset({'SUM', 'AVG', 'COUNT', 'MAX', 'MIN'})
+
+# Regex fallback: one named group per flag, so matches need no
+# lower-casing or whitespace normalization
+_INFO_RE = re.compile(
+    r'\b(?:(?P<select>select)|(?P<has_groupby>group\s+by)|(?P<has_orderby>order\s+by)'
+    r'|(?P<has_limit>limit)|(?P<has_where>where))\b'
+    r'|\b(?P<has_aggregation>sum|avg|count|max|min)\s*\(',
+    re.IGNORECASE
+)
+
+
+def _first_keyword(sql_query: str) -> Optional[str]:
+    """
+    Get the first keyword of a query, skipping comments and whitespace
+    
+    Args:
+        sql_query: SQL query to inspect
+    
+    Returns:
+        Upper-case first keyword or None
+    """
+    if SQLPARSE_AVAILABLE:
+        statements = sqlparse.parse(sql_query)
+        if not statements:
+            return None
+        first = statements[0].token_first(skip_cm=True, skip_ws=True)
+        if first is None or first.ttype not in (sql_tokens.DML, sql_tokens.CTE):
+            return None
+        return first.normalized
+    
+    return 'SELECT' if _SELECT_RE.match(sql_query) else None
+
+
+def _narrow_integral_arrow(table: "pa.Table", positions: list) -> "pa.Table":
+    """
+    Cast HUGEINT / integral DECIMAL columns to int64 where every value fits
+    
+    Args:
+        table: Query result
+        positions: Indexes of the wide integral columns
+    
+    Returns:
+        Table with those columns as int64 (others unchanged)
+    """
+    for i in positions:
+        try:
+            table = table.set_column(i, table.field(i).name, pc.cast(table.column(i), pa.int64()))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Out of int64 range - keep the exact decimal
+            continue
+    return table
+
+
+def _narrow_integral_df(df: pd.DataFrame, positions: list) -> pd.DataFrame:
+    """
+    Turn float64 columns that came from HUGEINT back into integers
+    
+    Args:
+        df: Query result from fetch_df()
+        positions: Indexes of the wide integral columns
+    
+    Returns:
+        DataFrame with those columns as int64 (Int64 when they hold nulls)
+    """
+    for i in positions:
+        values = df.iloc[:, i]
+        present = values.dropna()
+        # Floats are exact integers only up to 2**53
+        if len(present) and present.abs().max() >= 2 ** 53:
+            continue
+        df.isetitem(i, values.astype('int64' if len(present) == len(values) else 'Int64'))
+    return df
+
+
+def _statement_count(sql_query: str) -> int:
+    """
+    Count the SQL statements in a query string
+    
+    Args:
+        sql_query: SQL text
+    
+    Returns:
+        Number of non-empty statements
+    """
+    if SQLPARSE_AVAILABLE:
+        return sum(1 for statement in sqlparse.split(sql_query) if statement.strip(' \t\n;'))
+    
+    # Without sqlparse: drop quoted text and comments, then any ";" separates
+    stripped = _QUOTED_OR_COMMENT_RE.sub(' ', sql_query).strip().rstrip(';')
+    return stripped.count(';') + 1 if stripped else 0
+
+
+@lru_cache(maxsize=256)
+def _query_info(sql_query: str) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Extract query flags in a single pass over the tokens
+    
+    Args:
+        sql_query: SQL query to analyze
+    
+    Returns:
+        Tuple of (key, value) pairs; immutable so it can be cached
+    """
+    if not SQLPARSE_AVAILABLE:
+        return _query_info_regex(sql_query)
+    
+    flags = dict.fromkeys(_CLAUSE_FLAGS.values(), False)
+    has_aggregation = False
+    statements = sqlparse.parse(sql_query)
+    is_select = bool(statements) and statements[0].get_type() == 'SELECT'
+    
+    if statements:
+        previous = None
+        for token in statements[0].flatten():
+            if token.is_whitespace or token.ttype in sql_tokens.Comment:
+                continue
+            
+            if token.ttype in sql_tokens.Keyword:
+                flag = _CLAUSE_FLAGS.get(token.normalized)
+                if flag:
+                    flags[flag] = True
+            
+            # Aggregates only count as function calls, so a column named
+            # "count" doesn't set the flag
+            if token.match(sql_tokens.Punctuation, '(') and previous is not None:
+                if previous.value.upper() in _AGGREGATES:
+                    has_aggregation = True
+            
+            previous = token
+    
+    return (
+        ('type', 'select' if is_select else 'unknown'),
+        ('has_aggregation', has_aggregation),
+        ('has_groupby', flags['has_groupby']),
+        ('has_orderby', flags['has_orderby']),
+        ('has_limit', flags['has_limit']),
+        ('has_where', flags['has_where'])
+    )
+
+
+@lru_cache(maxsize=256)
+def _extract_projected_cols(sql_query: str) -> Optional[frozenset]:
+    """
+    Collect every identifier a query could use as a column
+    
+    Deliberately over-inclusive: aliases, functions and keywords are kept
+    too, so matching them against the DataFrame never drops a needed column.
+    
+    Args:
+        sql_query: SQL query to analyze
+    
+    Returns:
+        Lower-case identifiers, or None if the query selects "*"
+    """
+    if '*' in _COUNT_STAR_RE.sub('', sql_query):
+        return None
+    
+    return frozenset(
+        next(group for group in match.groups() if group).lower()
+        for match in _IDENT_RE.finditer(sql_query)
+    )
+
+
+def _query_info_regex(sql_query: str) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Extract query flags in a single regex pass (used without sqlparse)
+    
+    Args:
+        sql_query: SQL query to analyze
+    
+    Returns:
+        Tuple of (key, value) pairs
+    """
+    found = set()
+    
+    for match in _INFO_RE.finditer(sql_query):
+        found.add(match.lastgroup)
+    
+    return (
+        ('type', 'select' if 'select' in found else 'unknown'),
+        ('has_aggregation', 'has_aggregation' in found),
+        ('has_groupby', 'has_groupby' in found),
+        ('has_orderby', 'has_orderby' in found),
+        ('has_limit', 'has_limit' in found),
+        ('has_where', 'has_where' in found)
+    )
 
 
 class QueryExecutor:
@@ -24,6 +287,22 @@ class QueryExecutor:
         """Initialize query executor"""
         self.max_rows = 10000  # Maximum rows to return
         self.timeout = 30  # Query timeout in seconds
+        self.conn = None
+        if DUCKDB_AVAILABLE:
+            # Generated SQL must not reach the filesystem or network
+            # (read_text, read_csv, glob, COPY ... TO, ATTACH), and the lock
+            # keeps a query from switching that back on
+            self.conn = duckdb.connect(":memory:", config={'enable_external_access': False})
+            self.conn.execute(f"PRAGMA threads={int(settings.query_threads)}")
+            self.conn.execute("SET lock_configuration = true")
+        # Worker threads for execute_query_async; DuckDB releases the GIL
+        # while a query runs, so independent queries execute in parallel
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.query_workers,
+            thread_name_prefix="query"
+        )
+        # Per-thread warm cursor and the DataFrames registered on it
+        self._local = threading.local()
     
     def execute_query(
         self, 
@@ -43,36 +322,24 @@ class QueryExecutor:
             Tuple of (success, results_df, error_message)
         """
         try:
-            # Validate inputs
-            if not sql_query or not isinstance(sql_query, str):
-                return False, None, "Invalid SQL query"
+            sql_query, error = self._prepare_query(sql_query, df)
+            if error:
+                return False, None, error
             
-            if df is None or len(df) == 0:
-                return False, None, "Dataset is empty"
+            results = self._fast_path(sql_query, df, table_name)
+            if results is not None:
+                _lazy_log.info("⚡ Answered without the SQL engine, returned {} rows", lambda: len(results))
+                return True, results, None
             
-            # Clean SQL query
-            sql_query = sql_query.strip()
+            _lazy_log.info("🔍 Executing SQL: {}...", lambda: sql_query[:100])
             
-            # Remove trailing semicolons
-            if sql_query.endswith(';'):
-                sql_query = sql_query[:-1]
-            
-            # Security checks - prevent destructive operations
-            sql_lower = sql_query.lower()
-            forbidden_keywords = ['drop', 'delete', 'truncate', 'insert', 'update', 'alter', 'create']
-            
-            for keyword in forbidden_keywords:
-                if keyword in sql_lower:
-                    return False, None, f"Forbidden SQL keyword: {keyword.upper()}"
-            
-            logger.info(f"🔍 Executing SQL: {sql_query[:100]}...")
-            
-            # Create local namespace with the DataFrame
-            local_vars = {table_name: df}
-            
-            # Execute query using pandasql
             start_time = time.time()
-            results = ps.sqldf(sql_query, local_vars)
+            # Uploads arrive with repetitive text already categorical
+            # (FileProcessor.optimize_dtypes), so no per-query encoding.
+            # SQLite copies every column it is given, while DuckDB prunes
+            # unused columns on its own
+            columns = self._projected_columns(sql_query, df) if self.conn is None else None
+            results = self._run_sql(self._limit_query(sql_query), df, table_name, columns=columns)
             execution_time = time.time() - start_time
             
             # Validate results
@@ -84,10 +351,90 @@ class QueryExecutor:
             
             # Limit rows if necessary
             if len(results) > self.max_rows:
-                logger.warning(f"⚠️  Results truncated to {self.max_rows} rows")
+                logger.warning("⚠️  Results truncated to {} rows", self.max_rows)
                 results = results.head(self.max_rows)
             
-            logger.info(f"✅ Query executed successfully in {execution_time:.2f}s, returned {len(results)} rows")
+            _lazy_log.info(
+                "✅ Query executed successfully in {:.2f}s, returned {} rows",
+                lambda: execution_time, lambda: len(results)
+            )
+            
+            return True, results, None
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"❌ Query execution error: {error_msg}")
+            return False, None, error_msg
+    
+    def execute_query_async(
+        self,
+        sql_query: str,
+        df: pd.DataFrame,
+        table_name: str = "data"
+    ) -> Future:
+        """
+        Execute SQL query on DataFrame in a worker thread
+        
+        Args:
+            sql_query: SQL query to execute
+            df: DataFrame to query
+            table_name: Name to use for the table in SQL
+        
+        Returns:
+            Future resolving to (success, results_df, error_message)
+        """
+        return self._pool.submit(self.execute_query, sql_query, df, table_name)
+    
+    def execute_query_arrow(
+        self,
+        sql_query: str,
+        df: pd.DataFrame,
+        table_name: str = "data"
+    ) -> Tuple[bool, Optional["pa.Table"], Optional[str]]:
+        """
+        Execute SQL query on DataFrame and return an Arrow table
+        
+        Skips the conversion back to pandas; row truncation is a zero-copy slice.
+        
+        Args:
+            sql_query: SQL query to execute
+            df: DataFrame to query
+            table_name: Name to use for the table in SQL
+        
+        Returns:
+            Tuple of (success, results_table, error_message)
+        """
+        if not PYARROW_AVAILABLE:
+            return False, None, "pyarrow is not installed"
+        
+        if self.conn is None:
+            # SQLite fallback - convert its DataFrame result
+            success, results, error = self.execute_query(sql_query, df, table_name)
+            if not success:
+                return success, None, error
+            return True, pa.Table.from_pandas(results, preserve_index=False), None
+        
+        try:
+            sql_query, error = self._prepare_query(sql_query, df)
+            if error:
+                return False, None, error
+            
+            _lazy_log.info("🔍 Executing SQL: {}...", lambda: sql_query[:100])
+            
+            start_time = time.time()
+            results = self._run_sql(
+                self._limit_query(sql_query), df, table_name, as_arrow=True
+            )
+            execution_time = time.time() - start_time
+            
+            if results.num_rows > self.max_rows:
+                logger.warning("⚠️  Results truncated to {} rows", self.max_rows)
+                results = results.slice(0, self.max_rows)
+            
+            logger.info(
+                "✅ Query executed successfully in {:.2f}s, returned {} rows",
+                execution_time, results.num_rows
+            )
             
             return True, results, None
             
@@ -96,6 +443,260 @@ class QueryExecutor:
             logger.error(f"❌ Query execution error: {error_msg}")
             return False, None, error_msg
     
+    def _prepare_query(self, sql_query: str, df: pd.DataFrame) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Validate inputs and clean a SQL query before execution
+        
+        Args:
+            sql_query: SQL query to execute
+            df: DataFrame to query
+        
+        Returns:
+            Tuple of (cleaned_query, error_message)
+        """
+        # Validate inputs
+        if not sql_query or not isinstance(sql_query, str):
+            return None, "Invalid SQL query"
+        
+        if df is None or len(df) == 0:
+            return None, "Dataset is empty"
+        
+        # Clean SQL query
+        sql_query = sql_query.strip()
+        
+        # Remove trailing semicolons
+        if sql_query.endswith(';'):
+            sql_query = sql_query[:-1]
+        
+        # One statement only - "COPY ...; SELECT ..." must not reach the engine
+        if _statement_count(sql_query) != 1:
+            return None, "Only a single SQL statement is allowed"
+        
+        # Security checks - prevent destructive operations
+        match = _FORBIDDEN_RE.search(sql_query)
+        if match:
+            return None, f"Forbidden SQL keyword: {match.group(1).upper()}"
+        
+        # Read-only queries only (COPY, ATTACH, PRAGMA, SET, ...)
+        if _first_keyword(sql_query) not in _READ_ONLY_STARTS:
+            return None, "Query must start with SELECT"
+        
+        return sql_query, None
+    
+    def _projected_columns(self, sql_query: str, df: pd.DataFrame) -> Optional[Tuple[int, ...]]:
+        """
+        Find the DataFrame columns a query can reference
+        
+        Args:
+            sql_query: Cleaned SQL query
+            df: DataFrame to query
+        
+        Returns:
+            Positions of the referenced columns, or None to keep every column
+        """
+        try:
+            identifiers = _extract_projected_cols(sql_query)
+            if identifiers is None:
+                return None
+            
+            keep = tuple(
+                i for i, col in enumerate(df.columns)
+                if str(col).lower() in identifiers
+            )
+            if not keep or len(keep) == len(df.columns):
+                return None
+            
+            return keep
+        
+        except Exception as e:
+            logger.warning(f"⚠️  Column pruning skipped: {e}")
+            return None
+    
+    def _fast_path(self, sql_query: str, df: pd.DataFrame, table_name: str) -> Optional[pd.DataFrame]:
+        """
+        Answer preview and row-count queries without the SQL engine
+        
+        Handles "SELECT * FROM <table> LIMIT k" and "SELECT COUNT(*) FROM <table>".
+        
+        Args:
+            sql_query: Cleaned SQL query
+            df: DataFrame to query
+            table_name: Name used for the table in SQL
+        
+        Returns:
+            Results DataFrame, or None if the query needs the engine
+        """
+        match = _FAST_LIMIT_RE.match(sql_query)
+        if match and match.group(1).lower() == table_name.lower():
+            return df.head(min(int(match.group(2)), self.max_rows)).reset_index(drop=True)
+        
+        match = _FAST_COUNT_RE.match(sql_query)
+        if match and match.group(2).lower() == table_name.lower():
+            # Same column name the engine would produce for an unaliased COUNT(*)
+            column = match.group(1) or ("count_star()" if self.conn is not None else "COUNT(*)")
+            return pd.DataFrame({column: [len(df)]})
+        
+        return None
+    
+    def _run_sql(
+        self,
+        sql_query: str,
+        df: pd.DataFrame,
+        table_name: str,
+        as_arrow: bool = False,
+        columns: Optional[Tuple[int, ...]] = None
+    ):
+        """
+        Run a SQL query against a DataFrame
+        
+        Args:
+            sql_query: SQL query to execute
+            df: DataFrame to query
+            table_name: Name to use for the table in SQL
+            as_arrow: Return a pyarrow Table instead of a DataFrame (DuckDB only)
+            columns: Column positions to load into SQLite (None for all)
+        
+        Returns:
+            Results DataFrame or Arrow table
+        """
+        if self.conn is None:
+            return pd.read_sql_query(sql_query, self._get_sqlite(table_name, df, columns))
+        
+        cursor = self._get_cursor()
+        self._register(cursor, table_name, df)
+        result = cursor.execute(sql_query)
+        
+        # SUM over integers is HUGEINT, which fetch_df() turns into float64
+        integral = [
+            i for i, column in enumerate(result.description)
+            if _WIDE_INTEGRAL_RE.match(str(column[1]))
+        ]
+        if not integral:
+            return result.fetch_arrow_table() if as_arrow else result.fetch_df()
+        
+        if not PYARROW_AVAILABLE:
+            return _narrow_integral_df(result.fetch_df(), integral)
+        
+        table = _narrow_integral_arrow(result.fetch_arrow_table(), integral)
+        return table if as_arrow else table.to_pandas()
+    
+    def _get_cursor(self):
+        """
+        Get the warm DuckDB cursor for the current thread
+        
+        A cursor is a separate connection to the same database, so concurrent
+        Streamlit sessions don't share registrations, while repeated queries
+        from one session reuse the same catalog.
+        
+        Returns:
+            DuckDB cursor
+        """
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+            self._local.registered = {}
+        return cursor
+    
+    def _get_sqlite(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        columns: Optional[Tuple[int, ...]] = None
+    ) -> sqlite3.Connection:
+        """
+        Get the current thread's SQLite connection with df loaded as a table
+        
+        The connection lives as long as the thread. The loaded table is keyed
+        on the source frame and the projected columns, so it is only written
+        again when a different frame, shape or column set is queried.
+        
+        Args:
+            table_name: Name to use for the table in SQL
+            df: Source DataFrame
+            columns: Column positions to load (None for all)
+        
+        Returns:
+            SQLite connection
+        """
+        conn = getattr(self._local, 'sqlite', None)
+        if conn is None:
+            conn = sqlite3.connect(":memory:")
+            self._local.sqlite = conn
+            self._local.sqlite_tables = {}
+        
+        loaded = self._local.sqlite_tables
+        current = loaded.get(table_name)
+        key = (df.shape, tuple(df.columns), columns)
+        # A weak reference doesn't keep the last frame alive, and a dead one
+        # can't match a new frame that reuses its id
+        if current is not None and current[0]() is df and current[1] == key:
+            return conn
+        
+        table = df if columns is None else df.iloc[:, list(columns)]
+        # Batched executemany inserts instead of a fresh database per query
+        table.to_sql(table_name, conn, if_exists='replace', index=False, chunksize=10000)
+        loaded[table_name] = (weakref.ref(df), key)
+        return conn
+    
+    def _register(self, cursor, table_name: str, df: pd.DataFrame):
+        """
+        Register a DataFrame on a cursor unless it is already registered
+        
+        Args:
+            cursor: DuckDB cursor
+            table_name: Name to use for the table in SQL
+            df: DataFrame to register
+        """
+        registered = self._local.registered
+        current = registered.get(table_name)
+        
+        # Holding the DataFrame keeps its id from being reused; the shape
+        # check catches columns added in place after registration
+        if current is not None and current[0] is df and current[1] == df.shape:
+            return
+        
+        cursor.register(table_name, df)
+        registered[table_name] = (df, df.shape)
+    
+    def _limit_query(self, sql_query: str) -> str:
+        """
+        Push the row limit into the query
+        
+        One extra row is requested so truncation can still be detected. A
+        single SELECT statement whose own outer LIMIT is already within
+        max_rows is left unchanged; anything else stays wrapped, so a stray
+        second statement is a syntax error rather than executed.
+        
+        Args:
+            sql_query: Cleaned SQL query
+        
+        Returns:
+            SQL query with an outer LIMIT
+        """
+        match = _OUTER_LIMIT_RE.search(sql_query)
+        if (
+            match and int(match.group(1)) <= self.max_rows
+            and _first_keyword(sql_query) == 'SELECT'
+            and _statement_count(sql_query) == 1
+        ):
+            return sql_query
+        
+        # Newlines keep a trailing "-- comment" from swallowing the parenthesis
+        return f"SELECT * FROM (\n{sql_query}\n) AS _user_q LIMIT {self.max_rows + 1}"
+    
+    def is_fixable_error(self, error: Optional[str]) -> bool:
+        """
+        Check whether a query error is worth asking the model to fix
+        
+        Args:
+            error: Error message from execute_query
+        
+        Returns:
+            True for column and binder errors
+        """
+        return bool(error) and _FIXABLE_ERROR_RE.search(error) is not None
+    
     def validate_query(self, sql_query: str) -> Tuple[bool, Optional[str]]:
         """
         Validate SQL query syntax without executing
@@ -116,15 +717,13 @@ class QueryExecutor:
                 return False, "Query is empty"
             
             # Check for forbidden keywords
-            sql_lower = sql_query.lower()
-            forbidden_keywords = ['drop', 'delete', 'truncate', 'insert', 'update', 'alter', 'create']
-            
-            for keyword in forbidden_keywords:
-                if keyword in sql_lower:
-                    return False, f"Forbidden SQL keyword: {keyword.upper()}"
+            match = _FORBIDDEN_RE.search(sql_query)
+            if match:
+                return False, f"Forbidden SQL keyword: {match.group(1).upper()}"
             
-            # Check if query starts with SELECT
-            if not sql_lower.strip().startswith('select'):
+            # Check if query starts with SELECT (or a WITH ... SELECT),
+            # ignoring leading comments
+            if _first_keyword(sql_query) not in _READ_ONLY_STARTS:
                 return False, "Query must start with SELECT"
             
             return True, None
@@ -142,56 +741,42 @@ class QueryExecutor:
         Returns:
             Dictionary with query information
         """
-        info = {
-            'type': 'unknown',
-            'has_aggregation': False,
-            'has_groupby': False,
-            'has_orderby': False,
-            'has_limit': False,
-            'has_where': False
-        }
-        
         try:
-            sql_lower = sql_query.lower()
-            
-            # Determine query type
-            if 'select' in sql_lower:
-                info['type'] = 'select'
-            
-            # Check for clauses
-            info['has_aggregation'] = any(agg in sql_lower for agg in ['sum(', 'avg(', 'count(', 'max(', 'min('])
-            info['has_groupby'] = 'group by' in sql_lower
-            info['has_orderby'] = 'order by' in sql_lower
-            info['has_limit'] = 'limit' in sql_lower
-            info['has_where'] = 'where' in sql_lower
-            
+            return dict(_query_info(sql_query))
         except Exception as e:
             logger.error(f"❌ Error getting query info: {e}")
-        
-        return info
+            return dict(_query_info(""))
     
-    def format_results(self, results: pd.DataFrame, max_display_rows: int = 100) -> pd.DataFrame:
+    def format_results(self, results, max_display_rows: int = 100):
         """
         Format query results for display
         
         Args:
-            results: Query results DataFrame
+            results: Query results DataFrame or Arrow table
             max_display_rows: Maximum rows to display
         
         Returns:
-            Formatted DataFrame
+            Formatted results of the same type
         """
         try:
             if len(results) == 0:
                 return results
             
-            # Limit display rows
-            display_df = results.head(max_display_rows).copy()
+            if PYARROW_AVAILABLE and isinstance(results, pa.Table):
+                return self._format_arrow_results(results, max_display_rows)
+            
+            # Limit display rows (a view - nothing is copied yet)
+            display_df = results.head(max_display_rows)
             
-            # Round numeric columns to 2 decimals
-            numeric_cols = display_df.select_dtypes(include=['float64']).columns
-            for col in numeric_cols:
-                display_df[col] = display_df[col].round(2)
+            # Round float columns (any width) to 2 decimals in one call and
+            # swap only those columns in; the others keep sharing their data
+            float_positions = [
+                i for i, dtype in enumerate(display_df.dtypes) if is_float_dtype(dtype)
+            ]
+            if float_positions:
+                rounded = display_df.iloc[:, float_positions].round(2)
+                display_df = display_df.copy(deep=False)
+                display_df.isetitem(float_positions, rounded)
             
             return display_df
             
@@ -199,28 +784,82 @@ class QueryExecutor:
             logger.error(f"❌ Error formatting results: {e}")
             return results
     
-    def results_to_dict(self, results: pd.DataFrame) -> dict:
+    def _format_arrow_results(self, results: "pa.Table", max_display_rows: int) -> "pa.Table":
+        """
+        Format an Arrow results table for display
+        
+        Args:
+            results: Query results table
+            max_display_rows: Maximum rows to display
+        
+        Returns:
+            Formatted table
+        """
+        # Zero-copy slice; float columns are rounded into new arrays and all
+        # other columns share their buffers with the original table
+        display_table = results.slice(0, max_display_rows)
+        
+        columns = [
+            pc.round(column, 2) if pa.types.is_floating(column.type) else column
+            for column in display_table.columns
+        ]
+        
+        return pa.Table.from_arrays(columns, schema=display_table.schema)
+    
+    def results_to_dict(self, results) -> dict:
         """
         Convert query results to dictionary format
         
         Args:
-            results: Query results DataFrame
+            results: Query results DataFrame or Arrow table
         
         Returns:
-            Dictionary with results metadata
+            Dictionary with results metadata and columnar data
+            ({column: [values]}); use rows_iter() for row dictionaries
         """
         try:
+            if PYARROW_AVAILABLE and isinstance(results, pa.Table):
+                return {
+                    'row_count': results.num_rows,
+                    'column_count': results.num_columns,
+                    'columns': results.column_names,
+                    'dtypes': {field.name: str(field.type) for field in results.schema},
+                    'data_columns': results.to_pydict()
+                }
+            
             return {
                 'row_count': len(results),
                 'column_count': len(results.columns),
                 'columns': results.columns.tolist(),
-                'dtypes': {col: str(dtype) for col, dtype in results.dtypes.items()},
-                'data': results.to_dict('records')
+                'dtypes': results.dtypes.astype(str).to_dict(),
+                'data_columns': results.to_dict(orient='list')
             }
         except Exception as e:
             logger.error(f"❌ Error converting results to dict: {e}")
             return {}
     
+    def rows_iter(self, results) -> Iterator[dict]:
+        """
+        Iterate over query results as row dictionaries
+        
+        Rows are produced one at a time instead of materializing a list of
+        dictionaries for the whole result.
+        
+        Args:
+            results: Query results DataFrame or Arrow table
+        
+        Yields:
+            Row dictionaries
+        """
+        if PYARROW_AVAILABLE and isinstance(results, pa.Table):
+            for batch in results.to_batches():
+                yield from batch.to_pylist()
+            return
+        
+        columns = results.columns.tolist()
+        for row in results.itertuples(index=False, name=None):
+            yield dict(zip(columns, row))
+    
     def get_sample_queries(self) -> list:
         """
         Get list of sample SQL queries for testing
@@ -228,12 +867,7 @@ class QueryExecutor:
         Returns:
             List of sample SQL queries
         """
-        return [
-            "SELECT * FROM data LIMIT 10",
-            "SELECT COUNT(*) as total_rows FROM data",
-            "SELECT * FROM data ORDER BY RANDOM() LIMIT 5",
-        ]
-
+        return list(_SAMPLE_QUERIES)
 
 # Global instance
 query_executor = QueryExecutor()
@@ -0,0 +1,255 @@
+"""
+Semantic Response Cache
+On-disk cache for Gemini responses with embedding-based lookup
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+# Numbers and quoted values - questions differing only in these embed almost
+# identically, but need different answers
+_LITERAL_RE = re.compile(r"\d+(?:\.\d+)?|'[^']*'|\"[^\"]*\"")
+
+
+class SemanticCache:
+    """
+    Cache Gemini responses in SQLite and serve them for semantically similar prompts.
+
+    A prompt is split into an exact part and a semantic part (usually the user's
+    question). Only entries whose exact part matches are considered, and among
+    those the semantic part is compared by cosine similarity of sentence
+    embeddings. Prompts without a semantic part are matched exactly.
+
+    Similarity hits also need the same numbers and quoted values, and the
+    table is bounded by a row cap and a TTL.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        model_name: Optional[str] = None,
+        threshold: Optional[float] = None
+    ):
+        """Initialize semantic cache"""
+        self.db_path = Path(db_path or settings.cache_dir / "gemini.sqlite")
+        self.model_name = model_name or settings.embedding_model
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        self._conn = None
+        self._encoder = None
+        self._encoder_failed = False
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Open the SQLite database on first use"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    context_hash TEXT NOT NULL,
+                    semantic_text TEXT NOT NULL,
+                    embedding BLOB,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_context ON responses (context_hash)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created_at)"
+            )
+            self._conn.commit()
+            logger.info(f"✅ Semantic cache ready: {self.db_path}")
+        return self._conn
+
+    def _get_encoder(self):
+        """Load the sentence-transformers model on first use"""
+        if self._encoder is None and not self._encoder_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._encoder = SentenceTransformer(self.model_name)
+                logger.info(f"✅ Semantic cache encoder loaded: {self.model_name}")
+            except Exception as e:
+                self._encoder_failed = True
+                logger.warning(f"⚠️  Semantic cache encoder unavailable, using exact matching: {e}")
+        return self._encoder
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Compute a normalized embedding for text"""
+        encoder = self._get_encoder()
+        if encoder is None:
+            return None
+        embedding = encoder.encode(text, normalize_embeddings=True)
+        return np.asarray(embedding, dtype=np.float32)
+
+    @staticmethod
+    def _split_prompt(prompt: str, namespace: str, semantic_text: Optional[str]) -> Tuple[str, str]:
+        """
+        Split prompt into (context_hash, semantic_text)
+
+        The semantic text is replaced by a placeholder before hashing so that
+        paraphrased questions share the same context.
+        """
+        if semantic_text and semantic_text in prompt:
+            exact_part = prompt.replace(semantic_text, "\x00")
+            semantic = " ".join(semantic_text.split())
+        else:
+            exact_part = prompt
+            semantic = ""
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(namespace.encode())
+        digest.update(b"\x00")
+        digest.update(exact_part.encode())
+        return digest.hexdigest(), semantic
+
+    def lookup(
+        self,
+        prompt: str,
+        namespace: str = "default",
+        semantic_text: Optional[str] = None,
+        threshold: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Find a cached response for a prompt
+
+        Args:
+            prompt: Full prompt sent to the model
+            namespace: Cache namespace (e.g. model name)
+            semantic_text: Part of the prompt compared by similarity
+            threshold: Minimum cosine similarity for a hit; 1.0 or more
+                accepts exact matches only
+
+        Returns:
+            Cached response text or None on miss
+        """
+        threshold = self.threshold if threshold is None else threshold
+
+        try:
+            context_hash, semantic = self._split_prompt(prompt, namespace, semantic_text)
+
+            with self._lock:
+                rows = self._get_connection().execute(
+                    "SELECT semantic_text, embedding, response FROM responses "
+                    "WHERE context_hash = ? AND created_at >= ?",
+                    (context_hash, self._cutoff())
+                ).fetchall()
+
+            if not rows:
+                return None
+
+            # Exact match first - also the only option without an encoder
+            for text, _, response in rows:
+                if text == semantic:
+                    return response
+
+            if not semantic or threshold >= 1.0:
+                return None
+
+            literals = _LITERAL_RE.findall(semantic)
+            candidates = [
+                (emb, response) for text, emb, response in rows
+                if emb is not None and _LITERAL_RE.findall(text) == literals
+            ]
+            if not candidates:
+                return None
+
+            query = self._embed(semantic)
+            if query is None:
+                return None
+
+            matrix = np.vstack([np.frombuffer(emb, dtype=np.float32) for emb, _ in candidates])
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+
+            if similarities[best] >= threshold:
+                logger.info(f"⚡ Semantic cache hit (similarity {similarities[best]:.3f})")
+                return candidates[best][1]
+
+            return None
+
+        except Exception as e:
+            logger.warning(f"⚠️  Semantic cache lookup failed: {e}")
+            return None
+
+    def store(
+        self,
+        prompt: str,
+        response: str,
+        namespace: str = "default",
+        semantic_text: Optional[str] = None
+    ) -> bool:
+        """
+        Persist a prompt/response pair
+
+        Args:
+            prompt: Full prompt sent to the model
+            response: Model response text
+            namespace: Cache namespace (e.g. model name)
+            semantic_text: Part of the prompt compared by similarity
+
+        Returns:
+            Success status
+        """
+        try:
+            context_hash, semantic = self._split_prompt(prompt, namespace, semantic_text)
+            embedding = self._embed(semantic) if semantic else None
+
+            with self._lock:
+                conn = self._get_connection()
+                conn.execute(
+                    "INSERT INTO responses (context_hash, semantic_text, embedding, response, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        context_hash,
+                        semantic,
+                        embedding.tobytes() if embedding is not None else None,
+                        response,
+                        time.time()
+                    )
+                )
+                self._evict(conn)
+                conn.commit()
+            return True
+
+        except Exception as e:
+            logger.warning(f"⚠️  Could not store response in semantic cache: {e}")
+            return False
+
+    @staticmethod
+    def _cutoff() -> float:
+        """Creation time before which responses have expired"""
+        return time.time() - settings.semantic_cache_ttl_days * 86400
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired responses and the oldest ones beyond the row cap"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (self._cutoff(),))
+        conn.execute(
+            "DELETE FROM responses WHERE id <= "
+            "(SELECT id FROM responses ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (settings.semantic_cache_max_rows,)
+        )
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+        logger.info("✅ Semantic cache cleared")
+
+
+# Global instance
+semantic_cache = SemanticCache()
@@ -4,33 +4,42 @@ Main Streamlit Application
 """
 
 import streamlit as st
+import hashlib
+import io
+import uuid
 import pandas as pd
 import google.generativeai as genai
 from pathlib import Path
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
 import sys
 from loguru import logger
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("⚠️  pyarrow not available. Preview tables will be converted by Streamlit on every rerun.")
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    logger.warning("⚠️  xxhash not available. DataFrame fingerprints will be hashed by Streamlit.")
+
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
 
 from config import settings
 from database.postgres_handler import db_handler, db_ops
-from database.vector_store import vector_store
 from utils.file_processor import file_processor
 from utils.data_validator import data_validator
 from utils.data_preview import data_previewer
-from ai_engine.gemini_handler import gemini_handler
-from ai_engine.nl_to_sql import nl_to_sql_converter
-from ai_engine.query_executor import query_executor
-from visualization.chart_generator import chart_generator
-from visualization.chart_customizer import chart_customizer
-from chat.chat_handler import chat_handler
-from chat.conversation_manager import conversation_manager
-from insights.insight_generator import insight_generator
-from reports.report_generator import report_generator
-from reports.pdf_exporter import pdf_exporter
-from reports.excel_exporter import excel_exporter
 
 # Configure page settings
 st.set_page_config(
@@ -69,11 +78,119 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource(show_spinner=False)
+def get_gemini_model():
+    """Configure Gemini and build the model client once per process"""
+    genai.configure(api_key=settings.gemini_api_key)
+    return genai.GenerativeModel(settings.gemini_model)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _db_ok() -> bool:
+    """Database status for the sidebar, refreshed at most every 30 seconds"""
+    return db_handler.test_connection()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _db_stats() -> dict:
+    """Row counts for the setup tab; each is a COUNT(*) over a whole table"""
+    return db_ops.get_database_stats()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _vector_collections() -> list:
+    """ChromaDB collection names for the setup tab"""
+    return _vector_store().list_collections()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_demo_user(username: str, email: str):
+    """Get or create the demo user once per process"""
+    user = db_ops.get_or_create_user(username, email)
+    if user is None:
+        # Raising keeps the failure out of the cache so the next rerun retries
+        raise RuntimeError(f"Could not load user {username}")
+    return user
+
+
+@st.cache_resource(show_spinner=False)
+def _db_executor() -> ThreadPoolExecutor:
+    """Background threads for database writes that the UI doesn't wait on"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="db-write")
+
+
+@st.cache_resource(show_spinner=False)
+def _background_executor() -> ThreadPoolExecutor:
+    """Background threads for analysis started ahead of the user asking for it"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+
+
+def _log_query_save(future: Future):
+    """Log the outcome of a background query history save"""
+    try:
+        if future.result() is None:
+            logger.warning("⚠️  Query was not saved to database")
+    except Exception as e:
+        logger.error(f"❌ Could not save query to database: {e}")
+
+
+def _save_dataset(uploaded_data: dict, column_info: dict, dataset_name: str):
+    """
+    Save uploaded dataset metadata to the database
+    
+    Returns:
+        Dataset ID, or None if saving failed
+    """
+    try:
+        # Get or create default user
+        user = _get_demo_user("demo_user", "demo@datawise.ai")
+        df = uploaded_data['dataframe']
+        file_info = uploaded_data['file_info']
+        
+        # Save dataset metadata
+        dataset = db_ops.create_dataset(
+            user_id=str(user.id),
+            name=dataset_name,
+            original_filename=file_info['original_name'],
+            file_path=uploaded_data['file_path'],
+            file_type=file_info['type'],
+            file_size_bytes=file_info['size_bytes'],
+            row_count=len(df),
+            column_count=len(df.columns),
+            columns=column_info,
+            description=f"Uploaded on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+        
+        return str(dataset.id) if dataset else None
+    except Exception as e:
+        logger.error(f"Auto-save failed: {e}")
+        return None
+
+
+@st.fragment(run_every=30)
+def _status_panel():
+    """Sidebar status checks, refreshed on their own every 30 seconds"""
+    # Check configuration
+    if settings.validate_gemini_key():
+        st.success("✅ Gemini API: Connected")
+    else:
+        st.error("❌ Gemini API: Not configured")
+    
+    # Database status
+    try:
+        if _db_ok():
+            st.success("✅ Database: Connected")
+        else:
+            st.error("❌ Database: Not connected")
+    except:
+        st.warning("⚠️  Database: Not initialized")
+
+
 def initialize_gemini():
     """Initialize Gemini AI with API key"""
     try:
         if settings.validate_gemini_key():
-            genai.configure(api_key=settings.gemini_api_key)
+            get_gemini_model()
             return True
         return False
     except Exception as e:
@@ -84,1316 +201,1676 @@ def initialize_gemini():
 def test_gemini_connection():
     """Test Gemini API connection"""
     try:
-        model = genai.GenerativeModel(settings.gemini_model)
+        model = get_gemini_model()
         response = model.generate_content("Say 'Hello, DataWise AI is ready!' in one sentence.")
         return True, response.text
     except Exception as e:
         return False, str(e)
 
 
-def main():
-    """Main application entry point"""
+# Severity display lookups
+SEVERITY_DISPATCH = {'error': st.error, 'warning': st.warning, 'info': st.info}
+SEVERITY_ICON = {'error': '🔴', 'warning': '🟡', 'info': '🔵'}
+ANOMALY_SEVERITY_ICON = {'critical': '🔴', 'high': '🟠', 'moderate': '🟡'}
+
+# Query history entries rendered in the Ask Questions tab
+HISTORY_PAGE_SIZE = 20
+
+# Result rows sent to the browser; the CSV download has the full result
+RESULT_DISPLAY_ROWS = 1000
+
+# Chat messages keep a preview of their results; full results are kept
+# (in session state) only for the most recent query answers
+CHAT_PREVIEW_ROWS = 50
+CHAT_FULL_RESULTS_KEPT = 5
+
+
+# Heavy feature modules are imported on first use, not on every cold start
+@st.cache_resource(show_spinner=False)
+def _vector_store():
+    """ChromaDB vector store, imported on first use"""
+    from database.vector_store import vector_store
+    return vector_store
+
+
+@st.cache_resource(show_spinner=False)
+def _nl_to_sql():
+    """NL to SQL converter, imported on first use"""
+    from ai_engine.nl_to_sql import nl_to_sql_converter
+    return nl_to_sql_converter
+
+
+@st.cache_resource(show_spinner=False)
+def _query_executor():
+    """SQL query executor, imported on first use"""
+    from ai_engine.query_executor import query_executor
+    return query_executor
+
+
+@st.cache_resource(show_spinner=False)
+def _chart_generator():
+    """Chart generator, imported on first use"""
+    from visualization.chart_generator import chart_generator
+    return chart_generator
+
+
+@st.cache_resource(show_spinner=False)
+def _chat_handler():
+    """Chat handler, imported on first use"""
+    from chat.chat_handler import chat_handler
+    return chat_handler
+
+
+@st.cache_resource(show_spinner=False)
+def _conversation_manager():
+    """Conversation manager, imported on first use"""
+    from chat.conversation_manager import conversation_manager
+    return conversation_manager
+
+
+@st.cache_resource(show_spinner=False)
+def _insight_generator():
+    """Insight generator, imported on first use"""
+    from insights.insight_generator import insight_generator
+    return insight_generator
+
+
+@st.cache_resource(show_spinner=False)
+def _report_generator():
+    """Report generator, imported on first use"""
+    from reports.report_generator import report_generator
+    return report_generator
+
+
+@st.cache_resource(show_spinner=False)
+def _pdf_exporter():
+    """PDF exporter, imported on first use"""
+    from reports.pdf_exporter import pdf_exporter
+    return pdf_exporter
+
+
+@st.cache_resource(show_spinner=False)
+def _excel_exporter():
+    """Excel exporter, imported on first use"""
+    from reports.excel_exporter import excel_exporter
+    return excel_exporter
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _process_file(name: str, size: int, digest: str, _blob: bytes) -> dict:
+    """
+    Process uploaded file bytes, cached by name, size and content digest
     
-    # Header
-    st.markdown('<div class="main-header">📊 DataWise AI</div>', unsafe_allow_html=True)
-    st.markdown('<div class="sub-header">Your Intelligent Data Analysis Companion</div>', unsafe_allow_html=True)
+    The leading underscore keeps Streamlit from hashing the raw bytes; the
+    blake2b digest identifies the content instead.
+    """
+    upload = io.BytesIO(_blob)
+    upload.name = name
+    upload.size = size
+    return file_processor.process_uploaded_file(upload)
+
+
+def _df_fingerprint(df: pd.DataFrame):
+    """Hash a DataFrame by shape, columns and content for st.cache_data"""
+    try:
+        content = pd.util.hash_pandas_object(df, index=False).values.tobytes()
+    except TypeError:
+        # Unhashable cell values (lists, dicts) - hash their string form
+        content = pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes()
+    if XXHASH_AVAILABLE:
+        # Streamlit would otherwise run MD5 over the full per-row hash buffer
+        content = xxhash.xxh3_64_intdigest(content)
+    return df.shape, tuple(map(str, df.columns)), content
+
+
+# Cached analysis helpers - recomputed only when the data itself changes
+_DF_HASH_FUNCS = {pd.DataFrame: _df_fingerprint}
+
+
+@st.cache_data(show_spinner=False, max_entries=16, hash_funcs=_DF_HASH_FUNCS)
+def _cached_insights(df: pd.DataFrame) -> dict:
+    """Generate comprehensive insights for a DataFrame"""
+    return _insight_generator().generate_comprehensive_insights(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=8, hash_funcs=_DF_HASH_FUNCS)
+def _cached_report(
+    df: pd.DataFrame,
+    title: str,
+    include_statistics: bool,
+    include_insights: bool,
+    insights_data: Optional[dict],
+    query_history: list
+) -> dict:
+    """Build a report, cached so re-clicking Generate with unchanged options is free"""
+    return _report_generator().create_report(
+        df=df,
+        title=title,
+        include_statistics=include_statistics,
+        include_insights=include_insights,
+        insights_data=insights_data,
+        query_history=query_history
+    )
+
+
+@st.cache_data(max_entries=8, show_spinner="📄 Creating PDF...")
+def _pdf_bytes(report: dict, filename: str) -> tuple:
+    """PDF export of a report, built once per report"""
+    return _pdf_exporter().export_to_pdf(report, filename=filename)
+
+
+@st.cache_data(max_entries=8, show_spinner="📊 Creating Excel...", hash_funcs=_DF_HASH_FUNCS)
+def _report_excel_bytes(report: dict, df: Optional[pd.DataFrame], filename: str) -> tuple:
+    """Excel export of a report (optionally with the raw data), built once per input"""
+    return _excel_exporter().export_to_excel(report, df=df, filename=filename)
+
+
+@st.cache_data(max_entries=4, show_spinner="📊 Creating Excel...", hash_funcs=_DF_HASH_FUNCS)
+def _data_excel_bytes(df: pd.DataFrame) -> tuple:
+    """Excel export of the dataset alone, built once per dataset"""
+    return _excel_exporter().export_dataframe_to_excel(df, filename="data_export.xlsx")
+
+
+def _dataset_insights(df: pd.DataFrame) -> dict:
+    """
+    Insights for the uploaded dataset
     
-    # Sidebar
-    with st.sidebar:
-        st.image("https://via.placeholder.com/300x100/1f77b4/ffffff?text=DataWise+AI", use_container_width=True)
-        st.markdown("---")
-        st.markdown("### 🚀 Features")
-        st.markdown("""
-        - 📁 Upload CSV, Excel, JSON
-        - 💬 Ask questions in natural language
-        - 📊 Auto-generate visualizations
-        - 🧠 AI-powered insights
-        - 📄 Generate reports
-        - 💾 Query history
-        """)
-        st.markdown("---")
-        st.markdown("### ⚙️ Status")
-        
-        # Check configuration
-        if settings.validate_gemini_key():
-            st.success("✅ Gemini API: Connected")
-        else:
-            st.error("❌ Gemini API: Not configured")
-        
-        # Database status
+    Uses the job started in the background at upload when there is one,
+    so the user usually doesn't wait for the whole pipeline.
+    """
+    future = st.session_state.get('_insights_future')
+    if future is not None:
         try:
-            if db_handler.test_connection():
-                st.success("✅ Database: Connected")
-            else:
-                st.error("❌ Database: Not connected")
-        except:
-            st.warning("⚠️  Database: Not initialized")
+            # The job runs this same pipeline, so keep waiting for it rather
+            # than starting a second run (and Gemini call) alongside it
+            return future.result()
+        except Exception as e:
+            logger.warning(f"⚠️  Background insights failed, generating now: {e}")
+    return _cached_insights(df)
+
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _cached_suggestions(schema_key: tuple, _df: pd.DataFrame) -> list:
+    """
+    Question suggestions, cached per dataset schema
+    
+    Only the (column, dtype) schema is hashed; the DataFrame is skipped.
+    """
+    return _nl_to_sql().suggest_questions(_df)
+
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _cached_chart(results: pd.DataFrame, question: str, chart_type: Optional[str] = None) -> tuple:
+    """Chart for a query result, cached per (result content, question, chart type)"""
+    return _chart_generator().auto_generate_chart(results, question=question, chart_type=chart_type)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _cached_post_query(question: str, sql_query: str, results: pd.DataFrame) -> dict:
+    """Explanation, analysis and chart type for a query result, one LLM round trip per result"""
+    return _nl_to_sql().post_query_bundle(question, sql_query, results)
+
+
+@st.cache_data(max_entries=8, show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _csv_bytes(results: pd.DataFrame) -> bytes:
+    """
+    Query results as CSV bytes for the download button
+    
+    pyarrow's writer produces bytes directly, without building the whole
+    file as a Python string first; pandas is the fallback.
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            buffer = io.BytesIO()
+            pa_csv.write_csv(
+                pa.Table.from_pandas(results, preserve_index=False),
+                buffer,
+                pa_csv.WriteOptions(quoting_style='needed')
+            )
+            return buffer.getvalue()
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            logger.warning(f"⚠️  pyarrow CSV export failed, using pandas: {e}")
+    return results.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _query_embedding(text: str) -> list:
+    """Embedding of a search text, computed once per distinct text"""
+    return _vector_store().embed_query(text)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _formatted_results(results_key: tuple, _results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Display copy of a query result, cached per result fingerprint
+    
+    Only results_key (see _df_fingerprint) is hashed; the DataFrame is skipped.
+    """
+    return _query_executor().format_results(_results, max_display_rows=RESULT_DISPLAY_ROWS)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _schema_prompt_prefix(schema_key: tuple) -> str:
+    """SQL prompt schema block, rendered once per dataset schema"""
+    return _nl_to_sql().build_schema_prompt(schema_key)
+
+
+class DataProfile(NamedTuple):
+    """Everything the data overview and preview tabs show for a dataset"""
+    # Tables are Arrow when pyarrow is available, so reruns skip the pandas conversion
+    head: Any
+    tail: Any
+    summary: dict
+    issues: list
+    col_info: Any
+    numeric: Any
+    categorical: dict
+    missing_chart: Any
+    dtype_chart: Any
+    corr_chart: Any
+
+
+def _col_info_df(stats: dict) -> pd.DataFrame:
+    """Build the Column Details table, one array per column"""
+    return pd.DataFrame({
+        'Column': list(stats),
+        'Type': [s['dtype'] for s in stats.values()],
+        'Unique': [s['unique_count'] for s in stats.values()],
+        'Missing': [s['null_count'] for s in stats.values()],
+        'Missing %': [f"{s['null_percentage']}%" for s in stats.values()]
+    })
+
+
+def _arrow(df: pd.DataFrame) -> Any:
+    """
+    Convert a display table to Arrow once, so st.dataframe can hand it over as is
+    
+    Falls back to the DataFrame (and Streamlit's own conversion) for columns
+    Arrow can't type, such as mixed objects.
+    """
+    if not PYARROW_AVAILABLE:
+        return df
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowException, ValueError, TypeError):
+        return df
+
+
+@st.cache_data(show_spinner=False, max_entries=16, hash_funcs=_DF_HASH_FUNCS)
+def _df_profile(df: pd.DataFrame) -> DataProfile:
+    """
+    Profile a DataFrame for the upload tab in one cached call
+    
+    A single cache entry means the DataFrame is hashed once per rerun
+    instead of once per summary or chart.
+    """
+    numeric_summary = data_previewer.get_numeric_summary(df)
+    
+    return DataProfile(
+        # Copies so the cached samples don't keep views into the full frame
+        head=_arrow(df.head(10).copy()),
+        tail=_arrow(df.tail(10).copy()),
+        summary=data_validator.get_data_summary(df),
+        issues=data_validator.detect_data_issues(df),
+        col_info=_arrow(_col_info_df(data_validator.get_column_statistics(df))),
+        numeric=_arrow(pd.DataFrame.from_dict(numeric_summary, orient='index')) if numeric_summary else None,
+        categorical=data_previewer.get_categorical_summary(df),
+        missing_chart=data_previewer.create_missing_data_chart(df),
+        dtype_chart=data_previewer.create_data_type_chart(df),
+        corr_chart=data_previewer.create_correlation_heatmap(df)
+    )
+
+
+def _show_results_table(results: pd.DataFrame, height: int = 400, total_rows: Optional[int] = None):
+    """
+    Show a query result table, capped at RESULT_DISPLAY_ROWS rows
+    
+    Pass total_rows when results is already a truncated display copy.
+    """
+    shown = results.head(RESULT_DISPLAY_ROWS)
+    total_rows = len(results) if total_rows is None else total_rows
+    st.dataframe(shown, use_container_width=True, height=height)
+    if total_rows > len(shown):
+        st.caption(f"Showing first {len(shown):,} of {total_rows:,} rows — download CSV for full data")
+
+
+@st.fragment
+def _query_history_panel():
+    """
+    Query history expander
+    
+    A fragment, so the Clear History button reruns only this panel.
+    """
+    st.markdown("---")
+    st.markdown("### 📜 Query History")
+    
+    history = st.session_state.query_history
+    with st.expander(f"View History ({len(history)} queries)", expanded=False):
+        # Only the most recent queries are rendered, newest first
+        n_queries = len(history)
+        for idx in range(n_queries - 1, max(-1, n_queries - 1 - HISTORY_PAGE_SIZE), -1):
+            query = history[idx]
+            st.markdown(f"""
+            **Query {idx + 1}** - {query['timestamp']}
+            - **Question:** {query['question']}
+            - **SQL:** `{query['sql']}`
+            - **Results:** {query['rows_returned']} rows
+            """)
+            st.markdown("---")
         
-        st.markdown("---")
-        st.markdown("### 📖 About")
-        st.info("""
-        **DataWise AI** helps you analyze data using natural language.
+        if n_queries > HISTORY_PAGE_SIZE:
+            st.caption(f"Showing the latest {HISTORY_PAGE_SIZE} of {n_queries} queries")
         
-        Built with:
-        - 🤖 Google Gemini AI
-        - 📊 Streamlit
-        - 🗄️ PostgreSQL
-        - 🔍 ChromaDB
-        """)
+        if st.button("🗑️  Clear History"):
+            st.session_state.query_history = []
+            st.rerun()
+
+
+@st.fragment
+def _chat_history_panel():
+    """Chat transcript, rendered as a fragment"""
+    for i, message in enumerate(st.session_state.chat_messages):
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            
+            # Show additional info for query results
+            if message.get("metadata"):
+                metadata = message["metadata"]
+                
+                if metadata.get("type") == "query_result":
+                    # Show SQL in expander
+                    with st.expander("🔍 View SQL Query"):
+                        st.code(metadata.get("sql", ""), language="sql")
+                    
+                    # Show results table
+                    preview = metadata.get("results")
+                    if preview is not None:
+                        row_count = metadata.get("row_count", len(preview))
+                        full = st.session_state.get('chat_results', {}).get(metadata.get("results_ref"))
+                        
+                        if full is not None and st.toggle(f"Show all {row_count:,} rows", key=f"chat_full_{metadata['results_ref']}"):
+                            _show_results_table(full, height=300)
+                        else:
+                            _show_results_table(preview, height=300)
+                            if row_count > len(preview):
+                                st.caption(f"📊 Showing first {len(preview)} of {row_count:,} rows")
+                            else:
+                                st.caption(f"📊 Showing {row_count} rows")
+
+
+def _chat_message_metadata(response: dict) -> dict:
+    """
+    Metadata to keep with a chat message
+    
+    Results are trimmed to a preview so the chat history doesn't hold every
+    result set; the full frame is kept for the latest answers only.
+    """
+    results = response.get("results")
+    if results is None or len(results) <= CHAT_PREVIEW_ROWS:
+        return response
     
-    # Main content area
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "🏠 Home", 
-        "📁 Upload Data", 
-        "💬 Ask Questions", 
-        "💭 Chat",
-        "📄 Reports",
-        "🔧 Setup Test", 
-        "📚 How to Use"
-    ])
-    
-    with tab1:
-        st.markdown("## Welcome to DataWise AI! 👋")
+    ref = uuid.uuid4().hex
+    store = st.session_state.setdefault('chat_results', OrderedDict())
+    store[ref] = results
+    while len(store) > CHAT_FULL_RESULTS_KEPT:
+        store.popitem(last=False)
+    
+    return {**response, "results": results.head(CHAT_PREVIEW_ROWS), "results_ref": ref}
+
+
+def _session_profile(df: pd.DataFrame) -> DataProfile:
+    """
+    DataProfile for df, kept in session state across reruns
+    
+    st.cache_data unpickles a fresh copy of every Plotly figure on each hit;
+    reruns for the same data reuse the objects from session state instead.
+    """
+    key = _df_fingerprint(df)
+    cached = st.session_state.get('_profile')
+    if cached is None or cached[0] != key:
+        cached = (key, _df_profile(df))
+        st.session_state['_profile'] = cached
+    return cached[1]
+
+
+def _render_home():
+    """Home tab"""
+    st.markdown("## Welcome to DataWise AI! 👋")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+        <div class="feature-card">
+            <h3>📁 Upload Data</h3>
+            <p>Easily upload CSV, Excel, or JSON files for analysis.</p>
+            <p><em>✅ Now Available!</em></p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="feature-card">
+            <h3>💬 Ask Questions</h3>
+            <p>Use natural language to query your data.</p>
+            <p><em>✅ Now Available!</em></p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="feature-card">
+            <h3>📊 Get Insights</h3>
+            <p>AI-powered visualizations and analysis.</p>
+            <p><em>✅ All Features Available!</em></p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    st.info("🚧 **Project Status:** Phase 8 Complete - Professional Report Generation!")
+    
+    # Project timeline
+    st.markdown("### 📅 Development Timeline")
+    progress_data = {
+        "Phase 1": "✅ Complete - Foundation",
+        "Phase 2": "✅ Complete - Database",
+        "Phase 3": "✅ Complete - File Upload",
+        "Phase 4": "✅ Complete - AI Integration",
+        "Phase 5": "✅ Complete - Visualizations",
+        "Phase 6": "✅ Complete - AI Insights",
+        "Phase 7": "✅ Complete - Chat Interface",
+        "Phase 8": "✅ Complete - Report Generation",
+        "Phase 9": "⏳ Next - Docker",
+    }
+    
+    for phase, status in progress_data.items():
+        st.text(f"{phase}: {status}")
+
+
+def _render_upload():
+    """Upload & analyze tab"""
+    st.markdown("## 📁 Upload & Analyze Your Data")
+    
+    # File upload section
+    st.markdown("### Step 1: Upload File")
+    
+    uploaded_file = st.file_uploader(
+        "Choose a file (CSV, Excel, or JSON)",
+        type=['csv', 'xlsx', 'xls', 'json'],
+        help="Maximum file size: 200MB"
+    )
+    
+    if uploaded_file is not None:
+        st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024:.2f} KB)")
         
-        col1, col2, col3 = st.columns(3)
+        # Process button
+        if st.button("🔍 Process & Analyze", type="primary"):
+            with st.spinner("Processing file..."):
+                # Process file (re-uploads of the same bytes hit the cache)
+                blob = uploaded_file.getvalue()
+                result = _process_file(
+                    uploaded_file.name,
+                    uploaded_file.size,
+                    hashlib.blake2b(blob, digest_size=16).hexdigest(),
+                    blob
+                )
+                
+                if result['success']:
+                    df = result['dataframe']
+                    file_info = result['file_info']
+                    
+                    # Store in session state
+                    st.session_state.uploaded_data = {
+                        'dataframe': df,
+                        'file_info': file_info,
+                        'file_path': result['file_path']
+                    }
+                    
+                    # Metadata for auto-save, computed once per upload
+                    st.session_state.column_info = {
+                        'columns': list(df.columns),
+                        'dtypes': dict(zip(df.columns, df.dtypes.astype(str)))
+                    }
+                    st.session_state.dataset_stem = Path(file_info['original_name']).stem
+                    st.session_state.dataset_id = None
+                    
+                    # Insights belong to the previous dataset; start this one's in the background
+                    st.session_state.pop('insights', None)
+                    st.session_state.pop('generated_insights', None)
+                    st.session_state.pop('_data_export_requested', None)
+                    st.session_state['_insights_future'] = _background_executor().submit(
+                        _insight_generator().generate_comprehensive_insights, df
+                    )
+                    
+                    st.success("✅ File processed successfully!")
+                    st.rerun()
+                else:
+                    st.error(f"❌ Error processing file: {result['error']}")
+    
+    # Display processed data
+    if st.session_state.uploaded_data is not None:
+        df = st.session_state.uploaded_data['dataframe']
+        file_info = st.session_state.uploaded_data['file_info']
+        profile = _session_profile(df)
         
-        with col1:
-            st.markdown("""
-            <div class="feature-card">
-                <h3>📁 Upload Data</h3>
-                <p>Easily upload CSV, Excel, or JSON files for analysis.</p>
-                <p><em>✅ Now Available!</em></p>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown("---")
+        st.markdown("### Step 2: Data Overview")
         
+        # Basic info
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Rows", f"{len(df):,}")
         with col2:
-            st.markdown("""
-            <div class="feature-card">
-                <h3>💬 Ask Questions</h3>
-                <p>Use natural language to query your data.</p>
-                <p><em>✅ Now Available!</em></p>
-            </div>
-            """, unsafe_allow_html=True)
-        
+            st.metric("Columns", len(df.columns))
         with col3:
-            st.markdown("""
-            <div class="feature-card">
-                <h3>📊 Get Insights</h3>
-                <p>AI-powered visualizations and analysis.</p>
-                <p><em>✅ All Features Available!</em></p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.metric("File Size", f"{file_info['size_mb']} MB")
+        with col4:
+            st.metric("File Type", file_info['type'].upper())
         
-        st.markdown("---")
-        st.info("🚧 **Project Status:** Phase 8 Complete - Professional Report Generation!")
-        
-        # Project timeline
-        st.markdown("### 📅 Development Timeline")
-        progress_data = {
-            "Phase 1": "✅ Complete - Foundation",
-            "Phase 2": "✅ Complete - Database",
-            "Phase 3": "✅ Complete - File Upload",
-            "Phase 4": "✅ Complete - AI Integration",
-            "Phase 5": "✅ Complete - Visualizations",
-            "Phase 6": "✅ Complete - AI Insights",
-            "Phase 7": "✅ Complete - Chat Interface",
-            "Phase 8": "✅ Complete - Report Generation",
-            "Phase 9": "⏳ Next - Docker",
-        }
+        # Data quality summary
+        st.markdown("#### Data Quality")
+        summary = profile.summary
         
-        for phase, status in progress_data.items():
-            st.text(f"{phase}: {status}")
-    
-    with tab2:
-        st.markdown("## 📁 Upload & Analyze Your Data")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Missing Values", f"{summary['missing_values'].get(df.columns[0], 0):,}" if len(df.columns) > 0 else "0")
+        with col2:
+            st.metric("Duplicate Rows", f"{summary['duplicate_rows']:,}")
+        with col3:
+            memory_color = "normal" if summary['memory_usage_mb'] < 100 else "inverse"
+            st.metric("Memory Usage", f"{summary['memory_usage_mb']} MB")
         
-        # Initialize session state for storing uploaded data
-        if 'uploaded_data' not in st.session_state:
-            st.session_state.uploaded_data = None
-        if 'dataset_id' not in st.session_state:
-            st.session_state.dataset_id = None
+        # Data issues
+        issues = profile.issues
+        if issues:
+            st.markdown("#### ⚠️ Detected Issues")
+            for issue in issues[:5]:  # Show top 5 issues
+                severity = issue['severity']
+                SEVERITY_DISPATCH.get(severity, st.info)(f"{SEVERITY_ICON.get(severity, '🔵')} {issue['message']}")
+        else:
+            st.success("✅ No major data quality issues detected!")
         
-        # File upload section
-        st.markdown("### Step 1: Upload File")
+        st.markdown("---")
+        st.markdown("### Step 3: Data Preview")
         
-        uploaded_file = st.file_uploader(
-            "Choose a file (CSV, Excel, or JSON)",
-            type=['csv', 'xlsx', 'xls', 'json'],
-            help="Maximum file size: 200MB"
-        )
+        # Tabs for different views
+        preview_tab1, preview_tab2, preview_tab3, preview_tab4 = st.tabs([
+            "📊 Data Sample", "📈 Statistics", "🔍 Column Details", "📉 Visualizations"
+        ])
         
-        if uploaded_file is not None:
-            st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024:.2f} KB)")
+        with preview_tab1:
+            st.markdown("#### First 10 Rows")
+            st.dataframe(profile.head, use_container_width=True)
             
-            # Process button
-            if st.button("🔍 Process & Analyze", type="primary"):
-                with st.spinner("Processing file..."):
-                    # Process file
-                    result = file_processor.process_uploaded_file(uploaded_file)
-                    
-                    if result['success']:
-                        df = result['dataframe']
-                        file_info = result['file_info']
-                        
-                        # Store in session state
-                        st.session_state.uploaded_data = {
-                            'dataframe': df,
-                            'file_info': file_info,
-                            'file_path': result['file_path']
-                        }
-                        
-                        st.success("✅ File processed successfully!")
-                        st.rerun()
-                    else:
-                        st.error(f"❌ Error processing file: {result['error']}")
+            with st.expander("Show Last 10 Rows"):
+                st.dataframe(profile.tail, use_container_width=True)
         
-        # Display processed data
-        if st.session_state.uploaded_data is not None:
-            df = st.session_state.uploaded_data['dataframe']
-            file_info = st.session_state.uploaded_data['file_info']
+        with preview_tab2:
+            st.markdown("#### Statistical Summary")
             
-            st.markdown("---")
-            st.markdown("### Step 2: Data Overview")
+            # Numeric summary
+            numeric_summary = profile.numeric
+            if numeric_summary is not None:
+                st.markdown("**Numeric Columns:**")
+                st.dataframe(numeric_summary, use_container_width=True)
             
-            # Basic info
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Rows", f"{len(df):,}")
-            with col2:
-                st.metric("Columns", len(df.columns))
-            with col3:
-                st.metric("File Size", f"{file_info['size_mb']} MB")
-            with col4:
-                st.metric("File Type", file_info['type'].upper())
+            # Categorical summary
+            categorical_summary = profile.categorical
+            if categorical_summary:
+                st.markdown("**Categorical Columns:**")
+                for col, stats in list(categorical_summary.items())[:5]:
+                    with st.expander(f"📋 {col}"):
+                        st.write(f"Unique values: {stats['unique_count']}")
+                        st.write(f"Most common: {stats['top_value']} ({stats['top_count']} times)")
+                        if stats['value_counts']:
+                            st.bar_chart(stats['value_counts'])
+        
+        with preview_tab3:
+            st.markdown("#### Column Information")
             
-            # Data quality summary
-            st.markdown("#### Data Quality")
-            summary = data_validator.get_data_summary(df)
+            st.dataframe(profile.col_info, use_container_width=True)
+        
+        with preview_tab4:
+            st.markdown("#### Data Visualizations")
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Missing Values", f"{summary['missing_values'].get(df.columns[0], 0):,}" if len(df.columns) > 0 else "0")
-            with col2:
-                st.metric("Duplicate Rows", f"{summary['duplicate_rows']:,}")
-            with col3:
-                memory_color = "normal" if summary['memory_usage_mb'] < 100 else "inverse"
-                st.metric("Memory Usage", f"{summary['memory_usage_mb']} MB")
+            # Missing data chart
+            missing_chart = profile.missing_chart
+            if missing_chart:
+                st.plotly_chart(missing_chart, use_container_width=True)
+            else:
+                st.success("✅ No missing data!")
             
-            # Data issues
-            issues = data_validator.detect_data_issues(df)
-            if issues:
-                st.markdown("#### ⚠️ Detected Issues")
-                for issue in issues[:5]:  # Show top 5 issues
-                    if issue['severity'] == 'error':
-                        st.error(f"🔴 {issue['message']}")
-                    elif issue['severity'] == 'warning':
-                        st.warning(f"🟡 {issue['message']}")
-                    else:
-                        st.info(f"🔵 {issue['message']}")
+            # Data type distribution
+            dtype_chart = profile.dtype_chart
+            st.plotly_chart(dtype_chart, use_container_width=True)
+            
+            # Correlation heatmap
+            corr_chart = profile.corr_chart
+            if corr_chart:
+                st.plotly_chart(corr_chart, use_container_width=True)
             else:
-                st.success("✅ No major data quality issues detected!")
+                st.info("ℹ️ Not enough numeric columns for correlation analysis")
+        
+        st.markdown("---")
+        st.markdown("### Step 4: Auto-Saved to Database ✅")
+        
+        # Auto-save to database when file is uploaded
+        if st.session_state.get('dataset_id') is None:
+            st.session_state.dataset_id = _save_dataset(
+                st.session_state.uploaded_data,
+                st.session_state.column_info,
+                st.session_state.dataset_stem
+            )
+        
+        # Show saved status
+        if st.session_state.dataset_id:
+            st.success(f"✅ **Dataset automatically saved to database!**")
+            st.info(f"📊 **Dataset ID:** `{st.session_state.dataset_id[:8]}...`  \n"
+                   f"👤 **User:** demo_user  \n"
+                   f"📁 **Name:** {st.session_state.dataset_stem}")
+        else:
+            st.warning("⚠️ Auto-save to database failed. Data is still available for analysis.")
+        
+        # AI Insights Section
+        st.markdown("---")
+        st.markdown("### Step 5: AI-Powered Insights")
+        
+        if st.button("🧠 Generate AI Insights", type="primary"):
+            with st.spinner("🔍 Analyzing data and generating insights..."):
+                try:
+                    # Generate comprehensive insights
+                    insights = _dataset_insights(df)
+                    
+                    if insights:
+                        # Store in session state
+                        st.session_state.insights = insights
+                        st.success("✅ Insights generated successfully!")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error generating insights: {str(e)}")
+        
+        # Display insights if available
+        if 'insights' in st.session_state and st.session_state.insights:
+            insights = st.session_state.insights
             
             st.markdown("---")
-            st.markdown("### Step 3: Data Preview")
             
-            # Tabs for different views
-            preview_tab1, preview_tab2, preview_tab3, preview_tab4 = st.tabs([
-                "📊 Data Sample", "📈 Statistics", "🔍 Column Details", "📉 Visualizations"
+            # Create tabs for different insight types
+            insight_tab1, insight_tab2, insight_tab3, insight_tab4 = st.tabs([
+                "🎯 Key Insights",
+                "📊 Statistics",
+                "📈 Trends",
+                "⚠️  Anomalies"
             ])
             
-            with preview_tab1:
-                st.markdown("#### First 10 Rows")
-                st.dataframe(df.head(10), use_container_width=True)
+            with insight_tab1:
+                st.markdown("#### AI-Generated Insights")
+                ai_insights = insights.get('ai_insights', 'No insights available')
+                st.info(ai_insights)
                 
-                with st.expander("Show Last 10 Rows"):
-                    st.dataframe(df.tail(10), use_container_width=True)
+                # Key findings
+                key_findings = insights.get('key_findings', [])
+                if key_findings:
+                    st.markdown("#### Key Findings")
+                    for finding in key_findings:
+                        st.markdown(f"• {finding}")
+                
+                # Recommendations
+                recommendations = insights.get('recommendations', [])
+                if recommendations:
+                    st.markdown("#### Recommendations")
+                    for rec in recommendations:
+                        st.warning(f"💡 {rec}")
             
-            with preview_tab2:
+            with insight_tab2:
                 st.markdown("#### Statistical Summary")
                 
-                # Numeric summary
-                numeric_summary = data_previewer.get_numeric_summary(df)
-                if numeric_summary:
-                    st.markdown("**Numeric Columns:**")
-                    st.dataframe(pd.DataFrame(numeric_summary).T, use_container_width=True)
+                stats = insights.get('statistics', {})
+                basic = stats.get('basic_stats', {})
                 
-                # Categorical summary
-                categorical_summary = data_previewer.get_categorical_summary(df)
-                if categorical_summary:
-                    st.markdown("**Categorical Columns:**")
-                    for col, stats in list(categorical_summary.items())[:5]:
-                        with st.expander(f"📋 {col}"):
-                            st.write(f"Unique values: {stats['unique_count']}")
-                            st.write(f"Most common: {stats['top_value']} ({stats['top_count']} times)")
-                            if stats['value_counts']:
-                                st.bar_chart(stats['value_counts'])
-            
-            with preview_tab3:
-                st.markdown("#### Column Information")
+                # Basic stats
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Rows", f"{basic.get('row_count', 0):,}")
+                with col2:
+                    st.metric("Columns", basic.get('column_count', 0))
+                with col3:
+                    st.metric("Missing %", f"{basic.get('missing_percentage', 0):.1f}%")
+                with col4:
+                    st.metric("Duplicates", basic.get('duplicate_rows', 0))
                 
-                col_stats = data_validator.get_column_statistics(df)
-                col_data = []
-                for col, stats in col_stats.items():
-                    col_data.append({
-                        'Column': col,
-                        'Type': stats['dtype'],
-                        'Unique': stats['unique_count'],
-                        'Missing': stats['null_count'],
-                        'Missing %': f"{stats['null_percentage']}%"
-                    })
+                # Data quality
+                quality = stats.get('data_quality', {})
+                if quality:
+                    st.markdown("#### Data Quality Assessment")
+                    score = quality.get('quality_score', 0)
+                    grade = quality.get('grade', 'N/A')
+                    
+                    st.metric("Quality Score", f"{score:.1f}/100", delta=grade)
+                    
+                    issues = quality.get('issues', [])
+                    if issues:
+                        st.warning("**Issues Found:**")
+                        for issue in issues:
+                            st.markdown(f"• {issue}")
                 
-                st.dataframe(pd.DataFrame(col_data), use_container_width=True)
+                # Numeric columns analysis
+                numeric_analysis = stats.get('numeric_analysis', {})
+                if numeric_analysis:
+                    st.markdown("#### Numeric Columns")
+                    
+                    for col, col_stats in list(numeric_analysis.items())[:5]:  # Show first 5
+                        with st.expander(f"📊 {col}"):
+                            col_a, col_b, col_c = st.columns(3)
+                            with col_a:
+                                st.metric("Mean", f"{col_stats.get('mean', 0):.2f}")
+                                st.metric("Std Dev", f"{col_stats.get('std', 0):.2f}")
+                            with col_b:
+                                st.metric("Min", f"{col_stats.get('min', 0):.2f}")
+                                st.metric("Max", f"{col_stats.get('max', 0):.2f}")
+                            with col_c:
+                                st.metric("Outliers", col_stats.get('outliers', {}).get('count', 0))
+                                st.metric("Missing", col_stats.get('missing_count', 0))
             
-            with preview_tab4:
-                st.markdown("#### Data Visualizations")
-                
-                # Missing data chart
-                missing_chart = data_previewer.create_missing_data_chart(df)
-                if missing_chart:
-                    st.plotly_chart(missing_chart, use_container_width=True)
-                else:
-                    st.success("✅ No missing data!")
+            with insight_tab3:
+                st.markdown("#### Trend Analysis")
                 
-                # Data type distribution
-                dtype_chart = data_previewer.create_data_type_chart(df)
-                st.plotly_chart(dtype_chart, use_container_width=True)
+                trends = insights.get('trends', {})
                 
-                # Correlation heatmap
-                corr_chart = data_previewer.create_correlation_heatmap(df)
-                if corr_chart:
-                    st.plotly_chart(corr_chart, use_container_width=True)
-                else:
-                    st.info("ℹ️ Not enough numeric columns for correlation analysis")
-            
-            st.markdown("---")
-            st.markdown("### Step 4: Auto-Saved to Database ✅")
-            
-            # Auto-save to database when file is uploaded
-            if 'dataset_id' not in st.session_state or not st.session_state.dataset_id:
-                try:
-                    # Get or create default user
-                    user = db_ops.get_or_create_user("demo_user", "demo@datawise.ai")
-                    
-                    if user:
-                        # Prepare column info
-                        column_info = {
-                            'columns': list(df.columns),
-                            'dtypes': df.dtypes.astype(str).to_dict()
-                        }
-                        
-                        # Auto-generate dataset name from filename
-                        dataset_name = Path(file_info['original_name']).stem
-                        
-                        # Save dataset metadata
-                        dataset = db_ops.create_dataset(
-                            user_id=str(user.id),
-                            name=dataset_name,
-                            original_filename=file_info['original_name'],
-                            file_path=st.session_state.uploaded_data['file_path'],
-                            file_type=file_info['type'],
-                            file_size_bytes=file_info['size_bytes'],
-                            row_count=len(df),
-                            column_count=len(df.columns),
-                            columns=column_info,
-                            description=f"Uploaded on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                        )
-                        
-                        if dataset:
-                            st.session_state.dataset_id = str(dataset.id)
-                except Exception as e:
-                    logger.error(f"Auto-save failed: {e}")
-            
-            # Show saved status
-            if st.session_state.dataset_id:
-                st.success(f"✅ **Dataset automatically saved to database!**")
-                st.info(f"📊 **Dataset ID:** `{st.session_state.dataset_id[:8]}...`  \n"
-                       f"👤 **User:** demo_user  \n"
-                       f"📁 **Name:** {Path(file_info['original_name']).stem}")
-            else:
-                st.warning("⚠️ Auto-save to database failed. Data is still available for analysis.")
-            
-            # AI Insights Section
-            st.markdown("---")
-            st.markdown("### Step 5: AI-Powered Insights")
-            
-            if st.button("🧠 Generate AI Insights", type="primary"):
-                with st.spinner("🔍 Analyzing data and generating insights..."):
-                    try:
-                        # Generate comprehensive insights
-                        insights = insight_generator.generate_comprehensive_insights(df)
-                        
-                        if insights:
-                            # Store in session state
-                            st.session_state.insights = insights
-                            st.success("✅ Insights generated successfully!")
-                            st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Error generating insights: {str(e)}")
-            
-            # Display insights if available
-            if 'insights' in st.session_state and st.session_state.insights:
-                insights = st.session_state.insights
-                
-                st.markdown("---")
-                
-                # Create tabs for different insight types
-                insight_tab1, insight_tab2, insight_tab3, insight_tab4 = st.tabs([
-                    "🎯 Key Insights",
-                    "📊 Statistics",
-                    "📈 Trends",
-                    "⚠️  Anomalies"
-                ])
-                
-                with insight_tab1:
-                    st.markdown("#### AI-Generated Insights")
-                    ai_insights = insights.get('ai_insights', 'No insights available')
-                    st.info(ai_insights)
-                    
-                    # Key findings
-                    key_findings = insights.get('key_findings', [])
-                    if key_findings:
-                        st.markdown("#### Key Findings")
-                        for finding in key_findings:
-                            st.markdown(f"• {finding}")
-                    
-                    # Recommendations
-                    recommendations = insights.get('recommendations', [])
-                    if recommendations:
-                        st.markdown("#### Recommendations")
-                        for rec in recommendations:
-                            st.warning(f"💡 {rec}")
-                
-                with insight_tab2:
-                    st.markdown("#### Statistical Summary")
+                if trends:
+                    # Summary
+                    increasing = [col for col, t in trends.items() if t.get('trend') == 'increasing']
+                    decreasing = [col for col, t in trends.items() if t.get('trend') == 'decreasing']
+                    stable = [col for col, t in trends.items() if t.get('trend') == 'stable']
                     
-                    stats = insights.get('statistics', {})
-                    basic = stats.get('basic_stats', {})
-                    
-                    # Basic stats
-                    col1, col2, col3, col4 = st.columns(4)
+                    col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total Rows", f"{basic.get('row_count', 0):,}")
+                        st.metric("📈 Increasing", len(increasing))
                     with col2:
-                        st.metric("Columns", basic.get('column_count', 0))
+                        st.metric("📉 Decreasing", len(decreasing))
                     with col3:
-                        st.metric("Missing %", f"{basic.get('missing_percentage', 0):.1f}%")
-                    with col4:
-                        st.metric("Duplicates", basic.get('duplicate_rows', 0))
-                    
-                    # Data quality
-                    quality = stats.get('data_quality', {})
-                    if quality:
-                        st.markdown("#### Data Quality Assessment")
-                        score = quality.get('quality_score', 0)
-                        grade = quality.get('grade', 'N/A')
-                        
-                        st.metric("Quality Score", f"{score:.1f}/100", delta=grade)
-                        
-                        issues = quality.get('issues', [])
-                        if issues:
-                            st.warning("**Issues Found:**")
-                            for issue in issues:
-                                st.markdown(f"• {issue}")
-                    
-                    # Numeric columns analysis
-                    numeric_analysis = stats.get('numeric_analysis', {})
-                    if numeric_analysis:
-                        st.markdown("#### Numeric Columns")
-                        
-                        for col, col_stats in list(numeric_analysis.items())[:5]:  # Show first 5
-                            with st.expander(f"📊 {col}"):
-                                col_a, col_b, col_c = st.columns(3)
-                                with col_a:
-                                    st.metric("Mean", f"{col_stats.get('mean', 0):.2f}")
-                                    st.metric("Std Dev", f"{col_stats.get('std', 0):.2f}")
-                                with col_b:
-                                    st.metric("Min", f"{col_stats.get('min', 0):.2f}")
-                                    st.metric("Max", f"{col_stats.get('max', 0):.2f}")
-                                with col_c:
-                                    st.metric("Outliers", col_stats.get('outliers', {}).get('count', 0))
-                                    st.metric("Missing", col_stats.get('missing_count', 0))
-                
-                with insight_tab3:
-                    st.markdown("#### Trend Analysis")
+                        st.metric("➡️  Stable", len(stable))
                     
-                    trends = insights.get('trends', {})
+                    # Details
+                    st.markdown("#### Trend Details")
                     
-                    if trends:
-                        # Summary
-                        increasing = [col for col, t in trends.items() if t.get('trend') == 'increasing']
-                        decreasing = [col for col, t in trends.items() if t.get('trend') == 'decreasing']
-                        stable = [col for col, t in trends.items() if t.get('trend') == 'stable']
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("📈 Increasing", len(increasing))
-                        with col2:
-                            st.metric("📉 Decreasing", len(decreasing))
-                        with col3:
-                            st.metric("➡️  Stable", len(stable))
-                        
-                        # Details
-                        st.markdown("#### Trend Details")
+                    for col, trend_data in list(trends.items())[:10]:  # Show first 10
+                        trend_type = trend_data.get('trend', 'unknown')
+                        if trend_type == 'insufficient_data':
+                            continue
                         
-                        for col, trend_data in list(trends.items())[:10]:  # Show first 10
-                            trend_type = trend_data.get('trend', 'unknown')
-                            if trend_type == 'insufficient_data':
-                                continue
+                        with st.expander(f"{col} - {trend_type.title()}"):
+                            change_pct = trend_data.get('change_percentage', 0)
+                            volatility = trend_data.get('volatility', 0)
                             
-                            with st.expander(f"{col} - {trend_type.title()}"):
-                                change_pct = trend_data.get('change_percentage', 0)
-                                volatility = trend_data.get('volatility', 0)
-                                
-                                col_a, col_b = st.columns(2)
-                                with col_a:
-                                    st.metric("Change", f"{change_pct:.1f}%")
-                                    st.metric("First Value", f"{trend_data.get('first_value', 0):.2f}")
-                                with col_b:
-                                    st.metric("Volatility", f"{volatility:.1f}%")
-                                    st.metric("Last Value", f"{trend_data.get('last_value', 0):.2f}")
-                    else:
-                        st.info("No trend data available")
+                            col_a, col_b = st.columns(2)
+                            with col_a:
+                                st.metric("Change", f"{change_pct:.1f}%")
+                                st.metric("First Value", f"{trend_data.get('first_value', 0):.2f}")
+                            with col_b:
+                                st.metric("Volatility", f"{volatility:.1f}%")
+                                st.metric("Last Value", f"{trend_data.get('last_value', 0):.2f}")
+                else:
+                    st.info("No trend data available")
+            
+            with insight_tab4:
+                st.markdown("#### Anomaly Detection")
+                
+                anomalies = insights.get('anomalies', {})
                 
-                with insight_tab4:
-                    st.markdown("#### Anomaly Detection")
+                if anomalies:
+                    # Summary
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Total Anomalies", anomalies.get('total_anomalies', 0))
+                    with col2:
+                        st.metric("Affected Columns", anomalies.get('affected_columns', 0))
                     
-                    anomalies = insights.get('anomalies', {})
+                    # Column details
+                    column_anomalies = anomalies.get('column_anomalies', {})
                     
-                    if anomalies:
-                        # Summary
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Total Anomalies", anomalies.get('total_anomalies', 0))
-                        with col2:
-                            st.metric("Affected Columns", anomalies.get('affected_columns', 0))
-                        
-                        # Column details
-                        column_anomalies = anomalies.get('column_anomalies', {})
+                    if column_anomalies:
+                        st.markdown("#### Anomaly Details by Column")
                         
-                        if column_anomalies:
-                            st.markdown("#### Anomaly Details by Column")
-                            
-                            for col, anom_data in list(column_anomalies.items())[:10]:
-                                if anom_data.get('count', 0) > 0:
-                                    severity = anom_data.get('severity', 'unknown')
-                                    
-                                    # Color code by severity
-                                    if severity == 'critical':
-                                        icon = "🔴"
-                                    elif severity == 'high':
-                                        icon = "🟠"
-                                    elif severity == 'moderate':
-                                        icon = "🟡"
-                                    else:
-                                        icon = "🟢"
+                        for col, anom_data in list(column_anomalies.items())[:10]:
+                            if anom_data.get('count', 0) > 0:
+                                severity = anom_data.get('severity', 'unknown')
+                                
+                                # Color code by severity
+                                icon = ANOMALY_SEVERITY_ICON.get(severity, "🟢")
+                                
+                                with st.expander(f"{icon} {col} - {severity.title()} ({anom_data['count']} outliers)"):
+                                    col_a, col_b = st.columns(2)
+                                    with col_a:
+                                        st.metric("Outlier Count", anom_data['count'])
+                                        st.metric("Lower Bound", f"{anom_data.get('lower_bound', 0):.2f}")
+                                    with col_b:
+                                        st.metric("Percentage", f"{anom_data.get('percentage', 0):.1f}%")
+                                        st.metric("Upper Bound", f"{anom_data.get('upper_bound', 0):.2f}")
                                     
-                                    with st.expander(f"{icon} {col} - {severity.title()} ({anom_data['count']} outliers)"):
-                                        col_a, col_b = st.columns(2)
-                                        with col_a:
-                                            st.metric("Outlier Count", anom_data['count'])
-                                            st.metric("Lower Bound", f"{anom_data.get('lower_bound', 0):.2f}")
-                                        with col_b:
-                                            st.metric("Percentage", f"{anom_data.get('percentage', 0):.1f}%")
-                                            st.metric("Upper Bound", f"{anom_data.get('upper_bound', 0):.2f}")
-                                        
-                                        # Show some outlier values
-                                        outlier_vals = anom_data.get('outlier_values', [])
-                                        if outlier_vals:
-                                            st.markdown("**Sample Outlier Values:**")
-                                            st.write(outlier_vals[:5])
-                        
-                        # Unusual patterns
-                        patterns = insights.get('patterns', [])
-                        if patterns:
-                            st.markdown("#### Unusual Patterns Detected")
-                            for pattern in patterns:
-                                pattern_type = pattern.get('type', 'unknown')
-                                description = pattern.get('description', 'No description')
-                                st.warning(f"🔍 {description}")
-                    else:
-                        st.success("✅ No significant anomalies detected")
-        
-        else:
-            st.info("👆 Upload a file above to get started!")
+                                    # Show some outlier values
+                                    outlier_vals = anom_data.get('outlier_values', [])
+                                    if outlier_vals:
+                                        st.markdown("**Sample Outlier Values:**")
+                                        st.write(outlier_vals[:5])
+                    
+                    # Unusual patterns
+                    patterns = insights.get('patterns', [])
+                    if patterns:
+                        st.markdown("#### Unusual Patterns Detected")
+                        for pattern in patterns:
+                            pattern_type = pattern.get('type', 'unknown')
+                            description = pattern.get('description', 'No description')
+                            st.warning(f"🔍 {description}")
+                else:
+                    st.success("✅ No significant anomalies detected")
     
-    with tab3:
-        st.markdown("## 💬 Ask Questions About Your Data")
+    else:
+        st.info("👆 Upload a file above to get started!")
+
+
+def _render_ask():
+    """Ask Questions tab"""
+    st.markdown("## 💬 Ask Questions About Your Data")
+    
+    # Check if data is available
+    if 'uploaded_data' not in st.session_state or st.session_state.uploaded_data is None:
+        st.warning("⚠️  Please upload a dataset first in the '📁 Upload Data' tab")
+        st.info("""
+        **To get started:**
+        1. Go to the '📁 Upload Data' tab
+        2. Upload a CSV, Excel, or JSON file
+        3. Come back here to ask questions!
+        """)
+    else:
+        df = st.session_state.uploaded_data['dataframe']
+        file_info = st.session_state.uploaded_data['file_info']
         
-        # Check if data is available
-        if 'uploaded_data' not in st.session_state or st.session_state.uploaded_data is None:
-            st.warning("⚠️  Please upload a dataset first in the '📁 Upload Data' tab")
-            st.info("""
-            **To get started:**
-            1. Go to the '📁 Upload Data' tab
-            2. Upload a CSV, Excel, or JSON file
-            3. Come back here to ask questions!
-            """)
-        else:
-            df = st.session_state.uploaded_data['dataframe']
-            file_info = st.session_state.uploaded_data['file_info']
-            
-            # Initialize session state for query history
-            if 'query_history' not in st.session_state:
-                st.session_state.query_history = []
+        # Initialize session state for query history
+        if 'query_history' not in st.session_state:
+            st.session_state.query_history = []
+        query_history = st.session_state.query_history
+        n_queries = len(query_history)
+        
+        # Display current dataset info
+        st.info(f"📊 **Current Dataset:** {file_info['original_name']} ({len(df)} rows, {len(df.columns)} columns)")
+        
+        # Show suggested questions
+        with st.expander("💡 Suggested Questions", expanded=False):
+            st.markdown("Here are some questions you can ask about your data:")
             
-            # Display current dataset info
-            st.info(f"📊 **Current Dataset:** {file_info['original_name']} ({len(df)} rows, {len(df.columns)} columns)")
+            if st.button("🔄 Generate AI Suggestions"):
+                with st.spinner("Generating suggestions..."):
+                    suggestions = _cached_suggestions(_nl_to_sql().schema_key(df), df)
+                    if suggestions:
+                        for i, question in enumerate(suggestions, 1):
+                            st.markdown(f"**{i}.** {question}")
+                    else:
+                        st.warning("Could not generate suggestions")
             
-            # Show suggested questions
-            with st.expander("💡 Suggested Questions", expanded=False):
-                st.markdown("Here are some questions you can ask about your data:")
-                
-                if st.button("🔄 Generate AI Suggestions"):
-                    with st.spinner("Generating suggestions..."):
-                        suggestions = nl_to_sql_converter.suggest_questions(df)
-                        if suggestions:
-                            for i, question in enumerate(suggestions, 1):
-                                st.markdown(f"**{i}.** {question}")
-                        else:
-                            st.warning("Could not generate suggestions")
+            # Fallback suggestions
+            st.markdown("""
+            **Common Questions:**
+            - Show me the first 10 rows
+            - What is the average of [numeric column]?
+            - Count the number of rows
+            - Show me the top 5 rows by [column name]
+            - What are the unique values in [column name]?
+            """)
+        
+        st.markdown("---")
+        
+        # Query input section
+        st.markdown("### Ask Your Question")
+        
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            user_question = st.text_input(
+                "Type your question in natural language:",
+                placeholder="e.g., What is the average sales by region?",
+                key="user_question_input"
+            )
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            ask_button = st.button("🚀 Ask", type="primary", use_container_width=True)
+        
+        # Process query
+        if ask_button and user_question:
+            with st.spinner("🤔 Thinking..."):
+                # Convert NL to SQL
+                schema_prefix = _schema_prompt_prefix(_nl_to_sql().schema_key(df))
+                sql_query = _nl_to_sql().convert_to_sql_with_prefix(schema_prefix, user_question)
                 
-                # Fallback suggestions
-                st.markdown("""
-                **Common Questions:**
-                - Show me the first 10 rows
-                - What is the average of [numeric column]?
-                - Count the number of rows
-                - Show me the top 5 rows by [column name]
-                - What are the unique values in [column name]?
-                """)
-            
-            st.markdown("---")
-            
-            # Query input section
-            st.markdown("### Ask Your Question")
-            
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                user_question = st.text_input(
-                    "Type your question in natural language:",
-                    placeholder="e.g., What is the average sales by region?",
-                    key="user_question_input"
-                )
-            
-            with col2:
-                st.markdown("<br>", unsafe_allow_html=True)
-                ask_button = st.button("🚀 Ask", type="primary", use_container_width=True)
-            
-            # Process query
-            if ask_button and user_question:
-                with st.spinner("🤔 Thinking..."):
-                    # Convert NL to SQL
-                    sql_query = nl_to_sql_converter.convert_to_sql(user_question, df)
-                    
-                    if sql_query:
-                        # Execute query first
-                        with st.spinner("⚙️  Executing query..."):
-                            success, results, error = query_executor.execute_query(sql_query, df)
+                if sql_query:
+                    # Execute query first
+                    with st.spinner("⚙️  Executing query..."):
+                        success, results, error = _query_executor().execute_query(sql_query, df)
+                        
+                        if success and results is not None:
+                            # Get AI analysis and explanation concurrently
+                            post_query = _cached_post_query(user_question, sql_query, results)
+                            analysis = post_query['analysis']
                             
-                            if success and results is not None:
-                                # Get AI explanation in natural language
-                                analysis = nl_to_sql_converter.analyze_query_results(user_question, results)
-                                
-                                # Show natural language response
-                                st.success("✅ Here's what I found:")
-                                
-                                if analysis:
-                                    st.markdown(f"**💡 {analysis}**")
+                            # Show natural language response
+                            st.success("✅ Here's what I found:")
+                            
+                            if analysis:
+                                st.markdown(f"**💡 {analysis}**")
+                            else:
+                                # Fallback explanation
+                                if len(results) == 1 and len(results.columns) == 1:
+                                    # Single value result
+                                    value = results.iloc[0, 0]
+                                    st.markdown(f"**💡 The answer is: {value}**")
                                 else:
-                                    # Fallback explanation
-                                    if len(results) == 1 and len(results.columns) == 1:
-                                        # Single value result
-                                        value = results.iloc[0, 0]
-                                        st.markdown(f"**💡 The answer is: {value}**")
-                                    else:
-                                        st.markdown(f"**💡 I found {len(results)} results for your question.**")
-                                
-                                # Show SQL query in an expander (optional)
-                                with st.expander("🔍 View SQL Query", expanded=False):
-                                    st.code(sql_query, language="sql")
-                                    explanation = nl_to_sql_converter.explain_query(sql_query, user_question)
-                                    if explanation:
-                                        st.caption(f"Technical explanation: {explanation}")
-                                
-                                # Display results
-                                st.markdown("#### Results:")
-                                st.markdown(f"**{len(results)} rows returned**")
-                                
-                                # Show results in tabs
-                                result_tab1, result_tab2 = st.tabs(["📊 Data Table", "📈 Visualization"])
-                                
-                                with result_tab1:
-                                    display_results = query_executor.format_results(results)
-                                    st.dataframe(display_results, use_container_width=True, height=400)
-                                
-                                with result_tab2:
-                                    # Auto-generate visualization
-                                    if len(results) > 0 and len(results) <= 1000:
-                                        with st.spinner("🎨 Generating visualization..."):
-                                            fig, chart_type = chart_generator.auto_generate_chart(
-                                                results,
-                                                question=user_question
-                                            )
+                                    st.markdown(f"**💡 I found {len(results)} results for your question.**")
+                            
+                            # Show SQL query in an expander (optional)
+                            with st.expander("🔍 View SQL Query", expanded=False):
+                                st.code(sql_query, language="sql")
+                                explanation = post_query['explanation']
+                                if explanation:
+                                    st.caption(f"Technical explanation: {explanation}")
+                            
+                            # Display results
+                            st.markdown("#### Results:")
+                            st.markdown(f"**{len(results)} rows returned**")
+                            
+                            # Show results in tabs
+                            result_tab1, result_tab2 = st.tabs(["📊 Data Table", "📈 Visualization"])
+                            
+                            with result_tab1:
+                                display_results = _formatted_results(_df_fingerprint(results), results)
+                                _show_results_table(display_results, total_rows=len(results))
+                            
+                            with result_tab2:
+                                # Auto-generate visualization
+                                if 0 < len(results) <= 1000 and not _chart_generator().can_plot(results):
+                                    st.info("💡 This data is best viewed as a table")
+                                elif len(results) > 0 and len(results) <= 1000:
+                                    with st.spinner("🎨 Generating visualization..."):
+                                        fig, chart_type = _cached_chart(results, user_question)
+                                        
+                                        if fig:
+                                            # Chart type selector
+                                            col_chart1, col_chart2 = st.columns([1, 3])
+                                            with col_chart1:
+                                                selected_chart_type = st.selectbox(
+                                                    "Chart Type",
+                                                    ["auto", "bar", "line", "pie", "scatter", "histogram"],
+                                                    index=0,
+                                                    key=f"chart_type_{n_queries}"
+                                                )
+                                            
+                                            # Regenerate if chart type changed
+                                            if selected_chart_type != "auto" and selected_chart_type != chart_type:
+                                                fig, chart_type = _cached_chart(results, user_question, selected_chart_type)
                                             
+                                            # Display chart
                                             if fig:
-                                                # Chart type selector
-                                                col_chart1, col_chart2 = st.columns([1, 3])
-                                                with col_chart1:
-                                                    selected_chart_type = st.selectbox(
-                                                        "Chart Type",
-                                                        ["auto", "bar", "line", "pie", "scatter", "histogram"],
-                                                        index=0,
-                                                        key=f"chart_type_{len(st.session_state.query_history)}"
-                                                    )
-                                                
-                                                # Regenerate if chart type changed
-                                                if selected_chart_type != "auto" and selected_chart_type != chart_type:
-                                                    fig, chart_type = chart_generator.auto_generate_chart(
-                                                        results,
-                                                        question=user_question,
-                                                        chart_type=selected_chart_type
-                                                    )
-                                                
-                                                # Display chart
-                                                if fig:
-                                                    st.plotly_chart(
-                                                        fig,
-                                                        use_container_width=True,
-                                                        config=chart_generator.get_chart_config()
-                                                    )
-                                                    st.caption(f"📊 Chart Type: {chart_type.capitalize()}")
-                                                else:
-                                                    st.info("💡 This data is best viewed as a table")
+                                                st.plotly_chart(
+                                                    fig,
+                                                    use_container_width=True,
+                                                    config=_chart_generator().get_chart_config()
+                                                )
+                                                st.caption(f"📊 Chart Type: {chart_type.capitalize()}")
                                             else:
-                                                st.info("💡 Visualization not available for this result set")
-                                    elif len(results) > 1000:
-                                        st.warning(f"⚠️  Dataset too large ({len(results)} rows). Showing table view only.")
-                                        st.info("💡 Try adding a LIMIT clause to your query or filter the data")
-                                    else:
-                                        st.info("💡 No data to visualize")
-                                
-                                # Analyze results
-                                with st.spinner("🧠 Analyzing results..."):
-                                    analysis = nl_to_sql_converter.analyze_query_results(user_question, results)
-                                    if analysis:
-                                        st.markdown("#### 🎯 Key Insights:")
-                                        st.success(analysis)
-                                
-                                # Download option
-                                col_a, col_b = st.columns([3, 1])
-                                with col_b:
-                                    csv_data = results.to_csv(index=False).encode('utf-8')
-                                    st.download_button(
-                                        label="📥 Download CSV",
-                                        data=csv_data,
-                                        file_name=f"query_results_{len(st.session_state.query_history) + 1}.csv",
-                                        mime="text/csv",
-                                        use_container_width=True
-                                    )
-                                
-                                # Save to query history
-                                st.session_state.query_history.append({
-                                    'question': user_question,
-                                    'sql': sql_query,
-                                    'rows_returned': len(results),
-                                    'timestamp': pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
-                                })
-                                
-                                # Save to database
-                                try:
-                                    query_record = db_ops.create_query(
-                                        user_id=1,  # Default user
-                                        dataset_id=None,  # Can be linked if dataset was saved
-                                        query_text=user_question,
-                                        sql_query=sql_query,
-                                        results_count=len(results)
-                                    )
-                                    if query_record:
-                                        st.caption(f"💾 Query saved to history (ID: {str(query_record.id)[:8]}...)")
-                                except Exception as e:
-                                    st.caption(f"⚠️  Could not save to database: {str(e)}")
+                                                st.info("💡 This data is best viewed as a table")
+                                        else:
+                                            st.info("💡 Visualization not available for this result set")
+                                elif len(results) > 1000:
+                                    st.warning(f"⚠️  Dataset too large ({len(results)} rows). Showing table view only.")
+                                    st.info("💡 Try adding a LIMIT clause to your query or filter the data")
+                                else:
+                                    st.info("💡 No data to visualize")
+                            
+                            # Key insights reuse the analysis from the post-query bundle - no second LLM call
+                            if analysis:
+                                st.markdown("#### 🎯 Key Insights:")
+                                st.success(analysis)
+                            
+                            # Download option
+                            col_a, col_b = st.columns([3, 1])
+                            with col_b:
+                                csv_data = _csv_bytes(results)
+                                st.download_button(
+                                    label="📥 Download CSV",
+                                    data=csv_data,
+                                    file_name=f"query_results_{n_queries + 1}.csv",
+                                    mime="text/csv",
+                                    use_container_width=True
+                                )
+                            
+                            # Save to query history
+                            query_history.append({
+                                'question': user_question,
+                                'sql': sql_query,
+                                'rows_returned': len(results),
+                                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
                             
-                            elif error and "column" in error.lower():
-                                # Try to fix column name errors
-                                st.warning("⚠️  Column name error detected. Attempting to fix...")
+                            # Save to database in the background; failures are logged
+                            _db_executor().submit(
+                                db_ops.create_query,
+                                user_id=1,  # Default user
+                                dataset_id=None,  # Can be linked if dataset was saved
+                                query_text=user_question,
+                                sql_query=sql_query,
+                                results_count=len(results)
+                            ).add_done_callback(_log_query_save)
+                            st.caption("💾 Query saved to history")
+                        
+                        elif _query_executor().is_fixable_error(error):
+                            # Try to fix column name and function errors
+                            st.warning("⚠️  Column or function error detected. Attempting to fix...")
+                            
+                            with st.spinner("🔧 Fixing query..."):
+                                fixed_sql = _nl_to_sql().fix_sql_query(sql_query, error, df)
                                 
-                                with st.spinner("🔧 Fixing query..."):
-                                    fixed_sql = nl_to_sql_converter.fix_sql_query(sql_query, error, df)
+                                if fixed_sql:
+                                    st.info("✨ Query fixed! Executing corrected query...")
+                                    st.code(fixed_sql, language="sql")
                                     
-                                    if fixed_sql:
-                                        st.info("✨ Query fixed! Executing corrected query...")
-                                        st.code(fixed_sql, language="sql")
-                                        
-                                        success2, results2, error2 = query_executor.execute_query(fixed_sql, df)
-                                        
-                                        if success2 and results2 is not None:
-                                            st.success("✅ Fixed query executed successfully!")
-                                            st.markdown(f"**{len(results2)} rows returned**")
-                                            display_results2 = query_executor.format_results(results2)
-                                            st.dataframe(display_results2, use_container_width=True, height=400)
-                                        else:
-                                            st.error(f"❌ Fixed query also failed: {error2}")
+                                    success2, results2, error2 = _query_executor().execute_query(fixed_sql, df)
+                                    
+                                    if success2 and results2 is not None:
+                                        st.success("✅ Fixed query executed successfully!")
+                                        st.markdown(f"**{len(results2)} rows returned**")
+                                        display_results2 = _formatted_results(_df_fingerprint(results2), results2)
+                                        _show_results_table(display_results2, total_rows=len(results2))
                                     else:
-                                        st.error(f"❌ Could not fix the query. Error: {error}")
-                            
-                            else:
-                                st.error(f"❌ Query execution failed: {error}")
-                                st.warning("💡 Try rephrasing your question or use simpler terms")
-                    
-                    else:
-                        st.error("❌ Failed to generate SQL query from your question")
-                        st.warning("💡 Try asking in a different way or check your Gemini API key")
-            
-            # Display query history
-            if len(st.session_state.query_history) > 0:
-                st.markdown("---")
-                st.markdown("### 📜 Query History")
+                                        st.error(f"❌ Fixed query also failed: {error2}")
+                                else:
+                                    st.error(f"❌ Could not fix the query. Error: {error}")
+                        
+                        else:
+                            st.error(f"❌ Query execution failed: {error}")
+                            st.warning("💡 Try rephrasing your question or use simpler terms")
                 
-                with st.expander(f"View History ({len(st.session_state.query_history)} queries)", expanded=False):
-                    for i, query in enumerate(reversed(st.session_state.query_history), 1):
-                        st.markdown(f"""
-                        **Query {len(st.session_state.query_history) - i + 1}** - {query['timestamp']}
-                        - **Question:** {query['question']}
-                        - **SQL:** `{query['sql']}`
-                        - **Results:** {query['rows_returned']} rows
-                        """)
-                        st.markdown("---")
-                    
-                    if st.button("🗑️  Clear History"):
-                        st.session_state.query_history = []
-                        st.rerun()
-            
-            # Tips section
-            st.markdown("---")
-            st.markdown("### 💡 Tips for Asking Questions")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                **✅ Good Questions:**
-                - "What is the average price?"
-                - "Show me the top 10 products"
-                - "Count the total number of orders"
-                - "Group sales by category"
-                """)
-            
-            with col2:
-                st.markdown("""
-                **❌ Avoid:**
-                - Too vague: "Show me data"
-                - Wrong column names
-                - Complex joins (use uploaded data as single table)
-                - Multiple unrelated questions
-                """)
-    
-    with tab4:
-        st.markdown("## 💭 Chat with Your Data")
-        st.caption("Have a conversation with your data - I'll remember the context!")
+                else:
+                    st.error("❌ Failed to generate SQL query from your question")
+                    st.warning("💡 Try asking in a different way or check your Gemini API key")
         
-        # Initialize chat history in session state
-        if 'chat_messages' not in st.session_state:
-            st.session_state.chat_messages = []
-        if 'conversation_started' not in st.session_state:
-            st.session_state.conversation_started = False
+        # Display query history
+        if query_history:
+            _query_history_panel()
         
-        # Check if data is uploaded
-        if st.session_state.uploaded_data is None:
-            st.warning("⚠️  Please upload data first in the 'Upload Data' tab!")
-            st.info("💡 **What you can do with Chat:**\n\n"
-                   "- Have natural conversations about your data\n"
-                   "- Ask follow-up questions without repeating context\n"
-                   "- Get AI-powered insights\n"
-                   "- Search similar past conversations\n\n"
-                   "Once you upload data, come back here to start chatting!")
-        else:
-            # Sidebar controls
-            with st.sidebar:
-                st.markdown("---")
-                st.markdown("### 💭 Chat Controls")
-                
-                if st.button("🆕 New Conversation", use_container_width=True):
-                    conversation_manager.start_new_conversation(title=f"Chat {len(st.session_state.chat_messages) + 1}")
-                    st.session_state.chat_messages = []
-                    st.session_state.conversation_started = True
-                    st.success("✅ New conversation started!")
-                    st.rerun()
-                
-                if st.button("🗑️ Clear Chat", use_container_width=True):
-                    st.session_state.chat_messages = []
-                    conversation_manager.clear_context()
-                    st.success("✅ Chat cleared!")
-                    st.rerun()
-                
-                # Context toggle
-                use_context = st.checkbox("Use Conversation Context", value=True, 
-                                        help="AI remembers previous messages")
-                
-                # Show conversation stats
-                if st.session_state.conversation_started:
-                    summary = conversation_manager.get_conversation_summary()
-                    st.markdown("#### 📊 Stats")
-                    st.metric("Messages", summary['message_count'])
-                    st.metric("User", summary['user_messages'])
-                    st.metric("Assistant", summary['assistant_messages'])
-            
-            # Main chat interface
-            st.markdown("### 💬 Conversation")
-            
-            # Display chat history
-            chat_container = st.container()
-            with chat_container:
-                for i, message in enumerate(st.session_state.chat_messages):
-                    with st.chat_message(message["role"]):
-                        st.markdown(message["content"])
-                        
-                        # Show additional info for query results
-                        if message.get("metadata"):
-                            metadata = message["metadata"]
-                            
-                            if metadata.get("type") == "query_result":
-                                # Show SQL in expander
-                                with st.expander("🔍 View SQL Query"):
-                                    st.code(metadata.get("sql", ""), language="sql")
-                                
-                                # Show results table
-                                if metadata.get("results") is not None:
-                                    st.dataframe(
-                                        metadata["results"],
-                                        use_container_width=True,
-                                        height=300
-                                    )
-                                    st.caption(f"📊 Showing {len(metadata['results'])} rows")
-            
-            # Chat input
+        # Tips section
+        st.markdown("---")
+        st.markdown("### 💡 Tips for Asking Questions")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("""
+            **✅ Good Questions:**
+            - "What is the average price?"
+            - "Show me the top 10 products"
+            - "Count the total number of orders"
+            - "Group sales by category"
+            """)
+        
+        with col2:
+            st.markdown("""
+            **❌ Avoid:**
+            - Too vague: "Show me data"
+            - Wrong column names
+            - Complex joins (use uploaded data as single table)
+            - Multiple unrelated questions
+            """)
+
+
+def _render_chat():
+    """Chat tab"""
+    st.markdown("## 💭 Chat with Your Data")
+    st.caption("Have a conversation with your data - I'll remember the context!")
+    
+    # Initialize chat history in session state
+    if 'chat_messages' not in st.session_state:
+        st.session_state.chat_messages = []
+    if 'conversation_started' not in st.session_state:
+        st.session_state.conversation_started = False
+    
+    # Check if data is uploaded
+    if st.session_state.uploaded_data is None:
+        st.warning("⚠️  Please upload data first in the 'Upload Data' tab!")
+        st.info("💡 **What you can do with Chat:**\n\n"
+               "- Have natural conversations about your data\n"
+               "- Ask follow-up questions without repeating context\n"
+               "- Get AI-powered insights\n"
+               "- Search similar past conversations\n\n"
+               "Once you upload data, come back here to start chatting!")
+    else:
+        # Sidebar controls
+        with st.sidebar:
             st.markdown("---")
-            user_message = st.chat_input("Ask me anything about your data...")
+            st.markdown("### 💭 Chat Controls")
             
-            if user_message:
-                # Start conversation if not started
-                if not st.session_state.conversation_started:
-                    conversation_manager.start_new_conversation(title=f"Chat - {user_message[:30]}")
-                    st.session_state.conversation_started = True
-                
-                # Add user message to display
-                st.session_state.chat_messages.append({
-                    "role": "user",
-                    "content": user_message,
-                    "metadata": {}
-                })
-                
-                # Process with chat handler
-                with st.spinner("🤔 Thinking..."):
-                    response = chat_handler.process_chat_message(
-                        message=user_message,
-                        df=st.session_state.uploaded_data['dataframe'],
-                        use_context=use_context
-                    )
-                
-                # Add assistant response
-                assistant_message = {
-                    "role": "assistant",
-                    "content": response.get("content", "I couldn't process that request."),
-                    "metadata": response
-                }
-                st.session_state.chat_messages.append(assistant_message)
-                
-                # Rerun to show new messages
+            if st.button("🆕 New Conversation", use_container_width=True):
+                _conversation_manager().start_new_conversation(title=f"Chat {len(st.session_state.chat_messages) + 1}")
+                st.session_state.chat_messages = []
+                st.session_state.conversation_started = True
+                st.success("✅ New conversation started!")
                 st.rerun()
             
-            # Quick actions
-            if st.session_state.chat_messages:
-                st.markdown("---")
-                st.markdown("### ⚡ Quick Actions")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    if st.button("💡 Get Help"):
-                        help_response = chat_handler._handle_help()
-                        st.session_state.chat_messages.append({
-                            "role": "assistant",
-                            "content": help_response["content"],
-                            "metadata": help_response
-                        })
-                        st.rerun()
-                
-                with col2:
-                    if st.button("📊 Show Summary"):
-                        summary_msg = f"You've asked {conversation_manager.get_conversation_summary()['user_messages']} questions in this conversation."
-                        st.session_state.chat_messages.append({
-                            "role": "assistant",
-                            "content": summary_msg,
-                            "metadata": {"type": "summary"}
-                        })
-                        st.rerun()
-                
-                with col3:
-                    if st.button("🔍 Search Similar"):
-                        if st.session_state.chat_messages:
-                            last_user_msg = conversation_manager.get_last_user_message()
-                            if last_user_msg:
-                                st.info("🔍 Searching for similar past conversations...")
-                                similar = conversation_manager.search_similar_conversations(last_user_msg, n_results=3)
-                                if similar:
-                                    st.success(f"✅ Found {len(similar)} similar conversations!")
-                                else:
-                                    st.info("No similar conversations found yet.")
+            if st.button("🗑️ Clear Chat", use_container_width=True):
+                st.session_state.chat_messages = []
+                _conversation_manager().clear_context()
+                st.success("✅ Chat cleared!")
+                st.rerun()
             
-            # ChromaDB indicator
-            st.markdown("---")
-            st.caption("🔍 **ChromaDB Active**: Conversation history is being stored with semantic search capabilities")
-    
-    with tab5:
-        st.markdown("## 📄 Generate Professional Reports")
-        st.caption("Create and export comprehensive data analysis reports")
+            # Context toggle
+            use_context = st.checkbox("Use Conversation Context", value=True, 
+                                    help="AI remembers previous messages")
+            
+            # Show conversation stats
+            if st.session_state.conversation_started:
+                summary = _conversation_manager().get_conversation_summary()
+                st.markdown("#### 📊 Stats")
+                st.metric("Messages", summary['message_count'])
+                st.metric("User", summary['user_messages'])
+                st.metric("Assistant", summary['assistant_messages'])
         
-        # Check if data is uploaded
-        if st.session_state.uploaded_data is None:
-            st.warning("⚠️  Please upload data first in the 'Upload Data' tab!")
-            st.info("💡 **Report Features:**\n\n"
-                   "- 📄 Professional PDF reports with formatting\n"
-                   "- 📊 Excel exports with multiple sheets\n"
-                   "- 📈 Include statistics, insights, and visualizations\n"
-                   "- 💾 Download and share with stakeholders\n\n"
-                   "Once you upload data, come back here to generate reports!")
-        else:
-            st.markdown("### 📋 Report Configuration")
+        # Main chat interface
+        st.markdown("### 💬 Conversation")
+        
+        # Display chat history
+        chat_container = st.container()
+        with chat_container:
+            _chat_history_panel()
+        
+        # Chat input
+        st.markdown("---")
+        user_message = st.chat_input("Ask me anything about your data...")
+        
+        if user_message:
+            # Start conversation if not started
+            if not st.session_state.conversation_started:
+                _conversation_manager().start_new_conversation(title=f"Chat - {user_message[:30]}")
+                st.session_state.conversation_started = True
             
-            # Report settings
-            col1, col2 = st.columns(2)
+            # Add user message to display
+            st.session_state.chat_messages.append({
+                "role": "user",
+                "content": user_message,
+                "metadata": {}
+            })
             
-            with col1:
-                report_title = st.text_input(
-                    "Report Title",
-                    value=f"Data Analysis Report - {datetime.now().strftime('%Y-%m-%d')}",
-                    help="Custom title for your report"
+            # Process with chat handler
+            with st.spinner("🤔 Thinking..."):
+                response = _chat_handler().process_chat_message(
+                    message=user_message,
+                    df=st.session_state.uploaded_data['dataframe'],
+                    use_context=use_context
                 )
-                
-                include_stats = st.checkbox("Include Statistical Analysis", value=True)
-                include_insights = st.checkbox("Include AI Insights", value=True)
             
-            with col2:
-                export_format = st.selectbox(
-                    "Export Format",
-                    ["PDF", "Excel", "Both"],
-                    help="Choose your preferred export format"
-                )
-                
-                include_raw_data = st.checkbox(
-                    "Include Raw Data (Excel only)",
-                    value=False,
-                    help="Add raw dataset as a separate sheet"
-                )
+            # Add assistant response
+            assistant_message = {
+                "role": "assistant",
+                "content": response.get("content", "I couldn't process that request."),
+                "metadata": _chat_message_metadata(response)
+            }
+            st.session_state.chat_messages.append(assistant_message)
             
+            # Rerun to show new messages
+            st.rerun()
+        
+        # Quick actions
+        if st.session_state.chat_messages:
             st.markdown("---")
+            st.markdown("### ⚡ Quick Actions")
             
-            # Generate report button
-            col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 2])
+            col1, col2, col3 = st.columns(3)
             
-            with col_btn1:
-                if st.button("📄 Generate Report", type="primary", use_container_width=True):
-                    with st.spinner("🔄 Generating report..."):
-                        try:
-                            # Get insights if requested (auto-generate if not available)
-                            insights_data = None
-                            if include_insights:
-                                # Check both possible keys for insights
-                                if 'insights' in st.session_state and st.session_state.insights:
-                                    insights_data = st.session_state.insights
-                                elif 'generated_insights' in st.session_state:
-                                    insights_data = st.session_state.generated_insights
-                                else:
-                                    st.info("💡 Auto-generating AI insights for report...")
-                                    insights_data = insight_generator.generate_comprehensive_insights(
-                                        st.session_state.uploaded_data['dataframe']
-                                    )
-                                    # Store in both keys for consistency
-                                    st.session_state.insights = insights_data
-                                    st.session_state.generated_insights = insights_data
-                            
-                            # Get query history
-                            query_history = st.session_state.get('query_history', [])
-                            
-                            # Create report
-                            report = report_generator.create_report(
-                                df=st.session_state.uploaded_data['dataframe'],
-                                title=report_title,
-                                include_statistics=include_stats,
-                                include_insights=include_insights,
-                                insights_data=insights_data,
-                                query_history=query_history
-                            )
-                            
-                            if report:
-                                st.session_state.generated_report = report
-                                st.success("✅ Report generated successfully!")
-                            else:
-                                st.error("❌ Failed to generate report")
-                                
-                        except Exception as e:
-                            st.error(f"❌ Error generating report: {str(e)}")
+            with col1:
+                if st.button("💡 Get Help"):
+                    help_response = _chat_handler()._handle_help()
+                    st.session_state.chat_messages.append({
+                        "role": "assistant",
+                        "content": help_response["content"],
+                        "metadata": help_response
+                    })
+                    st.rerun()
             
-            # Display generated report
-            if 'generated_report' in st.session_state:
-                st.markdown("---")
-                st.markdown("### 📊 Report Preview")
-                
-                report = st.session_state.generated_report
-                
-                # Report summary
-                with st.expander("📋 Report Summary", expanded=True):
-                    st.markdown(f"**Title:** {report.get('title', 'N/A')}")
-                    st.markdown(f"**Generated:** {report.get('generated_at', 'N/A')}")
-                    
-                    metadata = report.get('metadata', {})
-                    col_a, col_b, col_c = st.columns(3)
-                    with col_a:
-                        st.metric("Total Rows", f"{metadata.get('total_rows', 0):,}")
-                    with col_b:
-                        st.metric("Total Columns", metadata.get('total_columns', 0))
-                    with col_c:
-                        st.metric("File Size", f"{metadata.get('file_size_mb', 0):.2f} MB")
-                    
-                    st.markdown(f"**Sections:** {len(report.get('sections', []))}")
-                    for section in report.get('sections', []):
-                        st.markdown(f"  - {section.get('title', 'Untitled')}")
-                
-                # Download buttons
-                st.markdown("### 💾 Download Report")
-                
-                col_dl1, col_dl2, col_dl3 = st.columns(3)
-                
-                with col_dl1:
-                    if st.button("⬇️ Download PDF", use_container_width=True):
-                        with st.spinner("📄 Creating PDF..."):
-                            success, pdf_bytes, error = pdf_exporter.export_to_pdf(
-                                report,
-                                filename=report_title.replace(' ', '_') + '.pdf'
-                            )
-                            
-                            if success and pdf_bytes:
-                                st.download_button(
-                                    label="📥 Download PDF File",
-                                    data=pdf_bytes,
-                                    file_name=f"{report_title.replace(' ', '_')}.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True
-                                )
-                                if error:
-                                    st.info(error)
-                            else:
-                                st.error(f"❌ PDF export failed: {error}")
-                
-                with col_dl2:
-                    if st.button("⬇️ Download Excel", use_container_width=True):
-                        with st.spinner("📊 Creating Excel..."):
-                            df_to_export = st.session_state.uploaded_data['dataframe'] if include_raw_data else None
-                            success, excel_bytes, error = excel_exporter.export_to_excel(
-                                report,
-                                df=df_to_export,
-                                filename=report_title.replace(' ', '_') + '.xlsx'
+            with col2:
+                if st.button("📊 Show Summary"):
+                    summary_msg = f"You've asked {_conversation_manager().get_conversation_summary()['user_messages']} questions in this conversation."
+                    st.session_state.chat_messages.append({
+                        "role": "assistant",
+                        "content": summary_msg,
+                        "metadata": {"type": "summary"}
+                    })
+                    st.rerun()
+            
+            with col3:
+                if st.button("🔍 Search Similar"):
+                    if st.session_state.chat_messages:
+                        last_user_msg = _conversation_manager().get_last_user_message()
+                        if last_user_msg:
+                            st.info("🔍 Searching for similar past conversations...")
+                            similar = _conversation_manager().search_similar_conversations(
+                                last_user_msg,
+                                n_results=3,
+                                embedding=_query_embedding(last_user_msg)
                             )
-                            
-                            if success and excel_bytes:
-                                st.download_button(
-                                    label="📥 Download Excel File",
-                                    data=excel_bytes,
-                                    file_name=f"{report_title.replace(' ', '_')}.xlsx",
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                    use_container_width=True
-                                )
+                            if similar:
+                                st.success(f"✅ Found {len(similar)} similar conversations!")
                             else:
-                                st.error(f"❌ Excel export failed: {error}")
-                
-                with col_dl3:
-                    if st.button("⬇️ Download Data Only", use_container_width=True):
-                        with st.spinner("📊 Creating Excel..."):
-                            success, excel_bytes, error = excel_exporter.export_dataframe_to_excel(
-                                st.session_state.uploaded_data['dataframe'],
-                                filename="data_export.xlsx"
-                            )
-                            
-                            if success and excel_bytes:
-                                st.download_button(
-                                    label="📥 Download Data Excel",
-                                    data=excel_bytes,
-                                    file_name="data_export.xlsx",
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                    use_container_width=True
-                                )
-                            else:
-                                st.error(f"❌ Excel export failed: {error}")
-    
-    with tab6:
-        st.markdown("## 🔧 Setup & Connection Test")
-        
-        st.markdown("### 1. Configuration Check")
-        
-        # Check directories
-        st.write("**📁 Directory Structure:**")
-        dirs_status = {
-            "Upload Directory": settings.upload_dir.exists(),
-            "Data Directory": settings.data_dir.exists(),
-            "Reports Directory": settings.reports_dir.exists(),
-            "Logs Directory": settings.logs_dir.exists(),
-        }
-        
-        for dir_name, exists in dirs_status.items():
-            if exists:
-                st.success(f"✅ {dir_name}: Created")
-            else:
-                st.error(f"❌ {dir_name}: Missing")
-        
-        st.markdown("---")
-        
-        # Test Gemini connection
-        st.markdown("### 2. Gemini AI Connection Test")
-        
-        if st.button("🧪 Test Gemini API", type="primary"):
-            with st.spinner("Testing connection to Gemini AI..."):
-                if initialize_gemini():
-                    success, message = test_gemini_connection()
-                    if success:
-                        st.success("✅ Gemini API is working!")
-                        st.info(f"**Response:** {message}")
-                    else:
-                        st.error(f"❌ Connection failed: {message}")
-                else:
-                    st.error("❌ Gemini API key not configured properly")
+                                st.info("No similar conversations found yet.")
         
+        # ChromaDB indicator
         st.markdown("---")
+        st.caption("🔍 **ChromaDB Active**: Conversation history is being stored with semantic search capabilities")
+
+
+def _render_reports():
+    """Reports tab"""
+    st.markdown("## 📄 Generate Professional Reports")
+    st.caption("Create and export comprehensive data analysis reports")
+    
+    # Check if data is uploaded
+    if st.session_state.uploaded_data is None:
+        st.warning("⚠️  Please upload data first in the 'Upload Data' tab!")
+        st.info("💡 **Report Features:**\n\n"
+               "- 📄 Professional PDF reports with formatting\n"
+               "- 📊 Excel exports with multiple sheets\n"
+               "- 📈 Include statistics, insights, and visualizations\n"
+               "- 💾 Download and share with stakeholders\n\n"
+               "Once you upload data, come back here to generate reports!")
+    else:
+        st.markdown("### 📋 Report Configuration")
         
-        # Test Database
-        st.markdown("### 3. Database Connection Test")
-        
+        # Report settings
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("🧪 Test Database Connection", type="primary"):
-                with st.spinner("Testing database connection..."):
-                    try:
-                        if db_handler.test_connection():
-                            st.success("✅ Database connection successful!")
-                            
-                            # Show stats
-                            try:
-                                stats = db_ops.get_database_stats()
-                                st.info("**Database Statistics:**")
-                                col_a, col_b = st.columns(2)
-                                with col_a:
-                                    st.metric("Users", stats['total_users'])
-                                    st.metric("Datasets", stats['total_datasets'])
-                                    st.metric("Queries", stats['total_queries'])
-                                with col_b:
-                                    st.metric("Insights", stats['total_insights'])
-                                    st.metric("Visualizations", stats['total_visualizations'])
-                                    st.metric("Reports", stats['total_reports'])
-                            except:
-                                st.warning("Database connected but tables may not be initialized")
-                        else:
-                            st.error("❌ Database connection failed!")
-                    except Exception as e:
-                        st.error(f"❌ Error: {str(e)}")
-                        st.info("💡 Run: `python database/init_database.py` to initialize")
+            report_title = st.text_input(
+                "Report Title",
+                value=f"Data Analysis Report - {datetime.now().strftime('%Y-%m-%d')}",
+                help="Custom title for your report"
+            )
+            
+            include_stats = st.checkbox("Include Statistical Analysis", value=True)
+            include_insights = st.checkbox("Include AI Insights", value=True)
         
         with col2:
-            if st.button("🔍 Test Vector Store"):
-                with st.spinner("Testing vector store..."):
-                    try:
-                        collections = vector_store.list_collections()
-                        st.success(f"✅ Vector store working!")
-                        st.info(f"**Collections:** {len(collections)}")
-                        if collections:
-                            st.write("Available collections:", collections)
-                    except Exception as e:
-                        st.error(f"❌ Vector store error: {str(e)}")
+            export_format = st.selectbox(
+                "Export Format",
+                ["PDF", "Excel", "Both"],
+                help="Choose your preferred export format"
+            )
+            
+            include_raw_data = st.checkbox(
+                "Include Raw Data (Excel only)",
+                value=False,
+                help="Add raw dataset as a separate sheet"
+            )
         
         st.markdown("---")
         
-        # Configuration details
-        st.markdown("### 4. Current Configuration")
+        # Generate report button
+        col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 2])
         
-        with st.expander("Show Configuration Details"):
-            config_info = {
-                "Gemini Model": settings.gemini_model,
-                "Database Name": settings.db_name,
-                "Database Host": settings.db_host,
-                "App Port": settings.app_port,
-                "Debug Mode": settings.debug_mode,
-                "Max Upload Size": f"{settings.max_upload_size_mb} MB",
-                "Allowed Files": ", ".join(settings.allowed_extensions),
-            }
+        with col_btn1:
+            if st.button("📄 Generate Report", type="primary", use_container_width=True):
+                with st.spinner("🔄 Generating report..."):
+                    try:
+                        # Get insights if requested (auto-generate if not available)
+                        insights_data = None
+                        if include_insights:
+                            # Check both possible keys for insights
+                            if 'insights' in st.session_state and st.session_state.insights:
+                                insights_data = st.session_state.insights
+                            elif 'generated_insights' in st.session_state:
+                                insights_data = st.session_state.generated_insights
+                            else:
+                                st.info("💡 Auto-generating AI insights for report...")
+                                insights_data = _dataset_insights(
+                                    st.session_state.uploaded_data['dataframe']
+                                )
+                                # Store in both keys for consistency
+                                st.session_state.insights = insights_data
+                                st.session_state.generated_insights = insights_data
+                        
+                        # Get query history
+                        query_history = st.session_state.get('query_history', [])
+                        
+                        # Create report
+                        report = _cached_report(
+                            st.session_state.uploaded_data['dataframe'],
+                            report_title,
+                            include_stats,
+                            include_insights,
+                            insights_data,
+                            query_history
+                        )
+                        
+                        if report:
+                            st.session_state.generated_report = report
+                            st.success("✅ Report generated successfully!")
+                        else:
+                            st.error("❌ Failed to generate report")
+                            
+                    except Exception as e:
+                        st.error(f"❌ Error generating report: {str(e)}")
+        
+        # Display generated report
+        if 'generated_report' in st.session_state:
+            st.markdown("---")
+            st.markdown("### 📊 Report Preview")
+            
+            report = st.session_state.generated_report
+            
+            # Report summary
+            with st.expander("📋 Report Summary", expanded=True):
+                st.markdown(f"**Title:** {report.get('title', 'N/A')}")
+                st.markdown(f"**Generated:** {report.get('generated_at', 'N/A')}")
+                
+                metadata = report.get('metadata', {})
+                col_a, col_b, col_c = st.columns(3)
+                with col_a:
+                    st.metric("Total Rows", f"{metadata.get('total_rows', 0):,}")
+                with col_b:
+                    st.metric("Total Columns", metadata.get('total_columns', 0))
+                with col_c:
+                    st.metric("File Size", f"{metadata.get('file_size_mb', 0):.2f} MB")
+                
+                st.markdown(f"**Sections:** {len(report.get('sections', []))}")
+                for section in report.get('sections', []):
+                    st.markdown(f"  - {section.get('title', 'Untitled')}")
+            
+            # Download buttons
+            st.markdown("### 💾 Download Report")
+            
+            col_dl1, col_dl2, col_dl3 = st.columns(3)
+            
+            file_stem = report_title.replace(' ', '_')
+            
+            # Only the selected formats are built; each is cached per input
+            with col_dl1:
+                if export_format in ("PDF", "Both"):
+                    success, pdf_bytes, error = _pdf_bytes(report, file_stem + '.pdf')
+                    if success and pdf_bytes:
+                        st.download_button(
+                            label="⬇️ Download PDF",
+                            data=pdf_bytes,
+                            file_name=f"{file_stem}.pdf",
+                            mime="application/pdf",
+                            use_container_width=True
+                        )
+                        if error:
+                            st.info(error)
+                    else:
+                        st.error(f"❌ PDF export failed: {error}")
+            
+            with col_dl2:
+                if export_format in ("Excel", "Both"):
+                    df_to_export = st.session_state.uploaded_data['dataframe'] if include_raw_data else None
+                    success, excel_bytes, error = _report_excel_bytes(report, df_to_export, file_stem + '.xlsx')
+                    if success and excel_bytes:
+                        st.download_button(
+                            label="⬇️ Download Excel",
+                            data=excel_bytes,
+                            file_name=f"{file_stem}.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True
+                        )
+                    else:
+                        st.error(f"❌ Excel export failed: {error}")
             
-            for key, value in config_info.items():
-                st.text(f"{key}: {value}")
+            with col_dl3:
+                # The full dataset can be large, so it is only exported on request
+                if st.button("📊 Export Data Only", use_container_width=True):
+                    st.session_state['_data_export_requested'] = True
+                
+                if st.session_state.get('_data_export_requested'):
+                    success, excel_bytes, error = _data_excel_bytes(st.session_state.uploaded_data['dataframe'])
+                    if success and excel_bytes:
+                        st.download_button(
+                            label="⬇️ Download Data Only",
+                            data=excel_bytes,
+                            file_name="data_export.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True
+                        )
+                    else:
+                        st.error(f"❌ Excel export failed: {error}")
+
+
+def _render_setup_test():
+    """Setup Test tab"""
+    st.markdown("## 🔧 Setup & Connection Test")
+    
+    st.markdown("### 1. Configuration Check")
     
-    with tab7:
-        st.markdown("## 📚 How to Use DataWise AI")
+    # Check directories
+    st.write("**📁 Directory Structure:**")
+    dirs_status = {
+        "Upload Directory": settings.upload_dir.exists(),
+        "Data Directory": settings.data_dir.exists(),
+        "Reports Directory": settings.reports_dir.exists(),
+        "Logs Directory": settings.logs_dir.exists(),
+    }
+    
+    for dir_name, exists in dirs_status.items():
+        if exists:
+            st.success(f"✅ {dir_name}: Created")
+        else:
+            st.error(f"❌ {dir_name}: Missing")
+    
+    st.markdown("---")
+    
+    # Test Gemini connection
+    st.markdown("### 2. Gemini AI Connection Test")
+    
+    if st.button("🧪 Test Gemini API", type="primary"):
+        with st.spinner("Testing connection to Gemini AI..."):
+            if initialize_gemini():
+                success, message = test_gemini_connection()
+                if success:
+                    st.success("✅ Gemini API is working!")
+                    st.info(f"**Response:** {message}")
+                else:
+                    st.error(f"❌ Connection failed: {message}")
+            else:
+                st.error("❌ Gemini API key not configured properly")
+    
+    st.markdown("---")
+    
+    # Test Database
+    st.markdown("### 3. Database Connection Test")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("🧪 Test Database Connection", type="primary"):
+            with st.spinner("Testing database connection..."):
+                try:
+                    if _db_ok():
+                        st.success("✅ Database connection successful!")
+                        
+                        # Show stats
+                        try:
+                            stats = _db_stats()
+                            st.info("**Database Statistics:**")
+                            col_a, col_b = st.columns(2)
+                            with col_a:
+                                st.metric("Users", stats['total_users'])
+                                st.metric("Datasets", stats['total_datasets'])
+                                st.metric("Queries", stats['total_queries'])
+                            with col_b:
+                                st.metric("Insights", stats['total_insights'])
+                                st.metric("Visualizations", stats['total_visualizations'])
+                                st.metric("Reports", stats['total_reports'])
+                        except:
+                            st.warning("Database connected but tables may not be initialized")
+                    else:
+                        st.error("❌ Database connection failed!")
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
+                    st.info("💡 Run: `python database/init_database.py` to initialize")
+    
+    with col2:
+        if st.button("🔍 Test Vector Store"):
+            with st.spinner("Testing vector store..."):
+                try:
+                    collections = _vector_collections()
+                    st.success(f"✅ Vector store working!")
+                    st.info(f"**Collections:** {len(collections)}")
+                    if collections:
+                        st.write("Available collections:", collections)
+                except Exception as e:
+                    st.error(f"❌ Vector store error: {str(e)}")
+    
+    st.markdown("---")
+    
+    # Configuration details
+    st.markdown("### 4. Current Configuration")
+    
+    with st.expander("Show Configuration Details"):
+        config_info = {
+            "Gemini Model": settings.gemini_model,
+            "Database Name": settings.db_name,
+            "Database Host": settings.db_host,
+            "App Port": settings.app_port,
+            "Debug Mode": settings.debug_mode,
+            "Max Upload Size": f"{settings.max_upload_size_mb} MB",
+            "Allowed Files": ", ".join(settings.allowed_extensions),
+        }
         
+        for key, value in config_info.items():
+            st.text(f"{key}: {value}")
+
+
+def _render_how_to_use():
+    """How to Use tab"""
+    st.markdown("## 📚 How to Use DataWise AI")
+    
+    st.markdown("""
+    ### Getting Started
+    
+    **DataWise AI** is your intelligent companion for data analysis. Here's how it works:
+    
+    #### Step 1: Upload Your Data 📁
+    - Support for CSV, Excel, and JSON files
+    - Automatic data validation and preview
+    - Data stored securely in PostgreSQL
+    
+    #### Step 2: Ask Questions 💬
+    - Use natural language: "What's the average sales?"
+    - AI converts your question to SQL automatically
+    - Get instant results in table format
+    
+    #### Step 3: Chat with Your Data 💭
+    - **NEW!** Have a conversation with your data
+    - Ask follow-up questions naturally
+    - Context-aware responses (I remember what you asked before!)
+    - Powered by ChromaDB for semantic search
+    
+    #### Step 4: Visualize Data 📊
+    - Request charts: "Show me a bar chart of revenue by region"
+    - AI chooses the best visualization
+    - Interactive charts with zoom, pan, and export
+    
+    #### Step 5: Get Insights 🧠
+    - Click "Generate Insights" for automatic analysis
+    - Discover trends, correlations, and anomalies
+    - AI explains findings in plain language
+    
+    #### Step 6: Generate Reports 📄
+    - Create comprehensive reports with one click
+    - Export to PDF or Excel
+    - Professional formatting with charts and insights
+    
+    ---
+    
+    ### Example Questions You Can Ask:
+    
+    - "What are the top 5 products by revenue?"
+    - "Show me sales trends over the last 6 months"
+    - "Which region has the highest growth rate?"
+    - "Are there any unusual patterns in the data?"
+    - "Create a summary report of all key metrics"
+    
+    ---
+    
+    ### Now Available:
+    - ✅ Phase 1: Project foundation & setup
+    - ✅ Phase 2: PostgreSQL database integration
+    - ✅ Phase 3: File upload & data processing
+    - ✅ Phase 4: Natural language queries with Gemini AI
+    - ✅ Phase 5: Interactive data visualizations
+    - ✅ Phase 6: AI-powered insights & statistical analysis
+    - ✅ Phase 7: Conversational chat with context & ChromaDB
+    - ✅ Phase 8: Professional report generation & export
+    
+    ### Coming Soon:
+    - ⏳ Phase 9: Docker containerization
+    - ⏳ Phase 10: Cloud deployment & polish
+    """)
+
+
+# Sidebar navigation label -> tab renderer; only the selected tab runs on a rerun
+TAB_RENDERERS = {
+    "🏠 Home": _render_home,
+    "📁 Upload Data": _render_upload,
+    "💬 Ask Questions": _render_ask,
+    "💭 Chat": _render_chat,
+    "📄 Reports": _render_reports,
+    "🔧 Setup Test": _render_setup_test,
+    "📚 How to Use": _render_how_to_use,
+}
+
+
+def main():
+    """Main application entry point"""
+    
+    # Header
+    st.markdown('<div class="main-header">📊 DataWise AI</div>', unsafe_allow_html=True)
+    st.markdown('<div class="sub-header">Your Intelligent Data Analysis Companion</div>', unsafe_allow_html=True)
+    
+    # Sidebar
+    with st.sidebar:
+        st.image("https://via.placeholder.com/300x100/1f77b4/ffffff?text=DataWise+AI", use_container_width=True)
+        st.markdown("---")
+        active_tab = st.radio("View", list(TAB_RENDERERS), key='tab')
+        st.markdown("---")
+        st.markdown("### 🚀 Features")
         st.markdown("""
-        ### Getting Started
-        
-        **DataWise AI** is your intelligent companion for data analysis. Here's how it works:
-        
-        #### Step 1: Upload Your Data 📁
-        - Support for CSV, Excel, and JSON files
-        - Automatic data validation and preview
-        - Data stored securely in PostgreSQL
-        
-        #### Step 2: Ask Questions 💬
-        - Use natural language: "What's the average sales?"
-        - AI converts your question to SQL automatically
-        - Get instant results in table format
-        
-        #### Step 3: Chat with Your Data 💭
-        - **NEW!** Have a conversation with your data
-        - Ask follow-up questions naturally
-        - Context-aware responses (I remember what you asked before!)
-        - Powered by ChromaDB for semantic search
-        
-        #### Step 4: Visualize Data 📊
-        - Request charts: "Show me a bar chart of revenue by region"
-        - AI chooses the best visualization
-        - Interactive charts with zoom, pan, and export
-        
-        #### Step 5: Get Insights 🧠
-        - Click "Generate Insights" for automatic analysis
-        - Discover trends, correlations, and anomalies
-        - AI explains findings in plain language
-        
-        #### Step 6: Generate Reports 📄
-        - Create comprehensive reports with one click
-        - Export to PDF or Excel
-        - Professional formatting with charts and insights
-        
-        ---
-        
-        ### Example Questions You Can Ask:
-        
-        - "What are the top 5 products by revenue?"
-        - "Show me sales trends over the last 6 months"
-        - "Which region has the highest growth rate?"
-        - "Are there any unusual patterns in the data?"
-        - "Create a summary report of all key metrics"
+        - 📁 Upload CSV, Excel, JSON
+        - 💬 Ask questions in natural language
+        - 📊 Auto-generate visualizations
+        - 🧠 AI-powered insights
+        - 📄 Generate reports
+        - 💾 Query history
+        """)
+        st.markdown("---")
+        st.markdown("### ⚙️ Status")
         
-        ---
+        _status_panel()
         
-        ### Now Available:
-        - ✅ Phase 1: Project foundation & setup
-        - ✅ Phase 2: PostgreSQL database integration
-        - ✅ Phase 3: File upload & data processing
-        - ✅ Phase 4: Natural language queries with Gemini AI
-        - ✅ Phase 5: Interactive data visualizations
-        - ✅ Phase 6: AI-powered insights & statistical analysis
-        - ✅ Phase 7: Conversational chat with context & ChromaDB
-        - ✅ Phase 8: Professional report generation & export
+        st.markdown("---")
+        st.markdown("### 📖 About")
+        st.info("""
+        **DataWise AI** helps you analyze data using natural language.
         
-        ### Coming Soon:
-        - ⏳ Phase 9: Docker containerization
-        - ⏳ Phase 10: Cloud deployment & polish
+        Built with:
+        - 🤖 Google Gemini AI
+        - 📊 Streamlit
+        - 🗄️ PostgreSQL
+        - 🔍 ChromaDB
         """)
+    
+    # Session state the tabs share, set up before any tab reads it
+    if 'uploaded_data' not in st.session_state:
+        st.session_state.uploaded_data = None
+    if 'dataset_id' not in st.session_state:
+        st.session_state.dataset_id = None
+    
+    # Main content area - render only the selected tab
+    TAB_RENDERERS[active_tab]()
 
 
 if __name__ == "__main__":
@@ -3,7 +3,15 @@ Chat Package
 Contains conversation management and chat interface
 """
 
-from chat.conversation_manager import conversation_manager
-from chat.chat_handler import chat_handler
-
 __all__ = ['conversation_manager', 'chat_handler']
+
+
+def __getattr__(name: str):
+    """Import the chat singletons only when first used (PEP 562)"""
+    if name == 'conversation_manager':
+        from chat.conversation_manager import conversation_manager
+        return conversation_manager
+    if name == 'chat_handler':
+        from chat.chat_handler import chat_handler
+        return chat_handler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,19 +3,140 @@ Chat Handler
 Handles chat-based queries with conversational AI
 """
 
+import re
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
-import sys
-from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
 
-from ai_engine.gemini_handler import gemini_handler
-from ai_engine.nl_to_sql import nl_to_sql_converter
-from ai_engine.query_executor import query_executor
-from chat.conversation_manager import conversation_manager
+_HELP_KEYWORDS = ['help', 'how to', 'what can you', 'guide']
+
+_QUERY_KEYWORDS = [
+    # Action words
+    'show', 'display', 'list', 'get', 'find', 'filter', 'select',
+    # Question words
+    'what', 'which', 'who', 'where', 'when', 'whose',
+    # Aggregations
+    'how many', 'count', 'sum', 'total', 'average', 'mean', 'median',
+    # Comparisons
+    'top', 'bottom', 'highest', 'lowest', 'max', 'min', 'maximum', 'minimum',
+    'greater', 'less', 'more', 'fewer', 'older', 'younger', 'bigger', 'smaller',
+    # Data exploration
+    'rows', 'columns', 'all', 'every', 'each', 'first', 'last',
+    # Conditional
+    'with', 'having', 'contain', 'include', 'exclude'
+]
+
+
+def _keyword_regex(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into one alternation anchored at a word start"""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + ')')
+
+
+# One scan of the message per intent instead of one per keyword.
+# Only the start is anchored, so "showing" or "contains" still match
+_HELP_RE = _keyword_regex(_HELP_KEYWORDS)
+_QUERY_RE = _keyword_regex(_QUERY_KEYWORDS)
+
+# First words that already decide a query, checked before the regex scan
+_QUERY_STARTERS = frozenset({
+    'show', 'display', 'list', 'get', 'find', 'filter', 'select',
+    'what', 'which', 'who', 'where', 'when', 'count', 'sum', 'total', 'average'
+})
+
+
+HELP_TEXT = """I can help you analyze your data! Here's what you can do:
+
+**Ask Questions:**
+- "What is the average sales?"
+- "Show me the top 10 products"
+- "How many rows are in the data?"
+
+**Get Insights:**
+- "What trends do you see?"
+- "Are there any outliers?"
+- "Summarize this data"
+
+**Visualize:**
+- "Show me a chart of sales by region"
+- "Create a pie chart"
+
+**Follow-up:**
+- I remember our conversation, so you can ask follow-up questions!
+- "What about for last month?" (after asking about sales)
+
+Just ask naturally - I'll figure out what you need!"""
+
+
+# Questions answered straight from the DataFrame, without an NL-to-SQL call.
+# Patterns match the whole message so filtered variants still go to Gemini.
+# Each handler returns (results, equivalent SQL shown to the user)
+_FAST_QUERIES = [
+    (
+        re.compile(r'^(?:how many rows(?: are there)?(?: in (?:the|this) data(?:set)?)?|count (?:the |all )?rows)\??$'),
+        lambda df, m: (pd.DataFrame({'count': [len(df)]}), "SELECT COUNT(*) AS count FROM data")
+    ),
+    (
+        re.compile(r'^(?:list|show)(?: me)?(?: all)?(?: the)? columns\??$'),
+        lambda df, m: (pd.DataFrame({'column': df.columns}), "DESCRIBE data")
+    ),
+    (
+        re.compile(r'^(?:(?:show|display)(?: me)?(?: the)? )?first (\d+) rows?\??$'),
+        lambda df, m: (df.head(int(m.group(1))), f"SELECT * FROM data LIMIT {int(m.group(1))}")
+    ),
+]
+
+
+def _fast_query(message: str, df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, str]]:
+    """
+    Answer trivial questions directly from the DataFrame
+    
+    Args:
+        message: User message
+        df: DataFrame
+    
+    Returns:
+        (results, sql) or None if the message needs NL-to-SQL
+    """
+    message = " ".join(message.lower().split())
+    for pattern, handler in _FAST_QUERIES:
+        match = pattern.match(message)
+        if match:
+            return handler(df, match)
+    return None
+
+
+_SUGGESTED_FOLLOWUPS = (
+    "Show me more details",
+    "What about the top 5?",
+    "Can you visualize this?"
+)
+
+
+def _format_count(value, kind: str) -> str:
+    # Integer arrays cannot hold NaN and floats are NaN only if unequal to themselves
+    if kind in 'iu' or (kind == 'f' and value == value) or (kind not in 'iuf' and pd.notna(value)):
+        return f"**The answer is: {int(value)}**"
+    return "**The answer is: N/A**"
+
+
+def _format_average(value, kind: str) -> str:
+    return f"**The average is: {float(value):.2f}**"
+
+
+def _format_total(value, kind: str) -> str:
+    return f"**The total is: {float(value):,.2f}**"
+
+
+# Single-value answer formats, checked in order against the question
+_VALUE_FORMATS = {
+    'how many': _format_count,
+    'count': _format_count,
+    'average': _format_average,
+    'mean': _format_average,
+    'sum': _format_total,
+    'total': _format_total,
+}
 
 
 class ChatHandler:
@@ -25,10 +146,43 @@ class ChatHandler:
     
     def __init__(self):
         """Initialize chat handler"""
-        self.gemini = gemini_handler
-        self.nl_to_sql = nl_to_sql_converter
-        self.query_exec = query_executor
-        self.conversation = conversation_manager
+        # AI engine and storage backends are imported on first use
+        self._gemini = None
+        self._nl_to_sql = None
+        self._query_exec = None
+        self._conversation = None
+    
+    @property
+    def gemini(self):
+        """Gemini handler, created on first use"""
+        if self._gemini is None:
+            from ai_engine.gemini_handler import get_gemini_handler
+            self._gemini = get_gemini_handler()
+        return self._gemini
+    
+    @property
+    def nl_to_sql(self):
+        """NL to SQL converter, imported on first use"""
+        if self._nl_to_sql is None:
+            from ai_engine.nl_to_sql import get_nl_to_sql_converter
+            self._nl_to_sql = get_nl_to_sql_converter()
+        return self._nl_to_sql
+    
+    @property
+    def query_exec(self):
+        """Query executor, imported on first use"""
+        if self._query_exec is None:
+            from ai_engine.query_executor import query_executor
+            self._query_exec = query_executor
+        return self._query_exec
+    
+    @property
+    def conversation(self):
+        """Conversation manager, imported on first use"""
+        if self._conversation is None:
+            from chat.conversation_manager import conversation_manager
+            self._conversation = conversation_manager
+        return self._conversation
     
     def process_chat_message(
         self,
@@ -92,28 +246,12 @@ class ChatHandler:
         """
         message_lower = message.lower()
         
-        # Help keywords
-        if any(word in message_lower for word in ['help', 'how to', 'what can you', 'guide']):
+        if _HELP_RE.search(message_lower):
             return 'help'
         
         # Query keywords (if data available)
         if df is not None:
-            query_keywords = [
-                # Action words
-                'show', 'display', 'list', 'get', 'find', 'filter', 'select',
-                # Question words
-                'what', 'which', 'who', 'where', 'when', 'whose',
-                # Aggregations
-                'how many', 'count', 'sum', 'total', 'average', 'mean', 'median',
-                # Comparisons
-                'top', 'bottom', 'highest', 'lowest', 'max', 'min', 'maximum', 'minimum',
-                'greater', 'less', 'more', 'fewer', 'older', 'younger', 'bigger', 'smaller',
-                # Data exploration
-                'rows', 'columns', 'all', 'every', 'each', 'first', 'last',
-                # Conditional
-                'where', 'with', 'having', 'contain', 'include', 'exclude'
-            ]
-            if any(keyword in message_lower for keyword in query_keywords):
+            if message_lower.partition(' ')[0] in _QUERY_STARTERS or _QUERY_RE.search(message_lower):
                 return 'query'
         
         # Default to chat
@@ -137,6 +275,18 @@ class ChatHandler:
             Response dictionary
         """
         try:
+            fast = _fast_query(message, df)
+            if fast is not None:
+                results, sql = fast
+                logger.info("⚡ Answered query without NL-to-SQL")
+                return {
+                    'type': 'query_result',
+                    'content': self._generate_response_text(message, results, sql),
+                    'sql': sql,
+                    'results': results,
+                    'row_count': len(results)
+                }
+            
             # Build context-aware query
             if use_context and self.conversation.has_context():
                 context_string = self.conversation.get_context_string(last_n=3)
@@ -237,31 +387,9 @@ User: {message}"""
         Returns:
             Help response dictionary
         """
-        help_text = """I can help you analyze your data! Here's what you can do:
-
-**Ask Questions:**
-- "What is the average sales?"
-- "Show me the top 10 products"
-- "How many rows are in the data?"
-
-**Get Insights:**
-- "What trends do you see?"
-- "Are there any outliers?"
-- "Summarize this data"
-
-**Visualize:**
-- "Show me a chart of sales by region"
-- "Create a pie chart"
-
-**Follow-up:**
-- I remember our conversation, so you can ask follow-up questions!
-- "What about for last month?" (after asking about sales)
-
-Just ask naturally - I'll figure out what you need!"""
-        
         return {
             'type': 'help',
-            'content': help_text
+            'content': HELP_TEXT
         }
     
     def _generate_response_text(
@@ -289,19 +417,15 @@ Just ask naturally - I'll figure out what you need!"""
                 return "No results found for your query."
             elif row_count == 1 and len(results.columns) == 1:
                 # Single value result - clean and simple
-                col_name = results.columns[0]
-                value = results.iloc[0, 0]
+                arr = results.to_numpy()
+                value = arr[0, 0]
                 
                 # Format based on question context
                 question_lower = question.lower()
-                if 'how many' in question_lower or 'count' in question_lower:
-                    return f"**The answer is: {int(value) if pd.notna(value) else 'N/A'}**"
-                elif 'average' in question_lower or 'mean' in question_lower:
-                    return f"**The average is: {float(value):.2f}**"
-                elif 'sum' in question_lower or 'total' in question_lower:
-                    return f"**The total is: {float(value):,.2f}**"
-                else:
-                    return f"**Result: {value}**"
+                tag = next((tag for tag in _VALUE_FORMATS if tag in question_lower), None)
+                if tag:
+                    return _VALUE_FORMATS[tag](value, arr.dtype.kind)
+                return f"**Result: {value}**"
             elif row_count == 1:
                 # Single row with multiple columns
                 values = results.iloc[0].to_dict()
@@ -333,7 +457,7 @@ Do not include technical jargon or column names."""
             logger.error(f"❌ Error generating response: {e}")
             return "Query executed successfully. Check the results below."
     
-    def get_suggested_followups(self, last_query: str) -> List[str]:
+    def get_suggested_followups(self, last_query: str) -> Tuple[str, ...]:
         """
         Generate suggested follow-up questions
         
@@ -341,17 +465,9 @@ Do not include technical jargon or column names."""
             last_query: Last query executed
         
         Returns:
-            List of suggestions
+            Tuple of suggestions
         """
-        suggestions = [
-            "Show me more details",
-            "What about the top 5?",
-            "Can you visualize this?",
-            "What trends do you see?",
-            "Are there any outliers?"
-        ]
-        
-        return suggestions[:3]
+        return _SUGGESTED_FOLLOWUPS
 
 
 # Global instance
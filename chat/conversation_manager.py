@@ -3,19 +3,21 @@ Conversation Manager
 Manages chat conversations with context and history
 """
 
+import atexit
+import itertools
+import queue
+import threading
+import time
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
-import sys
-from pathlib import Path
 from datetime import datetime
 import uuid
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+from collections import Counter, deque
 
 from database.vector_store import vector_store
 from database.postgres_handler import db_ops
+from config import settings
 
 
 class ConversationManager:
@@ -26,8 +28,19 @@ class ConversationManager:
     def __init__(self):
         """Initialize conversation manager"""
         self.current_conversation_id = None
-        self.conversation_context = []
         self.max_context_messages = 10
+        self.conversation_context = deque(maxlen=self.max_context_messages)
+        self._role_counts = Counter()  # Messages per role currently in context
+        self._last_content: Dict[str, str] = {}  # Latest message content per role
+        self._context_strings: Dict[int, str] = {}  # get_context_string results by last_n
+        
+        # Database and ChromaDB writes happen on a background thread, so
+        # adding a message only updates the in-memory context
+        self._write_q = queue.Queue(maxsize=1024)
+        self._encoder = None
+        self._encoder_failed = False
+        threading.Thread(target=self._writer_loop, name="chat-writer", daemon=True).start()
+        atexit.register(self.flush_writes)
     
     def start_new_conversation(self, user_id: int = 1, title: str = "New Chat") -> str:
         """
@@ -50,19 +63,25 @@ class ConversationManager:
             
             if conversation:
                 self.current_conversation_id = str(conversation.id)
-                self.conversation_context = []
+                self.conversation_context.clear()
+                self._role_counts.clear()
+                self._context_strings.clear()
                 logger.info(f"✅ Started new conversation: {self.current_conversation_id}")
                 return self.current_conversation_id
             else:
                 # Fallback to UUID if database fails
                 self.current_conversation_id = str(uuid.uuid4())
-                self.conversation_context = []
+                self.conversation_context.clear()
+                self._role_counts.clear()
+                self._context_strings.clear()
                 return self.current_conversation_id
                 
         except Exception as e:
             logger.error(f"❌ Error starting conversation: {e}")
             self.current_conversation_id = str(uuid.uuid4())
-            self.conversation_context = []
+            self.conversation_context.clear()
+            self._role_counts.clear()
+            self._context_strings.clear()
             return self.current_conversation_id
     
     def add_message(
@@ -86,46 +105,34 @@ class ConversationManager:
             message = {
                 'role': role,
                 'content': content,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp_ns': time.time_ns(),
                 'metadata': metadata or {}
             }
             
-            # Add to context
+            # Add to context (deque drops the oldest beyond max_context_messages)
+            if len(self.conversation_context) == self.max_context_messages:
+                self._role_counts[self.conversation_context[0]['role']] -= 1
             self.conversation_context.append(message)
-            
-            # Keep only last N messages
-            if len(self.conversation_context) > self.max_context_messages:
-                self.conversation_context = self.conversation_context[-self.max_context_messages:]
+            self._role_counts[role] += 1
+            self._last_content[role] = content
+            self._context_strings.clear()
             
             # Save to database
             if self.current_conversation_id:
-                try:
-                    db_ops.create_message(
-                        conversation_id=self.current_conversation_id,
-                        role=role,
-                        content=content,
-                        metadata_json=metadata
-                    )
-                except Exception as e:
-                    logger.warning(f"Could not save message to database: {e}")
+                self._enqueue_write(('message', {
+                    'conversation_id': self.current_conversation_id,
+                    'role': role,
+                    'content': content,
+                    'message_metadata': metadata
+                }))
             
             # Store in vector database for semantic search
-            try:
-                if role == 'user':
-                    import uuid
-                    doc_id = str(uuid.uuid4())
-                    vector_store.add_documents(
-                        collection_name="chat_history",
-                        documents=[content],
-                        metadatas=[{
-                            'conversation_id': self.current_conversation_id,
-                            'role': role,
-                            'timestamp': message['timestamp']
-                        }],
-                        ids=[doc_id]
-                    )
-            except Exception as e:
-                logger.warning(f"Could not store in vector DB: {e}")
+            if role == 'user' and settings.chat_vector_indexing_enabled:
+                self._enqueue_write(('vector', (content, {
+                    'conversation_id': self.current_conversation_id,
+                    'role': role,
+                    'timestamp_ns': message['timestamp_ns']
+                })))
             
             logger.info(f"✅ Added {role} message to conversation")
             return message
@@ -134,6 +141,111 @@ class ConversationManager:
             logger.error(f"❌ Error adding message: {e}")
             return {}
     
+    def _enqueue_write(self, item: Tuple[str, Any]):
+        """
+        Hand a write to the background writer
+        
+        Args:
+            item: ('message', create_message kwargs) or ('vector', (content, metadata))
+        """
+        try:
+            self._write_q.put_nowait(item)
+        except queue.Full:
+            # Writer is far behind - write inline rather than drop the message
+            logger.warning("⚠️  Chat write queue full, writing synchronously")
+            self._write_batch([item])
+    
+    def _writer_loop(self):
+        """Background thread: drain the write queue in batches"""
+        while True:
+            batch = [self._write_q.get()]
+            while len(batch) < settings.chat_vector_batch_size:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"❌ Chat writer error: {e}")
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+    
+    def _write_batch(self, batch: List[Tuple[str, Any]]):
+        """
+        Write queued items: messages in order, then all embeddings in one call
+        
+        Args:
+            batch: Items from the write queue
+        """
+        docs, metas = [], []
+        for kind, payload in batch:
+            if kind == 'message':
+                try:
+                    db_ops.create_message(**payload)
+                except Exception as e:
+                    logger.warning(f"Could not save message to database: {e}")
+            else:
+                content, metadata = payload
+                # Stored metadata keeps the ISO timestamp; format it here, off the request thread
+                metadata = dict(metadata, timestamp=self._fmt_ts(metadata.pop('timestamp_ns')))
+                docs.append(content)
+                metas.append(metadata)
+        
+        if docs:
+            try:
+                vector_store.add_documents(
+                    collection_name="chat_history",
+                    documents=docs,
+                    metadatas=metas,
+                    ids=[str(uuid.uuid4()) for _ in docs],
+                    embeddings=self._embed_batch(docs)
+                )
+            except Exception as e:
+                logger.warning(f"Could not store in vector DB: {e}")
+    
+    def _get_encoder(self):
+        """Load the chat embedding model on first use (writer thread only)"""
+        if self._encoder is None and not self._encoder_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                # Picks up a GPU automatically when one is available
+                self._encoder = SentenceTransformer(settings.chat_embedding_model)
+                logger.info(f"✅ Chat embedding model loaded: {settings.chat_embedding_model}")
+            except Exception as e:
+                self._encoder_failed = True
+                logger.warning(f"⚠️  Chat embedding model unavailable, ChromaDB will embed: {e}")
+        return self._encoder
+    
+    def _embed_batch(self, docs: List[str]) -> Optional[List[List[float]]]:
+        """
+        Embed a batch of messages in one model call
+        
+        Args:
+            docs: Message texts
+        
+        Returns:
+            Embeddings, or None to let ChromaDB embed them itself
+        """
+        encoder = self._get_encoder()
+        if encoder is None:
+            return None
+        try:
+            return encoder.encode(
+                docs,
+                batch_size=settings.chat_vector_batch_size,
+                convert_to_numpy=True
+            ).tolist()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not embed chat messages, ChromaDB will embed: {e}")
+            return None
+    
+    def flush_writes(self):
+        """Block until every queued write has been written"""
+        self._write_q.join()
+    
     def get_context(self, last_n: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get conversation context
@@ -145,8 +257,9 @@ class ConversationManager:
             List of messages
         """
         if last_n:
-            return self.conversation_context[-last_n:]
-        return self.conversation_context
+            start = max(0, len(self.conversation_context) - last_n)
+            return list(itertools.islice(self.conversation_context, start, None))
+        return list(self.conversation_context)
     
     def get_context_string(self, last_n: int = 5) -> str:
         """
@@ -158,6 +271,11 @@ class ConversationManager:
         Returns:
             Formatted context string
         """
+        # Reused until the context changes; query and chat turns ask for it repeatedly
+        cached = self._context_strings.get(last_n)
+        if cached is not None:
+            return cached
+        
         context = self.get_context(last_n)
         
         context_parts = []
@@ -166,12 +284,14 @@ class ConversationManager:
             content = msg['content']
             context_parts.append(f"{role}: {content}")
         
-        return "\n".join(context_parts)
+        self._context_strings[last_n] = "\n".join(context_parts)
+        return self._context_strings[last_n]
     
     def search_similar_conversations(
         self,
         query: str,
-        n_results: int = 5
+        n_results: int = 5,
+        embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar past conversations
@@ -179,15 +299,20 @@ class ConversationManager:
         Args:
             query: Search query
             n_results: Number of results
+            embedding: Precomputed embedding of query (skips re-embedding)
         
         Returns:
             List of similar conversations
         """
         try:
+            # Queued messages must be searchable too
+            self.flush_writes()
+            
             results = vector_store.search_similar(
                 collection_name="chat_history",
                 query_text=query,
-                n_results=n_results
+                n_results=n_results,
+                query_embedding=embedding
             )
             
             logger.info(f"✅ Found {len(results)} similar conversations")
@@ -199,15 +324,24 @@ class ConversationManager:
     
     def clear_context(self):
         """Clear current conversation context"""
-        self.conversation_context = []
+        self.conversation_context.clear()
+        self._role_counts.clear()
+        self._context_strings.clear()
         logger.info("✅ Cleared conversation context")
     
     def end_conversation(self):
         """End current conversation"""
         self.current_conversation_id = None
-        self.conversation_context = []
+        self.conversation_context.clear()
+        self._role_counts.clear()
+        self._context_strings.clear()
         logger.info("✅ Ended conversation")
     
+    @staticmethod
+    def _fmt_ts(ns: int) -> str:
+        """Format a time.time_ns() timestamp as an ISO string"""
+        return datetime.fromtimestamp(ns / 1e9).isoformat()
+    
     def get_conversation_summary(self) -> Dict[str, Any]:
         """
         Get summary of current conversation
@@ -218,10 +352,10 @@ class ConversationManager:
         return {
             'conversation_id': self.current_conversation_id,
             'message_count': len(self.conversation_context),
-            'user_messages': len([m for m in self.conversation_context if m['role'] == 'user']),
-            'assistant_messages': len([m for m in self.conversation_context if m['role'] == 'assistant']),
-            'first_message_time': self.conversation_context[0]['timestamp'] if self.conversation_context else None,
-            'last_message_time': self.conversation_context[-1]['timestamp'] if self.conversation_context else None
+            'user_messages': self._role_counts['user'],
+            'assistant_messages': self._role_counts['assistant'],
+            'first_message_time': self._fmt_ts(self.conversation_context[0]['timestamp_ns']) if self.conversation_context else None,
+            'last_message_time': self._fmt_ts(self.conversation_context[-1]['timestamp_ns']) if self.conversation_context else None
         }
     
     def format_conversation_history(self) -> str:
@@ -248,17 +382,12 @@ class ConversationManager:
     
     def get_last_user_message(self) -> Optional[str]:
         """Get the last user message"""
-        for msg in reversed(self.conversation_context):
-            if msg['role'] == 'user':
-                return msg['content']
-        return None
+        # A zero count means the role was cleared or evicted from context
+        return self._last_content.get('user') if self._role_counts['user'] else None
     
     def get_last_assistant_message(self) -> Optional[str]:
         """Get the last assistant message"""
-        for msg in reversed(self.conversation_context):
-            if msg['role'] == 'assistant':
-                return msg['content']
-        return None
+        return self._last_content.get('assistant') if self._role_counts['assistant'] else None
 
 
 # Global instance
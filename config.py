@@ -24,6 +24,9 @@ class Settings(BaseSettings):
     db_name: str = os.getenv("DB_NAME", "datawise_ai")
     db_user: str = os.getenv("DB_USER", "postgres")
     db_password: str = os.getenv("DB_PASSWORD", "postgres123")
+    db_pool_size: int = 10  # Connections kept open in the pool
+    db_max_overflow: int = 20  # Extra connections allowed under load
+    db_pool_recycle_seconds: int = 3600  # Reconnect pooled connections older than this
     
     # Application Settings
     app_port: int = int(os.getenv("APP_PORT", "8501"))
@@ -44,15 +47,40 @@ class Settings(BaseSettings):
     data_dir: Path = base_dir / "data"
     reports_dir: Path = base_dir / "reports"
     logs_dir: Path = base_dir / "logs"
+    cache_dir: Path = base_dir / ".cache"
     
     # Gemini Model Configuration
     # Try different models in order: gemini-2.0-flash-exp, gemini-1.5-flash, gemini-pro
     gemini_model: str = "gemini-2.0-flash-exp"
     gemini_temperature: float = 0.7
+    gemini_sql_temperature: float = 0.0  # Deterministic SQL generation
+    gemini_explain_temperature: float = 0.5  # Explanations and result analysis
     gemini_max_tokens: int = 2048
+    gemini_max_concurrency: int = 10  # Concurrent async requests per event loop
+    
+    # Query Execution
+    query_threads: int = os.cpu_count() or 1  # DuckDB worker threads per query
+    query_workers: int = 4  # Queries run concurrently by execute_query_async
+    
+    # Semantic Response Cache
+    enable_semantic_cache: bool = os.getenv("ENABLE_SEMANTIC_CACHE", "True").lower() == "true"
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_sql_threshold: float = 1.0  # Exact matches only - "top 5" and "top 10" embed alike
+    semantic_cache_max_rows: int = 5000  # Oldest responses are evicted beyond this
+    semantic_cache_ttl_days: int = 30  # Responses older than this are not served
+    semantic_cache_explain_threshold: float = 0.88
+    gemini_memory_cache_size: int = 512  # Exact-match responses kept in memory per process
+    
+    # Gemini Context Caching (static prompt instructions)
+    enable_context_cache: bool = os.getenv("ENABLE_CONTEXT_CACHE", "True").lower() == "true"
+    context_cache_ttl_seconds: int = 3600
+    context_cache_min_tokens: int = 4096  # Gemini's minimum size for an explicit cache
     
     # ChromaDB Settings
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    chat_vector_indexing_enabled: bool = os.getenv("CHAT_VECTOR_INDEXING", "True").lower() == "true"
+    chat_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"  # Must match ChromaDB's default for query embeddings
+    chat_vector_batch_size: int = 64  # Chat messages embedded per ChromaDB add() call
     
     class Config:
         env_file = ".env"
@@ -70,6 +98,7 @@ class Settings(BaseSettings):
             self.data_dir,
             self.reports_dir,
             self.logs_dir,
+            self.cache_dir,
             Path(self.chroma_persist_dir)
         ]
         for directory in directories:
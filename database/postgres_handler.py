@@ -4,9 +4,11 @@ Manages database connections and provides data access layer
 """
 
 from sqlalchemy import create_engine, text, inspect
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
+import orjson
 from typing import Optional, List, Dict, Any
 from loguru import logger
 import sys
@@ -19,6 +21,15 @@ from config import settings
 from database.models import Base, User, Dataset, Query, Insight, Visualization, Conversation, Message, Report
 
 
+def _json_dumps(value: Any) -> str:
+    """Serialize JSONB column values with orjson instead of the stdlib json module"""
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
 class PostgreSQLHandler:
     """
     PostgreSQL database handler with connection pooling
@@ -36,9 +47,12 @@ class PostgreSQLHandler:
             self.engine = create_engine(
                 settings.database_url,
                 poolclass=QueuePool,
-                pool_size=5,
-                max_overflow=10,
-                pool_pre_ping=True,  # Verify connections before using
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_pre_ping=False,  # No test query per checkout; stale connections are recycled
+                pool_recycle=settings.db_pool_recycle_seconds,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
                 echo=settings.debug_mode  # Log SQL queries in debug mode
             )
             
@@ -372,23 +386,32 @@ class DatabaseOperations:
     def create_message(self, conversation_id: str, role: str, content: str,
                       message_metadata: Dict = None) -> Optional['Message']:
         """Create a new message in conversation"""
-        try:
-            with self.db.get_session() as session:
-                message = Message(
-                    conversation_id=conversation_id,
-                    role=role,
-                    content=content,
-                    message_metadata=message_metadata or {}
-                )
-                session.add(message)
-                session.flush()
-                session.refresh(message)
-                session.expunge(message)
-                logger.info(f"✅ Message created: {role}")
-                return message
-        except Exception as e:
-            logger.error(f"❌ Failed to create message: {e}")
-            return None
+        for attempt in range(2):
+            try:
+                with self.db.get_session() as session:
+                    message = Message(
+                        conversation_id=conversation_id,
+                        role=role,
+                        content=content,
+                        message_metadata=message_metadata or {}
+                    )
+                    session.add(message)
+                    session.flush()
+                    session.refresh(message)
+                    session.expunge(message)
+                    logger.info(f"✅ Message created: {role}")
+                    return message
+            except OperationalError as e:
+                # Without pre-ping a dropped connection surfaces here; the pool
+                # has discarded it, so one retry gets a fresh connection
+                if attempt == 0:
+                    logger.warning(f"⚠️  Retrying message insert after connection error: {e}")
+                    continue
+                logger.error(f"❌ Failed to create message: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"❌ Failed to create message: {e}")
+                return None
     
     def get_conversation_messages(self, conversation_id: str) -> List['Message']:
         """Get all messages in a conversation"""
@@ -5,6 +5,7 @@ Manages document embeddings and similarity search
 
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
 from typing import List, Dict, Any, Optional
 from loguru import logger
 import sys
@@ -25,6 +26,7 @@ class VectorStoreHandler:
         """Initialize ChromaDB client"""
         self.client = None
         self.collections = {}
+        self._embedding_function = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -74,7 +76,8 @@ class VectorStoreHandler:
     
     def add_documents(self, collection_name: str, documents: List[str],
                      metadatas: List[Dict[str, Any]] = None,
-                     ids: List[str] = None) -> bool:
+                     ids: List[str] = None,
+                     embeddings: List[List[float]] = None) -> bool:
         """
         Add documents to a collection
         
@@ -83,6 +86,7 @@ class VectorStoreHandler:
             documents: List of text documents to embed
             metadatas: Optional metadata for each document
             ids: Optional custom IDs for documents
+            embeddings: Optional precomputed embeddings (skips ChromaDB's own)
         
         Returns:
             Success status
@@ -98,7 +102,8 @@ class VectorStoreHandler:
             collection.add(
                 documents=documents,
                 metadatas=metadatas,
-                ids=ids
+                ids=ids,
+                embeddings=embeddings
             )
             
             logger.info(f"✅ Added {len(documents)} documents to {collection_name}")
@@ -108,8 +113,30 @@ class VectorStoreHandler:
             logger.error(f"❌ Failed to add documents: {e}")
             return False
     
+    def embed_query(self, query_text: str) -> Optional[List[float]]:
+        """
+        Embed a query text the way collections embed their queries
+        
+        Collections here are created without an explicit embedding function,
+        so ChromaDB's default one is used for them as well.
+        
+        Args:
+            query_text: Text to embed
+        
+        Returns:
+            Embedding vector, or None if the embedding model is unavailable
+        """
+        try:
+            if self._embedding_function is None:
+                self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
+            return [float(x) for x in self._embedding_function([query_text])[0]]
+        except Exception as e:
+            logger.warning(f"⚠️  Could not embed query, ChromaDB will embed it: {e}")
+            return None
+    
     def query_documents(self, collection_name: str, query_text: str,
-                       n_results: int = 5, where: Dict = None) -> Dict[str, Any]:
+                       n_results: int = 5, where: Dict = None,
+                       query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
         """
         Query documents using semantic search
         
@@ -118,6 +145,7 @@ class VectorStoreHandler:
             query_text: Query text for similarity search
             n_results: Number of results to return
             where: Optional filter criteria
+            query_embedding: Precomputed embedding of query_text (skips re-embedding)
         
         Returns:
             Query results with documents, distances, and metadata
@@ -125,11 +153,18 @@ class VectorStoreHandler:
         try:
             collection = self.get_collection(collection_name)
             
-            results = collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
-                where=where
-            )
+            if query_embedding is not None:
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results,
+                    where=where
+                )
+            else:
+                results = collection.query(
+                    query_texts=[query_text],
+                    n_results=n_results,
+                    where=where
+                )
             
             logger.info(f"✅ Query completed: {collection_name}")
             return results
@@ -207,7 +242,8 @@ class VectorStoreHandler:
             return False
     
     def search_similar(self, collection_name: str, query_text: str, 
-                      n_results: int = 5) -> List[Dict[str, Any]]:
+                      n_results: int = 5,
+                      query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
         """
         Search for similar documents (convenience method)
         
@@ -215,12 +251,16 @@ class VectorStoreHandler:
             collection_name: Name of the collection
             query_text: Query text for similarity search
             n_results: Number of results to return
+            query_embedding: Precomputed embedding of query_text (optional)
         
         Returns:
             List of similar documents with metadata
         """
         try:
-            results = self.query_documents(collection_name, query_text, n_results)
+            results = self.query_documents(
+                collection_name, query_text, n_results,
+                query_embedding=query_embedding
+            )
             
             # Format results as list of dicts
             if 'error' in results:
@@ -3,17 +3,83 @@ Anomaly Detector
 Detects unusual patterns and outliers in data
 """
 
+import warnings
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
 from loguru import logger
 import sys
 from pathlib import Path
-from scipy import stats
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.warning("⚠️  numba not available. Outlier scan will use NumPy.")
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _iqr_outlier_stats(arr, multiplier):
+        """
+        IQR outlier statistics per column, columns scanned in parallel
+        
+        Args:
+            arr: 2-D float64 array, one column per variable, NaN for missing
+            multiplier: IQR multiplier for the bounds
+        
+        Returns:
+            Array of (valid_count, outlier_count, lower_bound, upper_bound) rows
+        """
+        n_cols = arr.shape[1]
+        out = np.empty((n_cols, 4))
+        for j in prange(n_cols):
+            col = arr[:, j]
+            col = col[~np.isnan(col)]
+            out[j, 0] = col.size
+            if col.size == 0:
+                out[j, 1:] = np.nan
+                continue
+            q1 = np.percentile(col, 25)
+            q3 = np.percentile(col, 75)
+            iqr = q3 - q1
+            lo = q1 - multiplier * iqr
+            hi = q3 + multiplier * iqr
+            count = 0
+            for i in range(col.size):
+                if col[i] < lo or col[i] > hi:
+                    count += 1
+            out[j, 1] = count
+            out[j, 2] = lo
+            out[j, 3] = hi
+        return out
+else:
+    def _iqr_outlier_stats(arr, multiplier):
+        """
+        IQR outlier statistics per column, vectorized with NumPy
+        
+        Args:
+            arr: 2-D float64 array, one column per variable, NaN for missing
+            multiplier: IQR multiplier for the bounds
+        
+        Returns:
+            Array of (valid_count, outlier_count, lower_bound, upper_bound) rows
+        """
+        with warnings.catch_warnings():
+            # All-NaN columns produce NaN bounds, reported as insufficient data
+            warnings.simplefilter("ignore", RuntimeWarning)
+            q1, q3 = np.nanpercentile(arr, [25, 75], axis=0)
+        iqr = q3 - q1
+        lo = q1 - multiplier * iqr
+        hi = q3 + multiplier * iqr
+        valid = (~np.isnan(arr)).sum(axis=0)
+        count = ((arr < lo) | (arr > hi)).sum(axis=0)
+        return np.column_stack([valid, count, lo, hi]).astype(np.float64)
+
 
 class AnomalyDetector:
     """
@@ -36,11 +102,8 @@ class AnomalyDetector:
             Dictionary with anomaly detection results
         """
         try:
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            anomalies = {}
-            
-            for col in numeric_cols:
-                anomalies[col] = self.detect_column_anomalies(df, col)
+            numeric_df = df.select_dtypes(include=['number'])
+            anomalies = self._detect_batch(numeric_df) if len(numeric_df.columns) else {}
             
             # Overall summary
             total_anomalies = sum(a['count'] for a in anomalies.values())
@@ -69,42 +132,58 @@ class AnomalyDetector:
             Dictionary with anomaly information
         """
         try:
-            data = df[column].dropna()
-            
-            if len(data) < 4:
-                return {'count': 0, 'method': 'insufficient_data'}
-            
-            # Use IQR method for outlier detection
-            q1 = data.quantile(0.25)
-            q3 = data.quantile(0.75)
-            iqr = q3 - q1
-            
-            lower_bound = q1 - self.iqr_multiplier * iqr
-            upper_bound = q3 + self.iqr_multiplier * iqr
+            return self._detect_batch(df[[column]])[column]
+        except Exception as e:
+            logger.error(f"❌ Error detecting column anomalies: {e}")
+            return {'count': 0, 'method': 'error'}
+    
+    def _detect_batch(self, numeric_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Detect IQR and z-score outliers for all columns of a numeric frame at once
+        
+        Args:
+            numeric_df: DataFrame of numeric columns
+        
+        Returns:
+            Dictionary mapping column names to anomaly information
+        """
+        arr = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        outlier_stats = _iqr_outlier_stats(np.asfortranarray(arr), float(self.iqr_multiplier))
+        
+        lower = outlier_stats[:, 2]
+        upper = outlier_stats[:, 3]
+        outlier_mask = (arr < lower) | (arr > upper)
+        
+        # Z-scores (population std, as scipy.stats.zscore) for validation
+        with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+            # All-NaN and constant columns give NaN/inf z-scores, never counted
+            warnings.simplefilter("ignore", RuntimeWarning)
+            z_scores = np.abs(arr - np.nanmean(arr, axis=0)) / np.nanstd(arr, axis=0)
+        z_counts = (z_scores > self.z_threshold).sum(axis=0)
+        
+        anomalies = {}
+        for j, col in enumerate(numeric_df.columns):
+            valid_count, outlier_count = int(outlier_stats[j, 0]), int(outlier_stats[j, 1])
             
-            # Detect outliers
-            outliers = data[(data < lower_bound) | (data > upper_bound)]
-            outlier_indices = outliers.index.tolist()
+            if valid_count < 4:
+                anomalies[col] = {'count': 0, 'method': 'insufficient_data'}
+                continue
             
-            # Calculate Z-scores for validation
-            z_scores = np.abs(stats.zscore(data))
-            z_outliers = data[z_scores > self.z_threshold]
+            positions = np.flatnonzero(outlier_mask[:, j])[:10]
             
-            return {
-                'count': len(outliers),
-                'percentage': float((len(outliers) / len(data)) * 100),
+            anomalies[col] = {
+                'count': outlier_count,
+                'percentage': float((outlier_count / valid_count) * 100),
                 'method': 'IQR',
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound),
-                'outlier_values': outliers.tolist()[:10],  # First 10
-                'outlier_indices': outlier_indices[:10],
-                'z_score_outliers': len(z_outliers),
-                'severity': self._assess_severity(len(outliers), len(data))
+                'lower_bound': float(lower[j]),
+                'upper_bound': float(upper[j]),
+                'outlier_values': numeric_df.iloc[positions, j].tolist(),  # First 10
+                'outlier_indices': numeric_df.index[positions].tolist(),
+                'z_score_outliers': int(z_counts[j]),
+                'severity': self._assess_severity(outlier_count, valid_count)
             }
-            
-        except Exception as e:
-            logger.error(f"❌ Error detecting column anomalies: {e}")
-            return {'count': 0, 'method': 'error'}
+        
+        return anomalies
     
     def detect_unusual_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
@@ -12,7 +12,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from ai_engine.gemini_handler import gemini_handler
+from ai_engine.gemini_handler import get_gemini_handler
 from insights.statistical_analyzer import statistical_analyzer
 from insights.trend_analyzer import trend_analyzer
 from insights.anomaly_detector import anomaly_detector
@@ -25,7 +25,14 @@ class InsightGenerator:
     
     def __init__(self):
         """Initialize insight generator"""
-        self.gemini = gemini_handler
+        self._gemini = None
+    
+    @property
+    def gemini(self):
+        """Gemini handler, created on first use"""
+        if self._gemini is None:
+            self._gemini = get_gemini_handler()
+        return self._gemini
     
     def generate_comprehensive_insights(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -3,6 +3,7 @@ Trend Analyzer
 Detects and analyzes trends in time series and sequential data
 """
 
+import warnings
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
@@ -34,11 +35,8 @@ class TrendAnalyzer:
             Dictionary with trend analysis
         """
         try:
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            trends = {}
-            
-            for col in numeric_cols:
-                trends[col] = self.analyze_column_trend(df, col)
+            numeric_df = df.select_dtypes(include=['number'])
+            trends = self._analyze_batch(numeric_df) if len(numeric_df.columns) else {}
             
             logger.info(f"✅ Analyzed trends for {len(trends)} columns")
             return trends
@@ -59,17 +57,62 @@ class TrendAnalyzer:
             Dictionary with trend information
         """
         try:
-            data = df[column].dropna()
-            
-            if len(data) < 2:
-                return {'trend': 'insufficient_data'}
-            
-            # Calculate trend direction
-            first_half_mean = data.iloc[:len(data)//2].mean()
-            second_half_mean = data.iloc[len(data)//2:].mean()
+            return self._analyze_batch(df[[column]])[column]
+        except Exception as e:
+            logger.error(f"❌ Error analyzing column trend: {e}")
+            return {'trend': 'error'}
+    
+    def _analyze_batch(self, numeric_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze trends for all columns of a numeric frame with array operations
+        
+        Missing values are skipped per column, so each column's halves, first
+        and last values are taken over its own non-missing values.
+        
+        Args:
+            numeric_df: DataFrame of numeric columns
+        
+        Returns:
+            Dictionary mapping column names to trend information
+        """
+        if len(numeric_df) < 2:
+            return {col: {'trend': 'insufficient_data'} for col in numeric_df.columns}
+        
+        arr = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(arr)
+        counts = valid.sum(axis=0)
+        
+        # Position of each value among its column's non-missing values
+        positions = np.cumsum(valid, axis=0) - 1
+        first_half = valid & (positions < (counts // 2))
+        second_half = valid & ~first_half
+        
+        filled = np.where(valid, arr, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            first_half_mean = (filled * first_half).sum(axis=0) / first_half.sum(axis=0)
+            second_half_mean = (filled * second_half).sum(axis=0) / second_half.sum(axis=0)
+        
+        # First and last non-missing value of each column
+        columns = np.arange(arr.shape[1])
+        first_values = arr[valid.argmax(axis=0), columns]
+        last_values = arr[len(arr) - 1 - valid[::-1].argmax(axis=0), columns]
+        
+        with warnings.catch_warnings():
+            # Columns without values produce NaN stats; they are skipped below
+            warnings.simplefilter("ignore", RuntimeWarning)
+            means = np.nanmean(arr, axis=0)
+            stds = np.nanstd(arr, axis=0, ddof=1)
+            mins = np.nanmin(arr, axis=0)
+            maxs = np.nanmax(arr, axis=0)
+        
+        trends = {}
+        for j, col in enumerate(numeric_df.columns):
+            if counts[j] < 2:
+                trends[col] = {'trend': 'insufficient_data'}
+                continue
             
-            change = second_half_mean - first_half_mean
-            change_percentage = (change / first_half_mean * 100) if first_half_mean != 0 else 0
+            change = second_half_mean[j] - first_half_mean[j]
+            change_percentage = (change / first_half_mean[j] * 100) if first_half_mean[j] != 0 else 0
             
             # Determine trend type
             if abs(change_percentage) < 5:
@@ -79,31 +122,20 @@ class TrendAnalyzer:
             else:
                 trend_type = 'decreasing'
             
-            # Calculate rate of change
-            if len(data) > 1:
-                rate_of_change = (data.iloc[-1] - data.iloc[0]) / len(data)
-            else:
-                rate_of_change = 0
-            
-            # Detect volatility
-            volatility = float(data.std() / data.mean() * 100) if data.mean() != 0 else 0
-            
-            return {
+            trends[col] = {
                 'trend': trend_type,
                 'change': float(change),
                 'change_percentage': float(change_percentage),
-                'rate_of_change': float(rate_of_change),
-                'volatility': volatility,
-                'first_value': float(data.iloc[0]),
-                'last_value': float(data.iloc[-1]),
-                'min_value': float(data.min()),
-                'max_value': float(data.max()),
-                'mean_value': float(data.mean())
+                'rate_of_change': float((last_values[j] - first_values[j]) / counts[j]),
+                'volatility': float(stds[j] / means[j] * 100) if means[j] != 0 else 0,
+                'first_value': float(first_values[j]),
+                'last_value': float(last_values[j]),
+                'min_value': float(mins[j]),
+                'max_value': float(maxs[j]),
+                'mean_value': float(means[j])
             }
-            
-        except Exception as e:
-            logger.error(f"❌ Error analyzing column trend: {e}")
-            return {'trend': 'error'}
+        
+        return trends
     
     def detect_seasonality(self, data: pd.Series, period: int = 7) -> Dict[str, Any]:
         """
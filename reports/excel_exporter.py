@@ -14,6 +14,52 @@ from io import BytesIO
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+# xlsxwriter writes workbooks considerably faster than openpyxl
+try:
+    import xlsxwriter  # noqa: F401
+    EXCEL_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+    logger.warning("⚠️  xlsxwriter not available. Excel files will be written with openpyxl.")
+
+
+def _fit_widths(df: pd.DataFrame, max_width: int = 50) -> List[int]:
+    """
+    Column widths that fit the header and longest value of each column
+    
+    Args:
+        df: DataFrame written to the sheet
+        max_width: Upper bound for a column width
+    
+    Returns:
+        List of widths in column order
+    """
+    widths = []
+    for i in range(df.shape[1]):
+        lengths = df.iloc[:, i].astype(str).str.len()
+        longest = max(len(str(df.columns[i])), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(longest + 2, max_width))
+    return widths
+
+
+def _set_column_widths(writer: pd.ExcelWriter, sheet_name: str, widths: List[int]):
+    """
+    Set column widths on a sheet for either Excel engine
+    
+    Args:
+        writer: Open ExcelWriter
+        sheet_name: Sheet to format
+        widths: Widths in column order
+    """
+    worksheet = writer.sheets[sheet_name]
+    if writer.engine == 'xlsxwriter':
+        for i, width in enumerate(widths):
+            worksheet.set_column(i, i, width)
+    else:
+        from openpyxl.utils import get_column_letter
+        for i, width in enumerate(widths):
+            worksheet.column_dimensions[get_column_letter(i + 1)].width = width
+
 
 class ExcelExporter:
     """
@@ -50,7 +96,7 @@ class ExcelExporter:
             buffer = BytesIO()
             
             # Create Excel writer
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            with pd.ExcelWriter(buffer, engine=EXCEL_ENGINE) as writer:
                 # Sheet 1: Summary
                 self._create_summary_sheet(writer, report_data)
                 
@@ -107,9 +153,7 @@ class ExcelExporter:
             df.to_excel(writer, sheet_name='Summary', index=False)
             
             # Format sheet
-            workbook = writer.book
-            worksheet = writer.sheets['Summary']
-            worksheet.column_dimensions['A'].width = 50
+            _set_column_widths(writer, 'Summary', [50])
             
         except Exception as e:
             logger.error(f"Error creating summary sheet: {e}")
@@ -129,18 +173,7 @@ class ExcelExporter:
                 df.to_excel(writer, sheet_name='Data Overview', index=False)
                 
                 # Format
-                worksheet = writer.sheets['Data Overview']
-                for col in worksheet.columns:
-                    max_length = 0
-                    column = col[0].column_letter
-                    for cell in col:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column].width = adjusted_width
+                _set_column_widths(writer, 'Data Overview', _fit_widths(df))
             
         except Exception as e:
             logger.error(f"Error creating data overview sheet: {e}")
@@ -161,9 +194,7 @@ class ExcelExporter:
                     df.to_excel(writer, sheet_name='Statistics', index=False)
                     
                     # Format
-                    worksheet = writer.sheets['Statistics']
-                    for col in worksheet.columns:
-                        worksheet.column_dimensions[col[0].column_letter].width = 15
+                    _set_column_widths(writer, 'Statistics', [15] * len(df.columns))
                 else:
                     # Text content
                     df = pd.DataFrame({'Information': [stats_section['content']]})
@@ -206,9 +237,7 @@ class ExcelExporter:
                     df.to_excel(writer, sheet_name='Insights', index=False)
                     
                     # Format
-                    worksheet = writer.sheets['Insights']
-                    worksheet.column_dimensions['A'].width = 25
-                    worksheet.column_dimensions['B'].width = 80
+                    _set_column_widths(writer, 'Insights', [25, 80])
             
         except Exception as e:
             logger.error(f"Error creating insights sheet: {e}")
@@ -240,12 +269,7 @@ class ExcelExporter:
                 df.to_excel(writer, sheet_name='Query History', index=False)
                 
                 # Format
-                worksheet = writer.sheets['Query History']
-                worksheet.column_dimensions['A'].width = 10
-                worksheet.column_dimensions['B'].width = 50
-                worksheet.column_dimensions['C'].width = 50
-                worksheet.column_dimensions['D'].width = 10
-                worksheet.column_dimensions['E'].width = 10
+                _set_column_widths(writer, 'Query History', [10, 50, 50, 10, 10])
             
         except Exception as e:
             logger.error(f"Error creating query history sheet: {e}")
@@ -272,22 +296,11 @@ class ExcelExporter:
             
             buffer = BytesIO()
             
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            with pd.ExcelWriter(buffer, engine=EXCEL_ENGINE) as writer:
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
                 # Auto-adjust column widths
-                worksheet = writer.sheets[sheet_name]
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+                _set_column_widths(writer, sheet_name, _fit_widths(df))
             
             excel_bytes = buffer.getvalue()
             buffer.close()
@@ -319,25 +332,14 @@ class ExcelExporter:
             
             buffer = BytesIO()
             
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            with pd.ExcelWriter(buffer, engine=EXCEL_ENGINE) as writer:
                 for sheet_name, df in dataframes.items():
                     # Truncate sheet name to 31 chars (Excel limit)
                     safe_sheet_name = sheet_name[:31]
                     df.to_excel(writer, sheet_name=safe_sheet_name, index=False)
                     
                     # Format
-                    worksheet = writer.sheets[safe_sheet_name]
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
+                    _set_column_widths(writer, safe_sheet_name, _fit_widths(df))
             
             excel_bytes = buffer.getvalue()
             buffer.close()
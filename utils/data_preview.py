@@ -3,6 +3,8 @@ Data Preview and Profiling Module
 Generate summaries and previews of uploaded data
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
@@ -11,6 +13,28 @@ import plotly.graph_objects as go
 from loguru import logger
 
 
+def _categorical_column_summary(series: pd.Series, max_categories: int) -> Dict[str, Any]:
+    """
+    Summarize a single categorical column
+    
+    Args:
+        series: Column to summarize
+        max_categories: Maximum number of categories to show
+    
+    Returns:
+        Dictionary with the column summary
+    """
+    value_counts = series.value_counts()
+    
+    # value_counts drops NaN like nunique does; unused categories show up with a zero count
+    return {
+        'unique_count': int(np.count_nonzero(value_counts.to_numpy())),
+        'top_value': str(value_counts.index[0]) if len(value_counts) > 0 else None,
+        'top_count': int(value_counts.iloc[0]) if len(value_counts) > 0 else 0,
+        'value_counts': value_counts.head(max_categories).to_dict(),
+    }
+
+
 class DataPreviewer:
     """
     Generate data previews and profiles
@@ -131,18 +155,18 @@ class DataPreviewer:
         if len(categorical_cols) == 0:
             return {}
         
-        summary = {}
-        for col in categorical_cols:
-            value_counts = df[col].value_counts()
-            
-            summary[col] = {
-                'unique_count': int(df[col].nunique()),
-                'top_value': str(value_counts.index[0]) if len(value_counts) > 0 else None,
-                'top_count': int(value_counts.iloc[0]) if len(value_counts) > 0 else 0,
-                'value_counts': value_counts.head(max_categories).to_dict(),
-            }
+        if len(categorical_cols) == 1:
+            col = categorical_cols[0]
+            return {col: _categorical_column_summary(df[col], max_categories)}
         
-        return summary
+        # value_counts releases the GIL while hashing, so columns summarize in parallel
+        workers = min(len(categorical_cols), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            summaries = executor.map(
+                lambda col: _categorical_column_summary(df[col], max_categories),
+                categorical_cols
+            )
+            return dict(zip(categorical_cols, summaries))
     
     def get_correlation_matrix(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -276,15 +300,23 @@ class DataPreviewer:
         if len(numeric_cols) < 2:
             return None
         
-        corr_matrix = df[numeric_cols].corr()
+        values = df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        if np.isnan(values).any():
+            # Pairwise-complete correlation for columns with missing values
+            corr_values = df[numeric_cols].corr().to_numpy()
+        else:
+            # One BLAS pass over a contiguous array; constant columns give NaN
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr_values = np.corrcoef(values, rowvar=False)
         
         fig = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
-            x=corr_matrix.columns,
-            y=corr_matrix.columns,
+            z=corr_values,
+            x=numeric_cols,
+            y=numeric_cols,
             colorscale='RdBu',
             zmid=0,
-            text=corr_matrix.values,
+            text=corr_values,
             texttemplate='%{text:.2f}',
             textfont={"size": 10},
             colorbar=dict(title="Correlation")
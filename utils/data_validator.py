@@ -72,7 +72,8 @@ class DataValidator:
                 })
             
             # String columns
-            elif pd.api.types.is_string_dtype(df[col]) or df[col].dtype == 'object':
+            elif (pd.api.types.is_string_dtype(df[col]) or df[col].dtype == 'object'
+                  or isinstance(df[col].dtype, pd.CategoricalDtype)):
                 # Get top values
                 top_values = df[col].value_counts().head(5).to_dict()
                 col_stats['top_values'] = {str(k): int(v) for k, v in top_values.items()}
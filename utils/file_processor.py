@@ -11,12 +11,26 @@ from loguru import logger
 import sys
 from datetime import datetime
 import hashlib
+from decimal import Decimal, InvalidOperation
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config import settings
 
+# Text columns with at most this share of distinct values become categoricals
+_CATEGORY_MAX_RATIO = 0.5
+# "007" or "-01234" - numbers whose text form would change if parsed
+_LEADING_ZERO_RE = r'\s*[-+]?0\d'
+
+# pyarrow parses CSV with multiple threads; pandas is the fallback
+try:
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("⚠️  pyarrow not available. CSV files will be parsed with pandas.")
+
 
 class FileProcessor:
     """
@@ -112,7 +126,7 @@ class FileProcessor:
         
         try:
             if file_ext == '.csv':
-                df = pd.read_csv(file_path)
+                df = self._read_csv(file_path)
                 return df, 'csv'
             
             elif file_ext in ['.xlsx', '.xls']:
@@ -142,6 +156,135 @@ class FileProcessor:
             logger.error(f"❌ Failed to read file: {e}")
             return None, ""
     
+    def _read_csv(self, file_path: str) -> pd.DataFrame:
+        """
+        Read a CSV file, using pyarrow's multithreaded parser when available
+        
+        Args:
+            file_path: Path to the CSV file
+        
+        Returns:
+            Parsed DataFrame
+        """
+        if PYARROW_AVAILABLE:
+            try:
+                table = pa_csv.read_csv(
+                    file_path,
+                    read_options=pa_csv.ReadOptions(use_threads=True, block_size=1 << 20),
+                    # Empty fields become missing values, as with pandas
+                    convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+                )
+                # self_destruct frees Arrow buffers as columns are converted
+                return table.to_pandas(
+                    self_destruct=True,
+                    split_blocks=True,
+                    date_as_object=False
+                )
+            except Exception as e:
+                # pyarrow is stricter (ragged rows, non-UTF-8 text) - let pandas try
+                logger.warning(f"⚠️  pyarrow CSV parse failed, falling back to pandas: {e}")
+        
+        return pd.read_csv(file_path)
+    
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store columns in smaller dtypes without changing their values
+        
+        - Text columns holding only numbers (as Excel and JSON files often
+          do) become numeric, unless they have leading zeros like IDs or
+          ZIP codes
+        - Other text columns where at most half the values are distinct
+          become categoricals
+        
+        Numeric columns keep their width: DuckDB keeps int32 arithmetic in
+        int32 and raises on overflow (e.g. a*b*c or a*100000), and float32
+        arithmetic would show rounding errors in query results.
+        
+        Args:
+            df: Loaded DataFrame
+        
+        Returns:
+            DataFrame with optimized dtypes
+        """
+        try:
+            before = df.memory_usage(deep=True).sum()
+            converted = {}
+            
+            max_unique = len(df) * _CATEGORY_MAX_RATIO
+            for col in df.select_dtypes(include=['object', 'string']).columns:
+                values = df[col]
+                # Mixed-type object columns stay as they are
+                if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+                    continue
+                numeric = self._as_numeric(values)
+                if numeric is not None:
+                    converted[col] = numeric
+                elif values.nunique() <= max_unique:
+                    converted[col] = values.astype('category')
+            
+            if not converted:
+                return df
+            
+            # Shallow copy - unconverted columns keep sharing their data
+            df = df.copy(deep=False)
+            for col, values in converted.items():
+                df[col] = values
+            
+            after = df.memory_usage(deep=True).sum()
+            logger.info(f"✅ Optimized {len(converted)} column dtypes: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+            return df
+            
+        except Exception as e:
+            logger.warning(f"⚠️  Could not optimize dtypes: {e}")
+            return df
+    
+    @staticmethod
+    def _as_numeric(values: pd.Series) -> Optional[pd.Series]:
+        """
+        Parse a text column that holds only numbers
+        
+        Args:
+            values: Text column
+        
+        Returns:
+            Numeric column, or None if any value isn't a number, has a
+            leading zero that parsing would drop, or can't be stored exactly
+        """
+        present = values.dropna()
+        if present.empty:
+            return None
+        
+        # A small sample rejects ordinary text columns cheaply
+        try:
+            pd.to_numeric(present.head(100))
+        except (ValueError, TypeError):
+            return None
+        
+        if present.str.match(_LEADING_ZERO_RE).any():
+            return None
+        
+        # Parsed without the missing values, which would force float64
+        numeric = pd.to_numeric(present, errors='coerce')
+        if numeric.isna().any():
+            return None
+        
+        # Only lossless conversions: integers must fit int64, and floats
+        # must read back as the number written (long IDs lose digits)
+        if pd.api.types.is_signed_integer_dtype(numeric):
+            if len(present) == len(values):
+                return numeric
+            return numeric.astype('Int64').reindex(values.index)
+        
+        if not pd.api.types.is_float_dtype(numeric):
+            return None
+        try:
+            for text, value in zip(present.to_numpy(), numeric.to_numpy()):
+                if Decimal(repr(float(value))) != Decimal(text.strip()):
+                    return None
+        except InvalidOperation:
+            return None
+        return numeric.reindex(values.index)
+    
     def detect_encoding(self, file_path: str) -> str:
         """
         Detect file encoding for better CSV reading
@@ -218,6 +361,9 @@ class FileProcessor:
                 result['error'] = "Failed to read file"
                 return result
             
+            # Shrink column dtypes for every downstream pass
+            df = self.optimize_dtypes(df)
+            
             # Get file info
             file_info = self.get_file_info(file_path)
             file_info['type'] = file_type
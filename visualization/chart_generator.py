@@ -15,6 +15,21 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 
+# Interactive chart options; static, so built once and shared by every chart
+CHART_CONFIG = {
+    'displayModeBar': True,
+    'displaylogo': False,
+    'modeBarButtonsToRemove': ['lasso2d', 'select2d'],
+    'toImageButtonOptions': {
+        'format': 'png',
+        'filename': 'chart',
+        'height': 600,
+        'width': 800,
+        'scale': 2
+    }
+}
+
+
 class ChartGenerator:
     """
     Generate charts automatically based on data and query context
@@ -25,6 +40,22 @@ class ChartGenerator:
         self.default_colors = px.colors.qualitative.Set2
         self.default_template = "plotly_white"
     
+    def can_plot(self, df: pd.DataFrame) -> bool:
+        """
+        Cheap check for results that no chart type can show meaningfully
+        
+        Single values and results without numeric columns are shown as tables.
+        
+        Args:
+            df: DataFrame to visualize
+        
+        Returns:
+            True if a chart is worth generating
+        """
+        if df is None or len(df) == 0 or df.shape == (1, 1):
+            return False
+        return any(dtype.kind in 'iuf' for dtype in df.dtypes)
+    
     def recommend_chart_type(self, df: pd.DataFrame, question: str = "") -> str:
         """
         Recommend the best chart type based on data characteristics
@@ -413,7 +444,7 @@ class ChartGenerator:
             Tuple of (Figure object, chart type used)
         """
         try:
-            if df is None or len(df) == 0:
+            if not self.can_plot(df):
                 return None, "table"
             
             # Recommend chart type if not specified
@@ -476,20 +507,9 @@ class ChartGenerator:
         Get configuration for interactive chart features
         
         Returns:
-            Configuration dictionary
+            Configuration dictionary (shared - do not modify)
         """
-        return {
-            'displayModeBar': True,
-            'displaylogo': False,
-            'modeBarButtonsToRemove': ['lasso2d', 'select2d'],
-            'toImageButtonOptions': {
-                'format': 'png',
-                'filename': 'chart',
-                'height': 600,
-                'width': 800,
-                'scale': 2
-            }
-        }
+        return CHART_CONFIG
 
 
 # Global instance